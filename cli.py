@@ -5,9 +5,20 @@ import argparse
 import sys
 from pathlib import Path
 
-from src.services.processing_service import ProcessingService
-from src.models.settings import ProjectSettings, DensificationSettings, InterpolationMethod
-from src.bot.conversation import DensificationConversation
+INTERPOLATION_CHOICES = ('linear', 'cubic', 'nearest')
+
+
+def _interpolation_method(value: str):
+    """Convert an --interpolation value to InterpolationMethod at parse time."""
+    # Imported here so --help does not load the models package
+    from src.models.settings import InterpolationMethod
+    
+    try:
+        return InterpolationMethod(value.lower())
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid choice: {value!r} (choose from {', '.join(INTERPOLATION_CHOICES)})"
+        )
 
 
 def main():
@@ -43,8 +54,8 @@ def main():
     
     parser.add_argument(
         '--interpolation',
-        type=str,
-        choices=['linear', 'cubic', 'nearest'],
+        type=_interpolation_method,
+        metavar='{' + ','.join(INTERPOLATION_CHOICES) + '}',
         default='linear',
         help='Interpolation method (default: linear)'
     )
@@ -83,6 +94,12 @@ def main():
         help='Show file statistics only'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the <input>.xyz.npy coordinate cache'
+    )
+    
     args = parser.parse_args()
     
     input_path = Path(args.input_file)
@@ -90,34 +107,38 @@ def main():
         print(f"Error: Input file not found: {args.input_file}", file=sys.stderr)
         return 1
     
-    service = ProcessingService()
+    # Heavy imports (numpy/scipy/ezdxf) are deferred so --help and argument
+    # errors return without loading the processing stack.
+    from src.services.processing_service import ProcessingService
+    
+    service = ProcessingService(use_cache=not args.no_cache, disk_cache=not args.no_cache)
     
     if args.stats:
         stats = service.get_file_statistics(args.input_file)
         if stats['success']:
-            print("\n📊 File Statistics:")
-            print(f"  Points: {stats['point_count']}")
-            print(f"  Bounds X: {stats['bounds']['min_x']:.2f} to {stats['bounds']['max_x']:.2f}")
-            print(f"  Bounds Y: {stats['bounds']['min_y']:.2f} to {stats['bounds']['max_y']:.2f}")
-            print(f"  Bounds Z: {stats['bounds']['min_z']:.2f} to {stats['bounds']['max_z']:.2f}")
-            print(f"  Mean spacing: {stats['spacing']['mean_spacing']:.2f} m")
-            print(f"  Min spacing: {stats['spacing']['min_spacing']:.2f} m")
-            print(f"  Max spacing: {stats['spacing']['max_spacing']:.2f} m")
+            lines = [
+                "\n📊 File Statistics:",
+                f"  Points: {stats['point_count']}",
+                f"  Bounds X: {stats['bounds']['min_x']:.2f} to {stats['bounds']['max_x']:.2f}",
+                f"  Bounds Y: {stats['bounds']['min_y']:.2f} to {stats['bounds']['max_y']:.2f}",
+                f"  Bounds Z: {stats['bounds']['min_z']:.2f} to {stats['bounds']['max_z']:.2f}",
+                f"  Mean spacing: {stats['spacing']['mean_spacing']:.2f} m",
+                f"  Min spacing: {stats['spacing']['min_spacing']:.2f} m",
+                f"  Max spacing: {stats['spacing']['max_spacing']:.2f} m",
+            ]
+            sys.stdout.write("\n".join(lines) + "\n")
         else:
             print(f"Error: {stats['error']}", file=sys.stderr)
             return 1
         return 0
     
-    interp_method = InterpolationMethod.LINEAR
-    if args.interpolation == 'cubic':
-        interp_method = InterpolationMethod.CUBIC
-    elif args.interpolation == 'nearest':
-        interp_method = InterpolationMethod.NEAREST
+    from src.models.settings import ProjectSettings, DensificationSettings
+    from src.bot.conversation import DensificationConversation
     
     densification_settings = DensificationSettings(
         enabled=args.densify,
         grid_spacing=args.grid_spacing,
-        interpolation_method=interp_method,
+        interpolation_method=args.interpolation,
         show_generated_layer=args.show_generated,
         show_triangles_layer=args.show_triangles,
         max_points=args.max_points,
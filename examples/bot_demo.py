@@ -3,7 +3,7 @@
 import asyncio
 from pathlib import Path
 from src.bot.file_parser import FileParser
-from src.models.bot_data import ColumnMapping, BotSessionData
+from src.models.bot_data import ColumnMapping, BotSessionData, FileUploadInfo
 
 
 async def demo_file_parsing():
@@ -29,14 +29,22 @@ async def demo_file_parsing():
         return
     print("   ✅ File is valid")
     
+    file_info = FileUploadInfo(
+        file_path=sample_file,
+        original_filename=sample_file.name,
+        file_size=sample_file.stat().st_size
+    )
+    
     # Step 2: Detect encoding
     print("\n2️⃣ Detecting encoding...")
-    encoding = FileParser.detect_encoding(sample_file)
+    encoding = FileParser.detect_encoding(file_info.file_path, file_info.sample_size)
+    file_info.encoding = encoding
     print(f"   📝 Detected encoding: {encoding}")
     
     # Step 3: Detect delimiter
     print("\n3️⃣ Detecting delimiter...")
     delimiter = FileParser.detect_delimiter(sample_file, encoding)
+    file_info.delimiter = delimiter
     delimiter_name = {
         ' ': 'space',
         '\t': 'tab',
@@ -55,7 +63,7 @@ async def demo_file_parsing():
         comment_col=4
     )
     
-    parsed_data = FileParser.parse_file(
+    parsed_data = FileParser.parse_file_fast(
         sample_file,
         encoding,
         delimiter,
@@ -78,24 +86,16 @@ async def demo_file_parsing():
     
     # Step 5: Show sample points
     print("\n5️⃣ Sample parsed points:")
-    for i, point in enumerate(parsed_data.points[:5], 1):
-        code = point.get('code', '—')
-        comment = point.get('comment', '—')
-        print(f"   {i}. X={point['x']:.2f}, Y={point['y']:.2f}, Z={point['z']:.2f}, "
-              f"Code={code}, Comment={comment[:30]}...")
+    xyz = parsed_data.xyz[:5]
+    for i, (x, y, z, code, comment) in enumerate(
+            zip(xyz[:, 0], xyz[:, 1], xyz[:, 2], parsed_data.codes[:5], parsed_data.comments[:5]), 1):
+        print(f"   {i}. X={x:.2f}, Y={y:.2f}, Z={z:.2f}, "
+              f"Code={code or '—'}, Comment={(comment or '—')[:30]}...")
     
     # Step 6: Simulate session data
     print("\n6️⃣ Simulating bot session...")
     session = BotSessionData()
-    from src.models.bot_data import FileUploadInfo
-    
-    session.file_info = FileUploadInfo(
-        file_path=sample_file,
-        original_filename=sample_file.name,
-        file_size=sample_file.stat().st_size,
-        encoding=encoding,
-        delimiter=delimiter
-    )
+    session.file_info = file_info
     session.parsed_data = parsed_data
     session.scale = 1000.0
     session.tin_enabled = True
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Demo script for relief densification feature."""
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -10,6 +11,9 @@ from src.services.processing_service import ProcessingService
 from src.models.settings import ProjectSettings, DensificationSettings, InterpolationMethod
 from src.bot.conversation import DensificationConversation
 
+# Reuse parsed points and base TIN across demos and runs (disable with --no-cache)
+USE_CACHE = True
+
 
 def demo_basic_densification():
     """Demonstrate basic densification."""
@@ -34,7 +38,7 @@ def demo_basic_densification():
     print("\n📋 Settings:")
     print(DensificationConversation.get_summary(settings.densification))
     
-    service = ProcessingService()
+    service = ProcessingService(use_cache=USE_CACHE, disk_cache=USE_CACHE)
     print("\n⚙️ Processing...")
     results = service.process_project(str(input_file), str(output_file), settings)
     
@@ -65,10 +69,14 @@ def demo_interpolation_methods():
         (InterpolationMethod.NEAREST, "nearest")
     ]
     
-    service = ProcessingService()
+    service = ProcessingService(use_cache=USE_CACHE, disk_cache=USE_CACHE)
+    # Load points and build the base TIN once for all configurations
+    prepared = service.prepare(str(input_file))
     
+    # Output is buffered and written once per demo
+    lines = []
     for method, name in methods:
-        print(f"\n--- Testing {name.upper()} interpolation ---")
+        lines.append(f"\n--- Testing {name.upper()} interpolation ---")
         
         output_file = output_dir / f"demo_{name}.dxf"
         
@@ -81,14 +89,14 @@ def demo_interpolation_methods():
             )
         )
         
-        results = service.process_project(str(input_file), str(output_file), settings)
+        results = service.densify_and_write(prepared, str(output_file), settings)
         
         if results['success']:
-            print(f"✓ {name}: Generated {results['densification']['generated_points']} points")
+            lines.append(f"✓ {name}: Generated {results['densification']['generated_points']} points")
         else:
-            print(f"✗ {name}: {results.get('error')}")
+            lines.append(f"✗ {name}: {results.get('error')}")
     
-    print()
+    sys.stdout.write("\n".join(lines) + "\n\n")
 
 
 def demo_grid_spacing_comparison():
@@ -102,10 +110,13 @@ def demo_grid_spacing_comparison():
     
     spacings = [2.0, 3.0, 5.0, 10.0]
     
-    service = ProcessingService()
+    service = ProcessingService(use_cache=USE_CACHE, disk_cache=USE_CACHE)
+    # Load points and build the base TIN once for all configurations
+    prepared = service.prepare(str(input_file))
     
+    lines = []
     for spacing in spacings:
-        print(f"\n--- Grid spacing: {spacing} m ---")
+        lines.append(f"\n--- Grid spacing: {spacing} m ---")
         
         output_file = output_dir / f"demo_spacing_{spacing}.dxf"
         
@@ -117,17 +128,17 @@ def demo_grid_spacing_comparison():
             )
         )
         
-        results = service.process_project(str(input_file), str(output_file), settings)
+        results = service.densify_and_write(prepared, str(output_file), settings)
         
         if results['success']:
             points = results['densification']['generated_points']
             original = results['points_loaded']
             percentage = (points / original * 100) if original > 0 else 0
-            print(f"✓ Generated {points} points (+{percentage:.0f}%)")
+            lines.append(f"✓ Generated {points} points (+{percentage:.0f}%)")
         else:
-            print(f"✗ Error: {results.get('error')}")
+            lines.append(f"✗ Error: {results.get('error')}")
     
-    print()
+    sys.stdout.write("\n".join(lines) + "\n\n")
 
 
 def demo_layer_visibility():
@@ -145,10 +156,13 @@ def demo_layer_visibility():
         (False, True, "triangles_only")
     ]
     
-    service = ProcessingService()
+    service = ProcessingService(use_cache=USE_CACHE, disk_cache=USE_CACHE)
+    # Load points and build the base TIN once for all configurations
+    prepared = service.prepare(str(input_file))
     
+    lines = []
     for show_points, show_triangles, name in configs:
-        print(f"\n--- {name.replace('_', ' ').title()} ---")
+        lines.append(f"\n--- {name.replace('_', ' ').title()} ---")
         
         output_file = output_dir / f"demo_layers_{name}.dxf"
         
@@ -162,16 +176,16 @@ def demo_layer_visibility():
             )
         )
         
-        results = service.process_project(str(input_file), str(output_file), settings)
+        results = service.densify_and_write(prepared, str(output_file), settings)
         
         if results['success']:
-            print(f"✓ Created with:")
-            print(f"  - Generated points layer: {'ON' if show_points else 'OFF'}")
-            print(f"  - Triangles layer: {'ON' if show_triangles else 'OFF'}")
+            lines.append("✓ Created with:")
+            lines.append(f"  - Generated points layer: {'ON' if show_points else 'OFF'}")
+            lines.append(f"  - Triangles layer: {'ON' if show_triangles else 'OFF'}")
         else:
-            print(f"✗ Error: {results.get('error')}")
+            lines.append(f"✗ Error: {results.get('error')}")
     
-    print()
+    sys.stdout.write("\n".join(lines) + "\n\n")
 
 
 def demo_file_statistics():
@@ -182,21 +196,24 @@ def demo_file_statistics():
     
     input_file = Path(__file__).parent / "sample_coordinates.txt"
     
-    service = ProcessingService()
+    service = ProcessingService(use_cache=USE_CACHE, disk_cache=USE_CACHE)
     stats = service.get_file_statistics(str(input_file))
     
     if stats['success']:
-        print("\n📊 File Information:")
-        print(f"  Total points: {stats['point_count']}")
-        print(f"\n📏 Spatial Extent:")
-        print(f"  X: {stats['bounds']['min_x']:.3f} to {stats['bounds']['max_x']:.3f}")
-        print(f"  Y: {stats['bounds']['min_y']:.3f} to {stats['bounds']['max_y']:.3f}")
-        print(f"  Z: {stats['bounds']['min_z']:.3f} to {stats['bounds']['max_z']:.3f}")
-        print(f"\n📐 Point Spacing:")
-        print(f"  Mean: {stats['spacing']['mean_spacing']:.3f} m")
-        print(f"  Min: {stats['spacing']['min_spacing']:.3f} m")
-        print(f"  Max: {stats['spacing']['max_spacing']:.3f} m")
-        print(f"  Median: {stats['spacing']['median_spacing']:.3f} m")
+        lines = [
+            "\n📊 File Information:",
+            f"  Total points: {stats['point_count']}",
+            "\n📏 Spatial Extent:",
+            f"  X: {stats['bounds']['min_x']:.3f} to {stats['bounds']['max_x']:.3f}",
+            f"  Y: {stats['bounds']['min_y']:.3f} to {stats['bounds']['max_y']:.3f}",
+            f"  Z: {stats['bounds']['min_z']:.3f} to {stats['bounds']['max_z']:.3f}",
+            "\n📐 Point Spacing:",
+            f"  Mean: {stats['spacing']['mean_spacing']:.3f} m",
+            f"  Min: {stats['spacing']['min_spacing']:.3f} m",
+            f"  Max: {stats['spacing']['max_spacing']:.3f} m",
+            f"  Median: {stats['spacing']['median_spacing']:.3f} m",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
     else:
         print(f"❌ Error: {stats.get('error')}")
     
@@ -229,4 +246,13 @@ def demo_all():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Relief densification demos")
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-parse the input file on every run (for benchmarking)'
+    )
+    args = parser.parse_args()
+    USE_CACHE = not args.no_cache
+    
     demo_all()
@@ -1,14 +1,23 @@
 """Demonstration of the DXF geometry engine with scale management and 3D polylines."""
 
+import io
 import tempfile
-import os
+from collections import Counter
 from pathlib import Path
 
+import numpy as np
+
 from src.dxf.generation_service import DXFGenerationService
 from src.dxf.scale_settings import DrawingScale
 from src.models.settings import DXFGenerationSettings
 
 
+def _temp_dxf_path(suffix: str) -> str:
+    """Create an empty temporary file and return its path."""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        return f.name
+
+
 def demo_basic_usage():
     """Demonstrate basic usage of the geometry engine."""
     print("=== Demo 1: Basic DXF Generation ===")
@@ -25,15 +34,18 @@ def demo_basic_usage():
         (1010.0, 2000.0, 150.310, 'bord'),
     ]
     
-    for x, y, z, code in points:
-        service.add_point_with_label(x, y, z, code, f'layer_{code}')
+    service.add_points_batch(
+        np.array([p[:3] for p in points]),
+        [p[3] for p in points],
+        layer_prefix='layer'
+    )
     
-    output_file = tempfile.mktemp(suffix='_basic.dxf')
-    service.save(output_file)
+    buffer = io.BytesIO()
+    service.save(buffer)
     
-    print(f"✓ Saved to: {output_file}")
+    print(f"✓ Serialized in memory: {buffer.tell()} bytes")
     print(f"  - Points: {len(points)}")
-    print(f"  - Layers created: {len([l for l in service.doc.layers])}")
+    print(f"  - Layers created: {len(service.doc.layers)}")
     print()
 
 
@@ -48,18 +60,20 @@ def demo_scale_comparison():
         DrawingScale.SCALE_1_5000,
     ]
     
+    service = DXFGenerationService()
+    
     for scale in scales:
-        service = DXFGenerationService(scale=scale)
+        service.reset(scale=scale)
         
         service.add_point_with_label(100, 200, 150, 'test', 'test_layer')
         
-        output_file = tempfile.mktemp(suffix=f'_scale_{scale.value.replace(":", "_")}.dxf')
-        service.save(output_file)
+        buffer = io.BytesIO()
+        service.save(buffer)
         
         print(f"✓ Scale {scale.value}:")
         print(f"  - Text height: {service.scale_manager.get_text_height()}")
         print(f"  - Lineweight: {service.scale_manager.get_lineweight()}")
-        print(f"  - File: {os.path.basename(output_file)}")
+        print(f"  - DXF size: {buffer.tell()} bytes")
     print()
 
 
@@ -81,7 +95,7 @@ def demo_3d_polylines():
     
     polylines = service.build_3d_polylines(points_data, 'structures')
     
-    output_file = tempfile.mktemp(suffix='_polylines.dxf')
+    output_file = _temp_dxf_path('_polylines.dxf')
     service.save(output_file)
     
     print(f"✓ Created {len(polylines)} polyline(s)")
@@ -108,7 +122,7 @@ def demo_k_code_logic():
     
     polylines = service.build_3d_polylines(points_data, 'k_codes')
     
-    output_file = tempfile.mktemp(suffix='_k_codes.dxf')
+    output_file = _temp_dxf_path('_k_codes.dxf')
     service.save(output_file)
     
     print(f"✓ K-codes connected: k1, k2")
@@ -134,7 +148,7 @@ def demo_break_distance():
     
     polylines = service.build_3d_polylines(points_data, 'break_test')
     
-    output_file = tempfile.mktemp(suffix='_break_distance.dxf')
+    output_file = _temp_dxf_path('_break_distance.dxf')
     service.save(output_file)
     
     print(f"✓ Points with gap >70m are split into separate polylines")
@@ -153,20 +167,23 @@ def demo_structural_layers():
     
     structural_codes = ['bord', 'rels', 'bpl', 'cpl']
     
-    for i, code in enumerate(structural_codes):
-        x, y, z = 1000.0 + i * 10, 2000.0, 150.0 + i * 0.5
-        service.add_point_with_label(x, y, z, code, f'layer_{code}')
+    offsets = np.arange(len(structural_codes))
+    points = np.column_stack([
+        1000.0 + offsets * 10,
+        np.full(len(structural_codes), 2000.0),
+        150.0 + offsets * 0.5
+    ])
+    service.add_points_batch(points, structural_codes, layer_prefix='layer')
     
-    output_file = tempfile.mktemp(suffix='_structural.dxf')
-    service.save(output_file)
+    buffer = io.BytesIO()
+    service.save(buffer)
     
     print(f"✓ Structural layers created:")
     for code in structural_codes:
-        config = service.STRUCTURAL_LAYERS.get(code, {})
-        color = config.get('color', 7)
+        color = service.resolve_code(code).color
         color_name = {0: 'Black', 3: 'Green', 7: 'White/Black'}.get(color, str(color))
         print(f"  - {code}: color {color} ({color_name})")
-    print(f"  - Saved to: {output_file}")
+    print(f"  - DXF size: {buffer.tell()} bytes")
     print()
 
 
@@ -183,14 +200,14 @@ def demo_special_codes():
     
     service.apply_special_code_rules(special_points, 'special')
     
-    output_file = tempfile.mktemp(suffix='_special_codes.dxf')
-    service.save(output_file)
+    buffer = io.BytesIO()
+    service.save(buffer)
     
     print(f"✓ Special code rules applied:")
     for code in ['Fonar', 'Machta']:
-        rule = service.SPECIAL_CODE_RULES[code]
-        print(f"  - {code}: color {rule['color']}, marker {rule['marker']}")
-    print(f"  - Saved to: {output_file}")
+        style = service.resolve_code(code)
+        print(f"  - {code}: color {style.marker_color}, marker {style.marker}")
+    print(f"  - DXF size: {buffer.tell()} bytes")
     print()
 
 
@@ -218,19 +235,19 @@ def demo_complete_workflow():
         {'x': 1010.0, 'y': 2005.0, 'z': 150.350, 'code': 'rels', 'comment': '1'},
     ]
     
-    for point in sample_points:
-        service.add_point_with_label(
-            point['x'], point['y'], point['z'],
-            point['code'], f"layer_{point['code']}",
-            show_z_label=settings.show_z_labels
-        )
+    service.add_points_batch(
+        np.array([(p['x'], p['y'], p['z']) for p in sample_points]),
+        [p['code'] for p in sample_points],
+        layer_prefix='layer',
+        show_z_label=settings.show_z_labels
+    )
     
     if settings.generate_3d_polylines:
         polylines = service.build_3d_polylines(sample_points, 'polylines')
     
     service.add_text_annotation('Sample Survey Data', 1000, 1995, 'annotations')
     
-    output_file = tempfile.mktemp(suffix='_complete.dxf')
+    output_file = _temp_dxf_path('_complete.dxf')
     service.save(output_file)
     
     print(f"✓ Complete workflow executed:")
@@ -240,11 +257,12 @@ def demo_complete_workflow():
     print(f"  - Z labels: {'Yes' if settings.show_z_labels else 'No'}")
     print(f"  - Saved to: {output_file}")
     
-    msp = service.doc.modelspace()
+    # One pass over the modelspace instead of a query per entity type
+    entity_counts = Counter(entity.dxftype() for entity in service.msp)
     print(f"\n  Entity counts:")
-    print(f"    - Circles: {len(list(msp.query('CIRCLE')))}")
-    print(f"    - Text: {len(list(msp.query('TEXT')))}")
-    print(f"    - Polylines: {len(list(msp.query('POLYLINE')))}")
+    print(f"    - Circles: {entity_counts['CIRCLE']}")
+    print(f"    - Text: {entity_counts['TEXT']}")
+    print(f"    - Polylines: {entity_counts['POLYLINE']}")
     print()
 
 
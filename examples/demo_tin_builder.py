@@ -13,27 +13,21 @@ def create_sample_terrain():
     """Create sample terrain with breaklines."""
     print("Creating sample terrain data...")
     
-    # Generate grid of terrain points
-    points = []
-    metadata = []
-    
     # Main terrain grid
-    for x in range(0, 100, 10):
-        for y in range(0, 100, 10):
-            z = 100 + 0.1 * x + 0.05 * y + np.random.randn() * 0.5
-            points.append([x, y, z])
-            
-            # Assign codes based on position
-            if x == 50:  # Vertical breakline
-                metadata.append({'code': 'bpl'})
-            elif y == 50:  # Horizontal centerline
-                metadata.append({'code': 'cpl'})
-            elif x == 0 or x == 90 or y == 0 or y == 90:  # Borders
-                metadata.append({'code': 'bord'})
-            else:
-                metadata.append({'code': 'terrain'})
-    
-    return PointCloud(points=np.array(points), point_metadata=metadata)
+    xx, yy = np.meshgrid(np.arange(0, 100, 10), np.arange(0, 100, 10), indexing='ij')
+    zz = 100 + 0.1 * xx + 0.05 * yy + np.random.randn(*xx.shape) * 0.5
+    points = np.column_stack([xx.ravel(), yy.ravel(), zz.ravel()])
+    
+    # Assign codes based on position
+    border = (xx == 0) | (xx == 90) | (yy == 0) | (yy == 90)
+    names = np.where(xx == 50, 'bpl',            # Vertical breakline
+             np.where(yy == 50, 'cpl',           # Horizontal centerline
+             np.where(border, 'bord', 'terrain'))).ravel()
+    
+    code_names, codes = np.unique(names, return_inverse=True)
+    code_dict = {name: i for i, name in enumerate(code_names.tolist())}
+    
+    return PointCloud(points=points, codes=codes.astype(np.int32), code_dict=code_dict)
 
 
 def demo_basic_tin():
@@ -1,5 +1,6 @@
 """Example script to process sample survey data file."""
 
+import heapq
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -51,7 +52,7 @@ def main():
         print()
         
         print("Layers used:")
-        for layer in sorted(payload['layers'])[:15]:
+        for layer in heapq.nsmallest(15, payload['layers']):
             print(f"  - {layer}")
         if len(payload['layers']) > 15:
             print(f"  ... and {len(payload['layers']) - 15} more")
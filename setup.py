@@ -4,7 +4,12 @@ from setuptools import setup, find_packages
 from pathlib import Path
 
 this_directory = Path(__file__).parent
-long_description = (this_directory / "README.md").read_text(encoding='utf-8')
+readme_path = this_directory / "README.md"
+# Decode in one pass; tolerate a missing README (e.g. stripped source trees)
+long_description = (
+    readme_path.read_bytes().decode('utf-8', errors='replace')
+    if readme_path.exists() else ''
+)
 
 setup(
     name='dxf-geoprocessing-bot',
@@ -29,8 +34,15 @@ setup(
         'chardet>=5.0.0',
         'Pillow>=10.0.0',
         'requests>=2.31.0',
+        'orjson>=3.9.0',
     ],
     extras_require={
+        'speedups': [
+            'uvloop>=0.17.0; sys_platform != "win32"',
+            'pyarrow>=14.0.0',
+            'faust-cchardet>=2.1.19',
+            'numba>=0.59.0',
+        ],
         'dev': [
             'pytest>=7.4.0',
             'pytest-asyncio>=0.21.0',
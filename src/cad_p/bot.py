@@ -1,7 +1,13 @@
 """Main entry point for CAD-P Telegram bot."""
 
+import asyncio
+import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
 from telegram.ext import Application
+from telegram.request import HTTPXRequest
 
 from .config import config
 from .logging_config import setup_logging, get_logger
@@ -11,6 +17,59 @@ from .dependencies import container
 logger = get_logger(__name__)
 
 
+class _OrjsonRequest(HTTPXRequest):
+    """HTTPX request backend that parses Bot API responses with orjson."""
+    
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> dict:
+        """Parse a Telegram response, deferring to PTB for malformed payloads."""
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Lets PTB decode invalid UTF-8 with replacement and log bad JSON
+            return HTTPXRequest.parse_json_payload(payload)
+
+
+def _install_uvloop() -> bool:
+    """Use uvloop for the event loop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def _format_startup_banner() -> str:
+    """Render the configuration summary logged at startup as one record."""
+    return "\n".join((
+        "=" * 60,
+        "CAD-P Bot Configuration:",
+        f"  Log Level: {config.LOG_LEVEL}",
+        f"  Debug Mode: {config.DEBUG}",
+        f"  Development Mode: {config.DEVELOPMENT_MODE}",
+        f"  Max File Size: {config.MAX_FILE_SIZE_MB} MB",
+        f"  Max Points: {config.MAX_POINTS:,}",
+        f"  Temp Directory: {config.TEMP_DIR}",
+        f"  Output Directory: {config.OUTPUT_DIR}",
+        "Feature Flags:",
+        f"  Densification: {config.ENABLE_DENSIFICATION}",
+        f"  TIN: {config.ENABLE_TIN}",
+        f"  Code Catalog: {config.ENABLE_CODE_CATALOG}",
+        f"  File Validation: {config.ENABLE_FILE_VALIDATION}",
+        f"  Auto Encoding Detection: {config.ENABLE_AUTO_ENCODING_DETECTION}",
+        "=" * 60,
+    ))
+
+
+@lru_cache(maxsize=None)
+def get_conversation_handler():
+    """Build the conversation handler tree once and reuse it afterwards."""
+    # Imported here to avoid circular imports
+    from .bot.handlers import create_conversation_handler
+    return create_conversation_handler()
+
+
 def main():
     """Start the CAD-P bot."""
     # Setup logging
@@ -20,19 +79,12 @@ def main():
     # Validate configuration
     config_errors = config.validate()
     if config_errors:
-        logger.error("Configuration errors:")
-        for error in config_errors:
-            logger.error(f"  - {error}")
+        logger.error(
+            "Configuration errors:\n%s",
+            "\n".join(f"  - {error}" for error in config_errors)
+        )
         sys.exit(1)
     
-    # Ensure required directories exist
-    logger.info("Ensuring required directories exist...")
-    config.ensure_directories()
-    
-    # Initialize services
-    logger.info("Initializing services...")
-    container.initialize_services()
-    
     # Check if we have a bot token
     if not config.BOT_TOKEN:
         logger.error(
@@ -41,42 +93,55 @@ def main():
         )
         sys.exit(1)
     
-    # Create application
-    logger.info("Creating Telegram application...")
-    application = Application.builder().token(config.BOT_TOKEN).build()
+    # run_polling creates its loop from the current policy
+    if _install_uvloop():
+        logger.info("Using uvloop event loop")
     
-    # Add handlers (import here to avoid circular imports)
-    try:
-        from .bot.handlers import create_conversation_handler
+    # Service setup is dominated by importing the numeric stack, so it runs
+    # in a worker thread while directories and the application are prepared
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        logger.info("Initializing services...")
+        services_ready = executor.submit(container.initialize_services)
+        
+        # Ensure required directories exist
+        logger.info("Ensuring required directories exist...")
+        config.ensure_directories()
         
+        # Create application
+        logger.info("Creating Telegram application...")
+        # No handler schedules jobs, so skip creating the APScheduler-backed JobQueue.
+        # Bot API calls (sendMessage, answerCallbackQuery, getFile, ...) share one
+        # pooled HTTP client so TLS connections are reused across conversations.
+        request = _OrjsonRequest(
+            connection_pool_size=config.HTTP_CONNECTION_POOL_SIZE,
+            pool_timeout=config.HTTP_POOL_TIMEOUT_SECONDS,
+            http_version=config.HTTP_VERSION,
+        )
+        application = (
+            Application.builder()
+            .token(config.BOT_TOKEN)
+            .job_queue(None)
+            .request(request)
+            .build()
+        )
+        
+        # Re-raises any error from service initialization
+        services_ready.result()
+    
+    # Add handlers
+    try:
         logger.info("Adding conversation handlers...")
-        conv_handler = create_conversation_handler()
-        application.add_handler(conv_handler)
+        application.add_handler(get_conversation_handler())
     except ImportError as e:
         logger.warning(f"Could not import handlers: {e}")
         logger.warning("Bot will start without handlers (placeholder mode)")
     
-    # Log startup information
-    logger.info("=" * 60)
-    logger.info("CAD-P Bot Configuration:")
-    logger.info(f"  Log Level: {config.LOG_LEVEL}")
-    logger.info(f"  Debug Mode: {config.DEBUG}")
-    logger.info(f"  Development Mode: {config.DEVELOPMENT_MODE}")
-    logger.info(f"  Max File Size: {config.MAX_FILE_SIZE_MB} MB")
-    logger.info(f"  Max Points: {config.MAX_POINTS:,}")
-    logger.info(f"  Temp Directory: {config.TEMP_DIR}")
-    logger.info(f"  Output Directory: {config.OUTPUT_DIR}")
-    logger.info("Feature Flags:")
-    logger.info(f"  Densification: {config.ENABLE_DENSIFICATION}")
-    logger.info(f"  TIN: {config.ENABLE_TIN}")
-    logger.info(f"  Code Catalog: {config.ENABLE_CODE_CATALOG}")
-    logger.info(f"  File Validation: {config.ENABLE_FILE_VALIDATION}")
-    logger.info(f"  Auto Encoding Detection: {config.ENABLE_AUTO_ENCODING_DETECTION}")
-    logger.info("=" * 60)
+    # Log startup information; the banner is only built if it will be emitted
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%s", _format_startup_banner())
     
     # Start bot
-    logger.info("Starting bot polling...")
-    logger.info("Bot is ready to receive messages!")
+    logger.info("Starting bot polling...\nBot is ready to receive messages!")
     
     try:
         application.run_polling(allowed_updates=['message', 'callback_query'])
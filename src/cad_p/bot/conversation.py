@@ -1,9 +1,59 @@
 """Conversation handlers for densification and TIN configuration."""
 
+import re
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any, List
 from src.models.settings import DensificationSettings, InterpolationMethod, TINSettings, TINCodeSelection
 
 
+def _keyword_table(entries):
+    """
+    Compile (keywords, value) entries, highest priority first, into one pattern.
+    
+    Each entry becomes a numbered group, so a single scan of the input finds
+    every keyword and the group number tells which entry it belongs to.
+    """
+    pattern = re.compile(
+        '|'.join(f'({keywords})' for keywords, _ in entries), re.IGNORECASE
+    )
+    return pattern, tuple(value for _, value in entries)
+
+
+# Keyword tables for free-text answers, in priority order; the highest
+# priority entry found anywhere in the input wins, regardless of case.
+_INTERPOLATION_KEYWORDS = _keyword_table((
+    ('cubic|кубич', InterpolationMethod.CUBIC),
+    ('nearest|ближайш', InterpolationMethod.NEAREST),
+))
+
+_LAYER_VISIBILITY_KEYWORDS = _keyword_table((
+    ('оба|both|все', (True, True)),
+    ('треуг|triangle', (True, False)),
+    ('точ|point', (False, True)),
+))
+
+_CODE_SELECTION_KEYWORDS = _keyword_table((
+    ('рельеф|terrain', TINCodeSelection.TERRAIN_ONLY),
+    ('лини|breakline', TINCodeSelection.WITH_BREAKLINES),
+    ('пользов|custom', TINCodeSelection.CUSTOM),
+))
+
+_YES_RE = re.compile('^y|да|yes', re.IGNORECASE)
+
+
+def _match_keywords(user_input: str, table, default):
+    """Return the value of the highest priority keyword found in the input."""
+    pattern, values = table
+    best = None
+    for match in pattern.finditer(user_input):
+        if best is None or match.lastindex < best:
+            best = match.lastindex
+            if best == 1:
+                break
+    return default if best is None else values[best - 1]
+
+
 class DensificationConversation:
     """Manages conversation flow for densification settings."""
     
@@ -20,8 +70,14 @@ class DensificationConversation:
         )
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def get_grid_spacing_prompt(current_spacing: float = 5.0) -> str:
-        """Get prompt for grid spacing configuration."""
+        """
+        Get prompt for grid spacing configuration.
+        
+        The other prompts are literal constants already; this one depends on
+        the spacing, so each distinct value is rendered once and reused.
+        """
         return (
             f"📏 **Шаг сетки (Grid Spacing)**\n\n"
             f"Текущее значение: {current_spacing} м\n\n"
@@ -93,27 +149,13 @@ class DensificationConversation:
     @staticmethod
     def parse_interpolation_method(user_input: str) -> InterpolationMethod:
         """Parse user input for interpolation method."""
-        input_lower = user_input.lower()
-        if 'cubic' in input_lower or 'кубич' in input_lower:
-            return InterpolationMethod.CUBIC
-        elif 'nearest' in input_lower or 'ближайш' in input_lower:
-            return InterpolationMethod.NEAREST
-        else:
-            return InterpolationMethod.LINEAR
+        return _match_keywords(user_input, _INTERPOLATION_KEYWORDS, InterpolationMethod.LINEAR)
     
     @staticmethod
     def parse_layer_visibility(user_input: str) -> Dict[str, bool]:
         """Parse user input for layer visibility."""
-        input_lower = user_input.lower()
-        
-        if 'оба' in input_lower or 'both' in input_lower or 'все' in input_lower:
-            return {'triangles': True, 'points': True}
-        elif 'треуг' in input_lower or 'triangle' in input_lower:
-            return {'triangles': True, 'points': False}
-        elif 'точ' in input_lower or 'point' in input_lower:
-            return {'triangles': False, 'points': True}
-        else:
-            return {'triangles': True, 'points': True}
+        triangles, points = _match_keywords(user_input, _LAYER_VISIBILITY_KEYWORDS, (True, True))
+        return {'triangles': triangles, 'points': points}
     
     @staticmethod
     def get_processing_message(stats: Dict[str, Any]) -> str:
@@ -121,23 +163,32 @@ class DensificationConversation:
         if stats.get('skipped', False):
             return "⏭️ Денсификация пропущена."
         
-        original = stats.get('original_points', 0)
-        generated = stats.get('generated_points', 0)
-        regions = stats.get('sparse_regions_found', 0)
-        
-        message = f"✅ **Денсификация завершена**\n\n"
-        message += f"📊 Исходных точек: {original}\n"
-        message += f"➕ Добавлено точек: {generated}\n"
-        message += f"🔍 Найдено разреженных областей: {regions}\n"
+        return DensificationConversation._processing_message(
+            stats.get('original_points', 0),
+            stats.get('generated_points', 0),
+            stats.get('sparse_regions_found', 0),
+            bool(stats.get('limited_by_max', False))
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _processing_message(original: int, generated: int, regions: int, limited: bool) -> str:
+        """Render the densification result once per distinct set of numbers."""
+        lines = [
+            "✅ **Денсификация завершена**\n\n",
+            f"📊 Исходных точек: {original}\n",
+            f"➕ Добавлено точек: {generated}\n",
+            f"🔍 Найдено разреженных областей: {regions}\n",
+        ]
         
-        if stats.get('limited_by_max', False):
-            message += f"\n⚠️ Ограничено максимальным количеством точек\n"
+        if limited:
+            lines.append("\n⚠️ Ограничено максимальным количеством точек\n")
         
         if generated > 0:
             percentage = (generated / original) * 100
-            message += f"\n📈 Увеличение плотности: +{percentage:.1f}%\n"
+            lines.append(f"\n📈 Увеличение плотности: +{percentage:.1f}%\n")
         
-        return message
+        return ''.join(lines)
     
     @staticmethod
     def get_defaults_documentation() -> str:
@@ -164,6 +215,14 @@ class DensificationConversation:
 class TINConversation:
     """Manages conversation flow for TIN configuration."""
     
+    # Summary labels for the preset code selections
+    _CODE_SELECTION_LABELS = MappingProxyType({
+        TINCodeSelection.ALL: "Все точки",
+        TINCodeSelection.TERRAIN_ONLY: "Только рельеф",
+        TINCodeSelection.WITH_BREAKLINES: "С учётом структурных линий",
+        TINCodeSelection.CUSTOM: "Пользовательский набор",
+    })
+    
     @staticmethod
     def get_initial_prompt() -> str:
         """Get initial prompt for TIN configuration."""
@@ -224,6 +283,12 @@ class TINConversation:
     @staticmethod
     def get_breakline_codes_prompt(default_codes: List[str]) -> str:
         """Get prompt for breakline code selection."""
+        return TINConversation._breakline_codes_prompt(tuple(default_codes))
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _breakline_codes_prompt(default_codes: tuple) -> str:
+        """Render the breakline code prompt once per distinct code tuple."""
         codes_str = ", ".join(default_codes)
         return (
             f"📌 **Коды структурных линий**\n\n"
@@ -252,20 +317,14 @@ class TINConversation:
     @staticmethod
     def get_summary(settings: TINSettings) -> str:
         """Get summary of configured TIN settings."""
-        code_selection_map = {
-            TINCodeSelection.ALL: "Все точки",
-            TINCodeSelection.TERRAIN_ONLY: "Только рельеф",
-            TINCodeSelection.WITH_BREAKLINES: "С учётом структурных линий",
-            TINCodeSelection.CUSTOM: "Пользовательский набор"
-        }
-        
+        code_selection = TINConversation._CODE_SELECTION_LABELS.get(settings.code_selection, 'Все')
         codes = ", ".join(settings.custom_codes) if settings.custom_codes else "не указаны"
         breakline_codes = ", ".join(settings.breakline_codes) if settings.breakline_codes else "не указаны"
         
         return (
             "📋 **Итоговые настройки TIN**\n\n"
             f"✓ Построение TIN: {'Включено' if settings.enabled else 'Выключено'}\n"
-            f"✓ Выбор кодов: {code_selection_map.get(settings.code_selection, 'Все')}\n"
+            f"✓ Выбор кодов: {code_selection}\n"
             f"✓ Коды точек: {codes}\n"
             f"✓ Структурные линии: {'Включены' if settings.use_breaklines else 'Выключены'}\n"
             f"✓ Коды breaklines: {breakline_codes}\n"
@@ -276,15 +335,7 @@ class TINConversation:
     @staticmethod
     def parse_code_selection(user_input: str) -> TINCodeSelection:
         """Parse user input for code selection."""
-        input_lower = user_input.lower()
-        if 'рельеф' in input_lower or 'terrain' in input_lower:
-            return TINCodeSelection.TERRAIN_ONLY
-        elif 'лини' in input_lower or 'breakline' in input_lower:
-            return TINCodeSelection.WITH_BREAKLINES
-        elif 'пользов' in input_lower or 'custom' in input_lower:
-            return TINCodeSelection.CUSTOM
-        else:
-            return TINCodeSelection.ALL
+        return _match_keywords(user_input, _CODE_SELECTION_KEYWORDS, TINCodeSelection.ALL)
     
     @staticmethod
     def parse_custom_codes(user_input: str) -> List[str]:
@@ -295,8 +346,7 @@ class TINConversation:
     @staticmethod
     def parse_boolean(user_input: str) -> bool:
         """Parse user input for boolean choice."""
-        input_lower = user_input.lower()
-        return 'да' in input_lower or 'yes' in input_lower or input_lower.startswith('y')
+        return _YES_RE.search(user_input) is not None
     
     @staticmethod
     def get_processing_message(stats: Dict[str, Any]) -> str:
@@ -304,13 +354,21 @@ class TINConversation:
         if stats.get('skipped', False):
             return "⏭️ Построение TIN пропущено."
         
-        triangles = stats.get('triangle_count', 0)
-        breaklines = stats.get('breakline_count', 0)
-        quality = stats.get('quality', 0.0)
-        
-        message = f"✅ **TIN построен успешно**\n\n"
-        message += f"🔺 Треугольников: {triangles}\n"
-        message += f"📊 Качество триангуляции: {quality:.3f}\n"
+        return TINConversation._processing_message(
+            stats.get('triangle_count', 0),
+            stats.get('breakline_count', 0),
+            stats.get('quality', 0.0)
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _processing_message(triangles: int, breaklines: int, quality: float) -> str:
+        """Render the TIN result once per distinct set of numbers."""
+        message = (
+            "✅ **TIN построен успешно**\n\n"
+            f"🔺 Треугольников: {triangles}\n"
+            f"📊 Качество триангуляции: {quality:.3f}\n"
+        )
         
         if breaklines > 0:
             message += f"🔗 Структурных линий учтено: {breaklines}\n"
@@ -1,20 +1,191 @@
 """File parsing with encoding detection and validation."""
 
+import codecs
+import csv
+import os
+import numpy as np
 import pandas as pd
-import chardet
 import logging
+from functools import lru_cache
+from itertools import product, repeat
 from pathlib import Path
 from typing import Tuple, Optional, List, Dict, Any
-from src.models.bot_data import ParsedData, ColumnMapping
+from src.models.bot_data import ENCODING_SAMPLE_SIZE, ParsedData, ColumnMapping
+
+try:
+    import cchardet as chardet  # compiled detector, see the 'speedups' extra
+except ImportError:
+    import chardet
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional speedup, see the 'speedups' extra
+    pa = pacsv = None
 
 logger = logging.getLogger(__name__)
 
+# Byte order marks, longest first so UTF-32 LE is not mistaken for UTF-16 LE
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Delimiter candidates in tie-break order (between equal per-line counts);
+# space goes last because it also appears inside free-text comments
+_DELIMITER_PRIORITY = ('\t', ';', ',', '|', ' ')
+
+# Maximum coefficient of variation of per-line counts for a "consistent" delimiter
+_DELIMITER_MAX_VARIATION = 0.1
+
+# Characters that must encode to themselves for byte-level delimiter counting
+_ASCII_PROBE = ' \t,;|#\n'
+
+# Leading bytes inspected by the .xyz fast path
+_XYZ_FAST_PATH_BYTES = 4096
+
+# Bytes deleted by the ASCII check; anything left over is non-ASCII
+_ASCII_BYTES = bytes(range(128))
+
+# Bytes that rule out a plain space-separated file (NUL: BOM-less UTF-16)
+_NON_SPACE_SEPARATORS = (b'\t', b',', b';', b'|', b'\x00')
+
+
+@lru_cache(maxsize=8)
+def _read_sample_cached(path: str, mtime_ns: int, size: int, sample_size: int) -> bytes:
+    """Read the leading bytes of a file (cached by file identity)."""
+    with open(path, 'rb') as f:
+        return f.read(sample_size)
+
+
+@lru_cache(maxsize=128)
+def _detect_encoding_cached(path: str, mtime_ns: int, size: int, sample_size: int) -> str:
+    """Detect a file's encoding (cached by file identity)."""
+    return FileParser.detect_encoding_from_bytes(
+        _read_sample_cached(path, mtime_ns, size, sample_size), sample_size
+    )
+
+
+@lru_cache(maxsize=128)
+def _detect_delimiter_cached(path: str, mtime_ns: int, size: int, encoding: str, sample_lines: int) -> str:
+    """Detect a file's delimiter (cached by file identity)."""
+    sample = _read_sample_cached(path, mtime_ns, size, ENCODING_SAMPLE_SIZE)
+    if _ascii_compatible(encoding) and FileParser.fast_path_xyz(Path(path), sample):
+        return ' '
+    return FileParser._delimiter_from_sample(sample, encoding, sample_lines)
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    """Check whether delimiters can be counted directly on raw bytes."""
+    try:
+        return _ASCII_PROBE.encode(encoding) == _ASCII_PROBE.encode('ascii')
+    except (LookupError, UnicodeError):
+        return False
+
 
 class FileParsingError(Exception):
     """Exception raised for file parsing errors."""
     pass
 
 
+# Rows converted per pandas chunk in parse_file
+_PARSE_CHUNK_ROWS = 100_000
+
+# Stripped cell texts treated as missing: empty, or 'nan' in any letter case
+_MISSING_TEXT = frozenset({''} | {''.join(chars) for chars in product('nN', 'aA', 'nN')})
+
+
+def _text_values(column: pd.Series) -> np.ndarray:
+    """Strip a text column, mapping empty and 'nan' cells to None."""
+    values = column.str.strip()
+    values = values.where(values.notna() & ~values.isin(_MISSING_TEXT), None)
+    return values.to_numpy(dtype=object, na_value=None)
+
+
+def _join_text_columns(columns: List[pd.Series], n_rows: int) -> np.ndarray:
+    """
+    Join text columns row-wise with single spaces, skipping missing cells.
+    
+    Works one column at a time on whole arrays instead of joining row by
+    row; rows with no text at all become None.
+    """
+    joined = np.full(n_rows, None, dtype=object)
+    for column in columns:
+        right = _text_values(column)
+        has_left = pd.notna(joined)
+        both = has_left & pd.notna(right)
+        merged = np.where(has_left, joined, right)
+        merged[both] = joined[both] + ' ' + right[both]
+        joined = merged
+    return joined
+
+
+def _to_float(column: pd.Series) -> np.ndarray:
+    """
+    Convert a text column to float64, with NaN where a value does not parse.
+    
+    pandas finds the parseable cells; those are then converted by NumPy,
+    which rounds exactly like float() where pandas may be off by one ulp.
+    """
+    values = column.str.strip()
+    parsed = np.array(pd.to_numeric(values, errors='coerce'), dtype=np.float64)
+    ok = ~np.isnan(parsed)
+    parsed[ok] = values.to_numpy(dtype=object)[ok].astype(np.float64)
+    return parsed
+
+
+def _coordinate_error(values) -> str:
+    """Describe why a row's coordinate strings could not be converted."""
+    for value in values:
+        if not isinstance(value, str):
+            return "missing coordinate value"
+        try:
+            float(value)
+        except ValueError as e:
+            return str(e)
+    return "unsupported number format"
+
+
+def _read_xyz_arrow(
+    file_path: Path,
+    encoding: str,
+    delimiter: str,
+    usecols: Tuple[int, int, int]
+) -> Optional[np.ndarray]:
+    """
+    Read the coordinate columns with Arrow's multithreaded CSV reader.
+    
+    Arrow has no comment or whitespace-run handling, so it only accepts
+    clean rectangular files; anything else (and a missing pyarrow) returns
+    None and is left to np.loadtxt.
+    """
+    if pacsv is None:
+        return None
+    
+    names = [f'f{col}' for col in usecols]
+    try:
+        table = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(autogenerate_column_names=True, encoding=encoding),
+            parse_options=pacsv.ParseOptions(delimiter=delimiter),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=list(dict.fromkeys(names)),
+                column_types=dict.fromkeys(names, pa.float64())
+            )
+        )
+    except (pa.ArrowException, ValueError, KeyError) as e:
+        logger.debug(f"Arrow reader rejected {file_path}: {e}")
+        return None
+    
+    columns = [table.column(name) for name in names]
+    if table.num_rows == 0 or any(column.null_count for column in columns):
+        return None
+    return np.column_stack([column.to_numpy() for column in columns])
+
+
 class FileParser:
     """Handles file parsing with encoding detection and validation."""
     
@@ -24,90 +195,211 @@ class FileParser:
     # Maximum file size in bytes (50MB)
     MAX_FILE_SIZE = 50 * 1024 * 1024
     
-    # Supported extensions
-    SUPPORTED_EXTENSIONS = ['.txt', '.xyz']
+    # Supported extensions (lowercase, for O(1) membership checks)
+    SUPPORTED_EXTENSIONS = frozenset({'.txt', '.xyz'})
     
     @staticmethod
-    def detect_encoding(file_path: Path) -> str:
+    def fast_path_xyz(file_path: Path, sample: Optional[bytes] = None) -> Optional[Tuple[str, str]]:
         """
-        Detect file encoding using chardet.
+        Recognise a plain space-separated ASCII .xyz file without detection.
+        
+        Only the first 4 KiB are checked; ASCII is reported as utf-8, its
+        superset, as detect_encoding does.
+        
+        Args:
+            file_path: Path to file (only the extension is checked when a sample is given)
+            sample: Leading bytes of the file, if already in memory
+            
+        Returns:
+            Tuple of (encoding, delimiter), or None if detection is needed
+        """
+        if file_path.suffix.lower() != '.xyz':
+            return None
+        
+        if sample is None:
+            with open(file_path, 'rb') as f:
+                sample = f.read(_XYZ_FAST_PATH_BYTES)
+        else:
+            sample = bytes(sample[:_XYZ_FAST_PATH_BYTES])
+        
+        if sample.translate(None, _ASCII_BYTES):
+            return None
+        if any(separator in sample for separator in _NON_SPACE_SEPARATORS):
+            return None
+        return 'utf-8', ' '
+    
+    @staticmethod
+    def detect_encoding(file_path: Path, sample_size: int = ENCODING_SAMPLE_SIZE) -> str:
+        """
+        Detect file encoding from a bounded sample of the file.
+        
+        A byte order mark short-circuits detection; otherwise only the first
+        ``sample_size`` bytes are fed to chardet, so detection cost does not
+        grow with the file size.
+        Results are cached by path, modification time and size, so repeated
+        calls for an unchanged file skip detection.
         
         Args:
             file_path: Path to file
+            sample_size: Maximum number of bytes to inspect
             
         Returns:
             Detected encoding name
         """
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read(10000)  # Read first 10KB for detection
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                confidence = result['confidence']
-                
-                logger.info(f"Detected encoding: {encoding} (confidence: {confidence:.2f})")
-                
-                # Default to utf-8 if confidence is too low
-                if confidence < 0.7:
-                    logger.warning(f"Low confidence ({confidence:.2f}), defaulting to utf-8")
-                    return 'utf-8'
-                
-                return encoding or 'utf-8'
+            st = os.stat(file_path)
+            return _detect_encoding_cached(os.fspath(file_path), st.st_mtime_ns, st.st_size, sample_size)
         except Exception as e:
             logger.error(f"Error detecting encoding: {e}")
             return 'utf-8'
     
     @staticmethod
-    def detect_delimiter(file_path: Path, encoding: str = 'utf-8', sample_lines: int = 10) -> str:
+    def detect_encoding_from_bytes(data: bytes, sample_size: int = ENCODING_SAMPLE_SIZE) -> str:
         """
-        Detect delimiter by analyzing first few lines.
+        Detect the encoding of content that is already in memory.
+        
+        Lets a freshly downloaded file be inspected without reading it back
+        from disk. Only the first ``sample_size`` bytes are used.
         
         Args:
-            file_path: Path to file
-            encoding: File encoding
-            sample_lines: Number of lines to sample
+            data: File content or its leading bytes
+            sample_size: Maximum number of bytes to inspect
             
         Returns:
-            Detected delimiter
+            Detected encoding name
         """
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                lines = []
-                for i, line in enumerate(f):
-                    if i >= sample_lines:
-                        break
-                    line = line.strip()
-                    # Skip comments and empty lines
-                    if line and not line.startswith('#'):
-                        lines.append(line)
+            sample = bytes(data[:sample_size])
+            for bom, bom_encoding in _BOM_ENCODINGS:
+                if sample.startswith(bom):
+                    logger.info(f"Detected encoding from BOM: {bom_encoding}")
+                    return bom_encoding
             
-            if not lines:
-                return ' '
+            # Most uploads are plain UTF-8 (or ASCII); a strict decode settles
+            # that without chardet. final=False tolerates a character cut off
+            # at the end of the sample.
+            try:
+                codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            except UnicodeDecodeError:
+                pass
+            else:
+                logger.info("Detected encoding: utf-8 (strict decode)")
+                return 'utf-8'
             
-            # Count occurrences of each delimiter
-            delimiter_counts = {}
-            for delimiter in FileParser.DELIMITERS:
-                counts = [line.count(delimiter) for line in lines]
-                # Check consistency: all lines should have similar counts
-                if counts and max(counts) > 0:
-                    avg_count = sum(counts) / len(counts)
-                    consistency = 1 - (max(counts) - min(counts)) / (max(counts) + 1)
-                    delimiter_counts[delimiter] = (avg_count, consistency)
+            detector = chardet.UniversalDetector()
+            for start in range(0, len(sample), 4096):
+                detector.feed(sample[start:start + 4096])
+                if detector.done:
+                    break
+            detector.close()
             
-            # Choose delimiter with highest average count and consistency
-            if delimiter_counts:
-                best_delimiter = max(
-                    delimiter_counts.items(),
-                    key=lambda x: x[1][0] * x[1][1]  # avg_count * consistency
-                )[0]
-                logger.info(f"Detected delimiter: {repr(best_delimiter)}")
-                return best_delimiter
+            encoding = detector.result['encoding']
+            confidence = detector.result['confidence'] or 0.0
             
-            return ' '
+            logger.info(f"Detected encoding: {encoding} (confidence: {confidence:.2f})")
+            
+            # Default to utf-8 if confidence is too low
+            if confidence < 0.7:
+                logger.warning(f"Low confidence ({confidence:.2f}), defaulting to utf-8")
+                return 'utf-8'
+            
+            # ASCII is a subset of utf-8; prefer the superset for later rows
+            if not encoding or encoding.lower() == 'ascii':
+                return 'utf-8'
+            
+            return encoding
+        except Exception as e:
+            logger.error(f"Error detecting encoding: {e}")
+            return 'utf-8'
+    
+    @staticmethod
+    def detect_delimiter(file_path: Path, encoding: str = 'utf-8', sample_lines: int = 200) -> str:
+        """
+        Detect delimiter from per-line byte counts in the file sample.
+        
+        A delimiter is consistent when it occurs on every sampled line with a
+        near-constant count; among consistent candidates the one with the
+        highest mean count per line wins, and priority order only breaks
+        ties. If none is consistent, the most frequent and stable candidate
+        wins. Results are cached by path, modification time and size.
+        
+        Args:
+            file_path: Path to file
+            encoding: File encoding
+            sample_lines: Number of lines to sample
+            
+        Returns:
+            Detected delimiter
+        """
+        try:
+            st = os.stat(file_path)
+            return _detect_delimiter_cached(
+                os.fspath(file_path), st.st_mtime_ns, st.st_size, encoding, sample_lines
+            )
         except Exception as e:
             logger.error(f"Error detecting delimiter: {e}")
             return ' '
     
+    @staticmethod
+    def _delimiter_from_sample(sample: bytes, encoding: str, sample_lines: int) -> str:
+        """Pick the delimiter for a file from its leading bytes."""
+        truncated = len(sample) >= ENCODING_SAMPLE_SIZE
+        
+        if not _ascii_compatible(encoding):
+            sample = sample.decode(encoding, errors='ignore').encode('utf-8')
+        
+        raw_lines = sample.split(b'\n')
+        if truncated:
+            raw_lines = raw_lines[:-1]  # last line may be cut mid-row
+        
+        lines = []
+        for line in raw_lines:
+            line = line.strip()
+            # Skip comments and empty lines
+            if line and not line.startswith(b'#'):
+                lines.append(line)
+                if len(lines) >= sample_lines:
+                    break
+        
+        if not lines:
+            return ' '
+        
+        # One scan over the whole sample rules out absent candidates
+        # before any per-line counting
+        present = b'\n'.join(lines)
+        
+        consistent = {}
+        fallback_scores = {}
+        for delimiter in _DELIMITER_PRIORITY:
+            needle = delimiter.encode('ascii')
+            if needle not in present:
+                continue
+            
+            counts = list(map(bytes.count, lines, repeat(needle, len(lines))))
+            max_count = max(counts)
+            mean = sum(counts) / len(counts)
+            variance = sum(c * c for c in counts) / len(counts) - mean * mean
+            if min(counts) > 0 and max(variance, 0.0) ** 0.5 / mean < _DELIMITER_MAX_VARIATION:
+                consistent[delimiter] = mean
+                continue
+            
+            consistency = 1 - (max_count - min(counts)) / (max_count + 1)
+            fallback_scores[delimiter] = mean * consistency
+        
+        # A comma or semicolon inside a comment column can be just as
+        # consistent as the real separator, so the most frequent one wins
+        if consistent:
+            best_delimiter = max(consistent, key=consistent.get)
+            logger.info(f"Detected delimiter: {repr(best_delimiter)}")
+            return best_delimiter
+        
+        if fallback_scores:
+            best_delimiter = max(fallback_scores, key=fallback_scores.get)
+            logger.info(f"Detected delimiter: {repr(best_delimiter)}")
+            return best_delimiter
+        
+        return ' '
+    
     @staticmethod
     def validate_file(file_path: Path) -> Tuple[bool, str]:
         """
@@ -121,10 +413,21 @@ class FileParser:
         """
         # Check extension
         if file_path.suffix.lower() not in FileParser.SUPPORTED_EXTENSIONS:
-            return False, f"Unsupported file extension. Supported: {', '.join(FileParser.SUPPORTED_EXTENSIONS)}"
+            return False, f"Unsupported file extension. Supported: {', '.join(sorted(FileParser.SUPPORTED_EXTENSIONS))}"
         
-        # Check size
-        file_size = file_path.stat().st_size
+        return FileParser.validate_size(file_path.stat().st_size)
+    
+    @staticmethod
+    def validate_size(file_size: int) -> Tuple[bool, str]:
+        """
+        Validate the size of file content.
+        
+        Args:
+            file_size: Content size in bytes
+            
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
         if file_size > FileParser.MAX_FILE_SIZE:
             max_mb = FileParser.MAX_FILE_SIZE / (1024 * 1024)
             return False, f"File too large. Maximum size: {max_mb}MB"
@@ -156,93 +459,70 @@ class FileParser:
             ParsedData object with parsed points and statistics
         """
         try:
-            # Read file with pandas
-            df = pd.read_csv(
-                file_path,
+            read_options = dict(
                 sep=delimiter,
                 encoding=encoding,
                 comment='#' if skip_comments else None,
                 header=None,
-                dtype=str,  # Read as string first
+                dtype=str,  # Coordinates stay text so bad rows can be reported
                 skipinitialspace=True,
-                on_bad_lines='skip'
+                engine='c'
             )
             
-            total_rows = len(df)
-            
-            if total_rows == 0:
-                raise FileParsingError("No valid data rows found")
+            usecols = None
+            if column_mapping.comment_col is None:
+                # Without a comment column only the mapped columns are needed;
+                # the first row gives the width pandas will use
+                n_cols = pd.read_csv(file_path, nrows=1, **read_options).shape[1]
+                usecols = sorted({
+                    col for col in (
+                        column_mapping.x_col, column_mapping.y_col, column_mapping.z_col,
+                        column_mapping.name_col, column_mapping.code_col
+                    )
+                    if col is not None and col < n_cols
+                })
             
-            # Validate required columns exist
-            max_col = max(column_mapping.x_col, column_mapping.y_col, column_mapping.z_col)
-            if max_col >= df.shape[1]:
-                raise FileParsingError(
-                    f"File has only {df.shape[1]} columns, but mapping requires {max_col + 1}"
-                )
+            # Read file with pandas in chunks so only one chunk of text is
+            # held in memory next to the accumulated coordinate arrays
+            reader = pd.read_csv(
+                file_path,
+                usecols=usecols,
+                on_bad_lines='skip',
+                chunksize=_PARSE_CHUNK_ROWS,
+                **read_options
+            )
             
-            points = []
-            invalid_rows = 0
-            anomalies = []
+            total_rows = 0
             warnings = []
-            
-            for idx, row in df.iterrows():
-                try:
-                    # Extract coordinates
-                    x_str = str(row[column_mapping.x_col]).strip()
-                    y_str = str(row[column_mapping.y_col]).strip()
-                    z_str = str(row[column_mapping.z_col]).strip()
-                    
-                    # Convert to float
-                    x = float(x_str)
-                    y = float(y_str)
-                    z = float(z_str)
-                    
-                    # Round Z to 2 decimals
-                    z = round(z, 2)
+            anomalies = []
+            parts = []
+            with reader:
+                for df in reader:
+                    if usecols is None:
+                        n_cols = df.shape[1]
                     
-                    # Check for anomalies
-                    if abs(x) > 1e8 or abs(y) > 1e8 or abs(z) > 1e6:
-                        anomalies.append(
-                            f"Row {idx + 1}: Unusually large coordinate values (X={x}, Y={y}, Z={z})"
+                    # Validate required columns exist
+                    max_col = max(column_mapping.x_col, column_mapping.y_col, column_mapping.z_col)
+                    if max_col >= n_cols:
+                        raise FileParsingError(
+                            f"File has only {n_cols} columns, but mapping requires {max_col + 1}"
                         )
                     
-                    # Extract optional fields
-                    point = {
-                        'x': x,
-                        'y': y,
-                        'z': z
-                    }
-                    
-                    # Name
-                    if column_mapping.name_col is not None and column_mapping.name_col < df.shape[1]:
-                        name = str(row[column_mapping.name_col]).strip()
-                        if name and name.lower() != 'nan':
-                            point['name'] = name
-                    
-                    # Code
-                    if column_mapping.code_col is not None and column_mapping.code_col < df.shape[1]:
-                        code = str(row[column_mapping.code_col]).strip()
-                        if code and code.lower() != 'nan':
-                            point['code'] = code
-                    
-                    # Comment
-                    if column_mapping.comment_col is not None and column_mapping.comment_col < df.shape[1]:
-                        # Combine remaining columns as comment
-                        comment_parts = []
-                        for col_idx in range(column_mapping.comment_col, df.shape[1]):
-                            val = str(row[col_idx]).strip()
-                            if val and val.lower() != 'nan':
-                                comment_parts.append(val)
-                        if comment_parts:
-                            point['comment'] = ' '.join(comment_parts)
-                    
-                    points.append(point)
-                    
-                except (ValueError, TypeError) as e:
-                    invalid_rows += 1
-                    warnings.append(f"Row {idx + 1}: Could not parse coordinates - {str(e)}")
+                    parts.append(FileParser._parse_chunk(
+                        df, total_rows, column_mapping, n_cols, warnings, anomalies
+                    ))
+                    total_rows += len(df)
+            
+            if total_rows == 0:
+                raise FileParsingError("No valid data rows found")
+            
+            xyz, names, codes, comments = (
+                np.concatenate(column) if column[0] is not None else None
+                for column in zip(*parts)
+            )
             
-            valid_rows = len(points)
+            valid_rows = len(xyz)
+            invalid_rows = total_rows - valid_rows
             
             # Log summary
             logger.info(
@@ -254,12 +534,15 @@ class FileParser:
                 raise FileParsingError("No valid points could be parsed from file")
             
             return ParsedData(
-                points=points,
                 total_rows=total_rows,
                 valid_rows=valid_rows,
                 invalid_rows=invalid_rows,
-                anomalies=anomalies[:10],  # Limit to first 10 anomalies
-                warnings=warnings[:10]  # Limit to first 10 warnings
+                anomalies=anomalies,  # First 10 anomalies only
+                warnings=warnings,  # First 10 warnings only
+                xyz=xyz,
+                names=names,
+                codes=codes,
+                comments=comments
             )
             
         except FileParsingError:
@@ -267,3 +550,222 @@ class FileParser:
         except Exception as e:
             logger.error(f"Error parsing file: {e}", exc_info=True)
             raise FileParsingError(f"Failed to parse file: {str(e)}")
+    
+    @staticmethod
+    def _parse_chunk(
+        df: pd.DataFrame,
+        offset: int,
+        column_mapping: ColumnMapping,
+        n_cols: int,
+        warnings: List[str],
+        anomalies: List[str]
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Convert one chunk of text rows into column arrays of its valid points.
+        
+        Warnings and anomalies are appended to the given lists until each
+        holds 10 messages; row numbers count from the start of the file.
+        
+        Returns:
+            Tuple of (xyz, names, codes, comments) for the valid rows
+        """
+        total_rows = len(df)
+        
+        # Convert whole columns at once; unparseable or missing values become NaN
+        xs, ys, zs = (
+            _to_float(df[col])
+            for col in (column_mapping.x_col, column_mapping.y_col, column_mapping.z_col)
+        )
+        valid = ~(np.isnan(xs) | np.isnan(ys) | np.isnan(zs))
+        
+        # Round Z to 2 decimals
+        zs = np.round(zs, 2)
+        
+        # Messages are formatted only for the rows that will be kept; once a
+        # list is full, later chunks skip the scan as well
+        if len(warnings) < 10:
+            for idx in np.flatnonzero(~valid)[:10 - len(warnings)]:
+                reason = _coordinate_error(
+                    df.iat[idx, df.columns.get_loc(col)]
+                    for col in (column_mapping.x_col, column_mapping.y_col, column_mapping.z_col)
+                )
+                warnings.append(f"Row {offset + idx + 1}: Could not parse coordinates - {reason}")
+        
+        if len(anomalies) < 10:
+            large = (np.abs(xs) > 1e8) | (np.abs(ys) > 1e8) | (np.abs(zs) > 1e6)
+            for idx in np.flatnonzero(large & valid)[:10 - len(anomalies)]:
+                x, y, z = xs[idx].item(), ys[idx].item(), zs[idx].item()
+                anomalies.append(
+                    f"Row {offset + idx + 1}: Unusually large coordinate values (X={x}, Y={y}, Z={z})"
+                )
+        
+        def text_column(col: Optional[int]) -> Optional[np.ndarray]:
+            if col is None:
+                return None
+            if col >= n_cols:
+                return np.full(total_rows, None, dtype=object)
+            return _text_values(df[col])
+        
+        names = text_column(column_mapping.name_col)
+        codes = text_column(column_mapping.code_col)
+        comments = None
+        if column_mapping.comment_col is not None:
+            # Combine remaining columns as comment
+            comments = _join_text_columns(
+                [df[col] for col in range(column_mapping.comment_col, n_cols)], total_rows
+            )
+        
+        xyz = np.column_stack((xs, ys, zs))[valid]
+        names, codes, comments = (
+            column[valid] if column is not None else None
+            for column in (names, codes, comments)
+        )
+        return xyz, names, codes, comments
+    
+    @staticmethod
+    def parse_file_fast(
+        file_path: Path,
+        encoding: str,
+        delimiter: str,
+        column_mapping: ColumnMapping
+    ) -> ParsedData:
+        """
+        Parse a well-formed file into columnar arrays.
+        
+        Coordinates are read in one pass, by pyarrow's CSV reader when it
+        is installed and the file is strictly rectangular, otherwise with
+        np.loadtxt; name, code and comment columns are split out of the raw
+        lines with pandas string operations. Files that loadtxt rejects
+        (header rows, unparseable values, missing columns) are handed to
+        parse_file, which reports the offending rows.
+        
+        Args:
+            file_path: Path to file
+            encoding: File encoding
+            delimiter: Column delimiter
+            column_mapping: Column mapping configuration
+            
+        Returns:
+            ParsedData with xyz/codes/comments arrays and a lazy points view
+        """
+        whitespace = delimiter.isspace()
+        usecols = (column_mapping.x_col, column_mapping.y_col, column_mapping.z_col)
+        
+        xyz = _read_xyz_arrow(file_path, encoding, delimiter, usecols)
+        if xyz is None:
+            try:
+                xyz = np.loadtxt(
+                    file_path,
+                    dtype=np.float64,
+                    delimiter=None if whitespace else delimiter,
+                    comments='#',
+                    usecols=usecols,
+                    encoding=encoding,
+                    ndmin=2
+                )
+            except (ValueError, IndexError) as e:
+                logger.debug(f"Fast parse rejected {file_path}, falling back: {e}")
+                return FileParser.parse_file(file_path, encoding, delimiter, column_mapping)
+        
+        if len(xyz) == 0:
+            return FileParser.parse_file(file_path, encoding, delimiter, column_mapping)
+        
+        xyz[:, 2] = np.round(xyz[:, 2], 2)
+        
+        names = codes = comments = None
+        string_cols = [
+            col for col in (column_mapping.name_col, column_mapping.code_col, column_mapping.comment_col)
+            if col is not None
+        ]
+        
+        if string_cols:
+            try:
+                names, codes, comments = FileParser._parse_string_columns(
+                    file_path, encoding, delimiter, column_mapping, len(xyz)
+                )
+            except ValueError as e:
+                logger.debug(f"Fast parse could not align text columns, falling back: {e}")
+                return FileParser.parse_file(file_path, encoding, delimiter, column_mapping)
+        
+        anomalies = []
+        large = (np.abs(xyz[:, 0]) > 1e8) | (np.abs(xyz[:, 1]) > 1e8) | (np.abs(xyz[:, 2]) > 1e6)
+        for idx in np.flatnonzero(large)[:10]:
+            x, y, z = xyz[idx].tolist()
+            anomalies.append(
+                f"Row {idx + 1}: Unusually large coordinate values (X={x}, Y={y}, Z={z})"
+            )
+        
+        total_rows = len(xyz)
+        logger.info(f"Parsed {total_rows} valid points from {total_rows} total rows (0 invalid)")
+        
+        return ParsedData(
+            total_rows=total_rows,
+            valid_rows=total_rows,
+            invalid_rows=0,
+            anomalies=anomalies,
+            xyz=xyz,
+            names=names,
+            codes=codes,
+            comments=comments
+        )
+    
+    @staticmethod
+    def _parse_string_columns(
+        file_path: Path,
+        encoding: str,
+        delimiter: str,
+        column_mapping: ColumnMapping,
+        expected_rows: int
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Extract name, code and comment columns as object arrays.
+        
+        Missing values are returned as None. The comment column absorbs
+        the rest of the line, as in parse_file.
+        
+        Raises:
+            ValueError: If the text rows do not line up with the coordinate rows
+        """
+        # One raw line per row; '\x1f' never occurs in coordinate files
+        lines = pd.read_csv(
+            file_path,
+            sep='\x1f',
+            encoding=encoding,
+            comment='#',
+            header=None,
+            names=['line'],
+            dtype=str,
+            quoting=csv.QUOTE_NONE,
+            engine='c'
+        )['line'].dropna()
+        lines = lines[lines.str.strip() != '']
+        
+        if len(lines) != expected_rows:
+            raise ValueError(f"{len(lines)} text rows for {expected_rows} coordinate rows")
+        
+        pattern = None if delimiter.isspace() else delimiter
+        last_col = max(
+            col for col in (column_mapping.name_col, column_mapping.code_col, column_mapping.comment_col)
+            if col is not None
+        )
+        parts = lines.str.strip().str.split(pattern, n=last_col, expand=True)
+        
+        def column(col: Optional[int], rest: bool = False) -> Optional[np.ndarray]:
+            if col is None:
+                return None
+            if col >= parts.shape[1]:
+                return np.full(expected_rows, None, dtype=object)
+            
+            values = parts[col]
+            if rest and col == last_col:
+                values = values.map(
+                    lambda v: ' '.join(p.strip() for p in v.split(pattern) if p.strip())
+                    if isinstance(v, str) else v
+                )
+            return _text_values(values)
+        
+        return (
+            column(column_mapping.name_col),
+            column(column_mapping.code_col),
+            column(column_mapping.comment_col, rest=True)
+        )
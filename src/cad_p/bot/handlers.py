@@ -1,8 +1,15 @@
 """Async conversation handlers for the Telegram bot."""
 
+import asyncio
 import logging
+import os
+import re
 import tempfile
+import time
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
@@ -30,12 +37,272 @@ logger = logging.getLogger(__name__)
 TEMP_DIR = Path(tempfile.gettempdir()) / "dxf_bot_uploads"
 TEMP_DIR.mkdir(exist_ok=True)
 
+# Human-readable names of the supported column delimiters
+_DELIMITER_NAMES = MappingProxyType({
+    ' ': 'Пробел',
+    '\t': 'Табуляция',
+    ',': 'Запятая',
+    ';': 'Точка с запятой',
+    '|': 'Вертикальная черта'
+})
+
+# Delimiters are sent in callback_data as their index in this table
+_DELIMITERS = tuple(_DELIMITER_NAMES)
+_DELIMITER_TOKENS = MappingProxyType({
+    delimiter: index for index, delimiter in enumerate(_DELIMITERS)
+})
+
+# Message templates, filled with str.format
+_START_TMPL = (
+    "👋 Привет, {first_name}!\n\n"
+    "Я помогу вам обработать геодезические данные и создать DXF-файл.\n\n"
+    "🔧 **Возможности:**\n"
+    "• Импорт файлов .txt/.xyz с координатами\n"
+    "• Построение триангуляционной сети (TIN)\n"
+    "• Денсификация рельефа\n"
+    "• Обработка 60+ кодов съёмки\n"
+    "• Генерация DXF-чертежей\n\n"
+    "Начнём?\n\n"
+    "Используйте /cancel для отмены в любой момент."
+)
+
+_SESSION_EXPIRED_NOTICE = (
+    "⌛ Сессия истекла из-за долгого бездействия.\n"
+    "Пожалуйста, загрузите файл заново.\n\n"
+)
+
+_ENCODING_DETECTED_TMPL = (
+    "🔍 **Определение кодировки**\n\n"
+    "Обнаружена кодировка: **{encoding}**\n\n"
+    "Всё верно?"
+)
+
+_DELIMITER_DETECTED_TMPL = (
+    "🔍 **Определение разделителя**\n\n"
+    "Обнаружен разделитель: **{name}**\n\n"
+    "Всё верно?"
+)
+
+_PARSE_SUMMARY_TMPL = (
+    "✅ **Файл успешно обработан**\n\n"
+    "📊 **Статистика:**\n"
+    "• Всего строк: {total}\n"
+    "• Валидных точек: {valid}\n"
+    "• Невалидных строк: {invalid}\n"
+)
+
+_SAMPLE_POINT_TMPL = "• X={x:.2f}, Y={y:.2f}, Z={z:.2f}, Code={code}\n"
+
+_CONFIRMATION_TMPL = (
+    "📋 **Итоговые настройки**\n\n"
+    "📄 Файл: {filename}\n"
+    "📊 Точек: {points}\n"
+    "📐 Масштаб: 1:{scale}\n"
+    "🔺 TIN: {tin}\n"
+    "🎯 Денсификация: {densification}\n"
+    "📄 Шаблон: {template}\n\n"
+    "Всё верно? Начинаем обработку?"
+)
+
+# Indexed by a bool: _YES_NO[flag]
+_YES_NO = ('⏭️ Нет', '✅ Да')
+
+# Static inline keyboards; PTB markup objects are immutable, so one
+# instance is shared by every conversation
+_TEMPLATE_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("✅ Использовать шаблон", callback_data="template_yes"),
+        InlineKeyboardButton("⏭️ Без шаблона", callback_data="template_no")
+    ]
+])
+
+_MANUAL_ENCODING_BUTTON = InlineKeyboardButton("🔧 Другая", callback_data="encoding_manual")
+
+_ENCODING_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("UTF-8", callback_data="encoding_utf-8")],
+    [InlineKeyboardButton("Windows-1251", callback_data="encoding_windows-1251")],
+    [InlineKeyboardButton("CP1251", callback_data="encoding_cp1251")],
+    [InlineKeyboardButton("ISO-8859-1", callback_data="encoding_iso-8859-1")],
+])
+
+_MANUAL_DELIMITER_BUTTON = InlineKeyboardButton("🔧 Другой", callback_data="delimiter_manual")
+
+_DELIMITER_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton(name, callback_data=f"delimiter_{_DELIMITER_TOKENS[delimiter]}")]
+    for delimiter, name in _DELIMITER_NAMES.items()
+])
+
+_PARSE_RESULT_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("✅ Продолжить", callback_data="parse_continue"),
+        InlineKeyboardButton("🔧 Изменить маппинг", callback_data="parse_remap")
+    ]
+])
+
+_PARSE_ERROR_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔧 Изменить параметры", callback_data="parse_retry")],
+    [InlineKeyboardButton("📤 Загрузить другой файл", callback_data="parse_reupload")]
+])
+
+_SCALE_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("1:500", callback_data="scale_500")],
+    [InlineKeyboardButton("1:1000", callback_data="scale_1000")],
+    [InlineKeyboardButton("1:2000", callback_data="scale_2000")],
+    [InlineKeyboardButton("1:5000", callback_data="scale_5000")],
+])
+
+_TIN_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("✅ Включить TIN", callback_data="tin_yes"),
+        InlineKeyboardButton("⏭️ Пропустить", callback_data="tin_no")
+    ]
+])
+
+_DENSIFICATION_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("✅ Включить денсификацию", callback_data="densify_yes"),
+        InlineKeyboardButton("⏭️ Пропустить", callback_data="densify_no")
+    ]
+])
+
+_CONFIRMATION_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("✅ Начать обработку", callback_data="confirm_yes"),
+        InlineKeyboardButton("❌ Отменить", callback_data="confirm_cancel")
+    ]
+])
+
+
+def _write_upload(file_path: Path, content: bytes) -> None:
+    """
+    Write downloaded file content, reserving its full size up front.
+    
+    Preallocation lets the filesystem place the file in as few extents as
+    possible; it is skipped where posix_fallocate is unavailable or unsupported.
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    with os.fdopen(fd, 'wb') as f:
+        if content and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, len(content))
+            except OSError:
+                pass
+        f.write(content)
+
+
+# Telegram serves at most this many file operations in parallel per bot
+_MAX_CONCURRENT_DOWNLOADS = 10
+# Time a download may wait for a slot before the user is told it is queued
+_DOWNLOAD_QUEUE_NOTICE_SECONDS = 1.0
+_download_semaphore: Optional[asyncio.Semaphore] = None
+
+
+async def _acquire_download_slot(update: Update) -> asyncio.Semaphore:
+    """
+    Wait for a free download slot, telling the user if they are queued.
+    
+    The semaphore is created on first use so it belongs to the running loop.
+    
+    Returns:
+        Acquired semaphore; the caller must release it
+    """
+    global _download_semaphore
+    if _download_semaphore is None:
+        _download_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_DOWNLOADS)
+    
+    try:
+        await asyncio.wait_for(
+            _download_semaphore.acquire(), _DOWNLOAD_QUEUE_NOTICE_SECONDS
+        )
+    except asyncio.TimeoutError:
+        await update.message.reply_text("⏳ Ваш файл в очереди, подождите...")
+        await _download_semaphore.acquire()
+    return _download_semaphore
+
+
+# Strong references to fire-and-forget cleanup tasks until they finish
+_BACKGROUND_TASKS: set = set()
+
+
+def _remove_file(file_path: Path) -> None:
+    """Delete a file, logging instead of raising on failure."""
+    try:
+        file_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not remove {file_path}: {e}")
+
+
+def _remove_file_in_background(file_path: Path) -> None:
+    """Schedule deletion of an uploaded file without making the handler wait."""
+    task = asyncio.create_task(asyncio.to_thread(_remove_file, file_path))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+# Abandoned conversations would otherwise keep their parsed points in
+# user_data for the lifetime of the bot
+_MAX_ACTIVE_SESSIONS = 10_000
+_SESSION_IDLE_SECONDS = 24 * 60 * 60
+
+# user_data dicts holding a session, least recently used first, keyed by id()
+_SESSION_ACTIVITY: "OrderedDict[int, tuple]" = OrderedDict()
+
+
+def _drop_session(user_data: dict) -> None:
+    """Discard a session and its uploaded file."""
+    _SESSION_ACTIVITY.pop(id(user_data), None)
+    session = user_data.pop('session', None)
+    if session is not None and session.file_info:
+        _remove_file_in_background(session.file_info.file_path)
+
+
+def _touch_session(user_data: dict) -> None:
+    """Mark a session as used and evict idle or least recently used ones."""
+    now = time.monotonic()
+    key = id(user_data)
+    _SESSION_ACTIVITY[key] = (now, user_data)
+    _SESSION_ACTIVITY.move_to_end(key)
+    
+    while _SESSION_ACTIVITY:
+        oldest_key, (last_used, oldest) = next(iter(_SESSION_ACTIVITY.items()))
+        if (len(_SESSION_ACTIVITY) <= _MAX_ACTIVE_SESSIONS and
+                now - last_used < _SESSION_IDLE_SECONDS):
+            break
+        del _SESSION_ACTIVITY[oldest_key]
+        _drop_session(oldest)
+
 
 def get_session_data(context: ContextTypes.DEFAULT_TYPE) -> BotSessionData:
     """Get or create session data from context."""
-    if 'session' not in context.user_data:
-        context.user_data['session'] = BotSessionData()
-    return context.user_data['session']
+    user_data = context.user_data
+    session = user_data.get('session')
+    if session is None:
+        session = user_data['session'] = BotSessionData()
+    _touch_session(user_data)
+    return session
+
+
+async def _restart_if_expired(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                              session: BotSessionData,
+                              needs_parsed_data: bool = False) -> Optional[int]:
+    """
+    Send the user back to the upload step if their session was evicted.
+    
+    Idle or least recently used sessions are dropped while the
+    conversation itself stays in its state, so a pending button can
+    arrive with a fresh, empty session.
+    
+    Returns:
+        FILE_UPLOAD if the session lacks its file (or parsed data), else None
+    """
+    if session.file_info is not None and (not needs_parsed_data or session.parsed_data is not None):
+        return None
+    return await request_file_upload(update, context, _SESSION_EXPIRED_NOTICE)
+
+
+async def _answer_and_edit(query, text: str, **kwargs) -> None:
+    """Acknowledge a callback query and edit its message concurrently."""
+    await asyncio.gather(query.answer(), query.edit_message_text(text, **kwargs))
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -45,31 +312,14 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     # Initialize session data
     get_session_data(context)
     
-    await update.message.reply_text(
-        f"👋 Привет, {user.first_name}!\n\n"
-        "Я помогу вам обработать геодезические данные и создать DXF-файл.\n\n"
-        "🔧 **Возможности:**\n"
-        "• Импорт файлов .txt/.xyz с координатами\n"
-        "• Построение триангуляционной сети (TIN)\n"
-        "• Денсификация рельефа\n"
-        "• Обработка 60+ кодов съёмки\n"
-        "• Генерация DXF-чертежей\n\n"
-        "Начнём?\n\n"
-        "Используйте /cancel для отмены в любой момент."
-    )
+    await update.message.reply_text(_START_TMPL.format(first_name=user.first_name))
     
     return await dxf_template_confirmation(update, context)
 
 
 async def dxf_template_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Ask about DXF template usage."""
-    keyboard = [
-        [
-            InlineKeyboardButton("✅ Использовать шаблон", callback_data="template_yes"),
-            InlineKeyboardButton("⏭️ Без шаблона", callback_data="template_no")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = _TEMPLATE_MARKUP
     
     message = (
         "📄 **DXF-шаблон**\n\n"
@@ -79,8 +329,7 @@ async def dxf_template_confirmation(update: Update, context: ContextTypes.DEFAUL
     )
     
     if update.callback_query:
-        await update.callback_query.answer()
-        await update.callback_query.edit_message_text(message, reply_markup=reply_markup)
+        await _answer_and_edit(update.callback_query, message, reply_markup=reply_markup)
     else:
         await update.message.reply_text(message, reply_markup=reply_markup)
     
@@ -90,28 +339,22 @@ async def dxf_template_confirmation(update: Update, context: ContextTypes.DEFAUL
 async def handle_template_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle template choice."""
     query = update.callback_query
-    await query.answer()
     
     session = get_session_data(context)
     session.use_template = (query.data == "template_yes")
     
     if session.use_template:
-        await query.edit_message_text(
-            "✅ Отлично! Система будет использовать ваш DXF-шаблон.\n\n"
-            "Теперь загрузите файл с координатами."
-        )
+        notice = "✅ Отлично! Система будет использовать ваш DXF-шаблон.\n\n"
     else:
-        await query.edit_message_text(
-            "✅ Хорошо! Будет создан стандартный DXF-файл.\n\n"
-            "Теперь загрузите файл с координатами."
-        )
+        notice = "✅ Хорошо! Будет создан стандартный DXF-файл.\n\n"
     
-    return await request_file_upload(update, context)
+    return await request_file_upload(update, context, notice)
 
 
-async def request_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Request file upload from user."""
-    message = (
+async def request_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                              notice: str = "") -> int:
+    """Request file upload from user; notice is prepended to the prompt."""
+    message = notice + (
         "📤 **Загрузка файла**\n\n"
         "Пожалуйста, загрузите файл с координатами.\n\n"
         "**Поддерживаемые форматы:**\n"
@@ -129,11 +372,7 @@ async def request_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
     
     if update.callback_query:
-        query = update.callback_query
-        await context.bot.send_message(
-            chat_id=query.message.chat_id,
-            text=message
-        )
+        await _answer_and_edit(update.callback_query, message)
     else:
         await update.message.reply_text(message)
     
@@ -152,13 +391,11 @@ async def handle_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE)
     file_name = document.file_name
     file_size = document.file_size
     
-    # Validate file extension
-    file_path = TEMP_DIR / f"{update.effective_user.id}_{file_name}"
-    
-    if file_path.suffix.lower() not in FileParser.SUPPORTED_EXTENSIONS:
+    # Validate file extension before building any path for the upload
+    if os.path.splitext(file_name)[1].lower() not in FileParser.SUPPORTED_EXTENSIONS:
         await update.message.reply_text(
             f"❌ Неподдерживаемый формат файла.\n\n"
-            f"Поддерживаются: {', '.join(FileParser.SUPPORTED_EXTENSIONS)}"
+            f"Поддерживаются: {', '.join(sorted(FileParser.SUPPORTED_EXTENSIONS))}"
         )
         return ConversationState.FILE_UPLOAD
     
@@ -171,26 +408,48 @@ async def handle_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return ConversationState.FILE_UPLOAD
     
+    file_path = TEMP_DIR / f"{update.effective_user.id}_{file_name}"
+    
     # Download file
     try:
         await update.message.reply_text("⏳ Загружаю файл...")
         
-        file = await context.bot.get_file(document.file_id)
-        await file.download_to_drive(file_path)
-        
-        # Validate file
-        is_valid, error_msg = FileParser.validate_file(file_path)
+        # Bound parallel downloads to keep memory flat and stay under
+        # Telegram's rate limits when many files arrive at once
+        semaphore = await _acquire_download_slot(update)
+        try:
+            file = await context.bot.get_file(document.file_id)
+            content = await file.download_as_bytearray()
+        finally:
+            semaphore.release()
+        
+        # The extension is already checked, so validate the downloaded
+        # size before anything is written to disk
+        is_valid, error_msg = FileParser.validate_size(len(content))
         if not is_valid:
-            file_path.unlink(missing_ok=True)
             await update.message.reply_text(f"❌ {error_msg}")
             return ConversationState.FILE_UPLOAD
         
+        # Keep the blocking disk write off the event loop so other chats
+        # are not stalled
+        await asyncio.to_thread(_write_upload, file_path, content)
+        
+        # Detect the encoding from the downloaded bytes rather than
+        # reading the file back from disk; plain ASCII .xyz files need no
+        # detection at all
+        fast_path = FileParser.fast_path_xyz(file_path, content)
+        if fast_path is not None:
+            encoding = fast_path[0]
+        else:
+            encoding = await asyncio.to_thread(FileParser.detect_encoding_from_bytes, content)
+        
         # Store file info
         session = get_session_data(context)
         session.file_info = FileUploadInfo(
             file_path=file_path,
             original_filename=file_name,
-            file_size=file_size
+            file_size=file_size,
+            encoding=encoding
         )
         
         await update.message.reply_text(
@@ -213,23 +472,27 @@ async def handle_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def detect_encoding(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Detect file encoding."""
     session = get_session_data(context)
+    expired = await _restart_if_expired(update, context, session)
+    if expired is not None:
+        return expired
     
     try:
-        encoding = FileParser.detect_encoding(session.file_info.file_path)
-        session.file_info.encoding = encoding
+        encoding = session.file_info.encoding
+        if encoding is None:
+            encoding = await asyncio.to_thread(
+                FileParser.detect_encoding, session.file_info.file_path
+            )
+            session.file_info.encoding = encoding
         
-        keyboard = [
+        reply_markup = InlineKeyboardMarkup([
             [
                 InlineKeyboardButton(f"✅ {encoding.upper()}", callback_data=f"encoding_{encoding}"),
-                InlineKeyboardButton("🔧 Другая", callback_data="encoding_manual")
+                _MANUAL_ENCODING_BUTTON
             ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        ])
         
         await update.message.reply_text(
-            f"🔍 **Определение кодировки**\n\n"
-            f"Обнаружена кодировка: **{encoding.upper()}**\n\n"
-            f"Всё верно?",
+            _ENCODING_DETECTED_TMPL.format(encoding=encoding.upper()),
             reply_markup=reply_markup
         )
         
@@ -248,72 +511,60 @@ async def detect_encoding(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def handle_encoding_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle encoding choice."""
     query = update.callback_query
-    await query.answer()
     
     session = get_session_data(context)
     
     if query.data == "encoding_manual":
-        keyboard = [
-            [InlineKeyboardButton("UTF-8", callback_data="encoding_utf-8")],
-            [InlineKeyboardButton("Windows-1251", callback_data="encoding_windows-1251")],
-            [InlineKeyboardButton("CP1251", callback_data="encoding_cp1251")],
-            [InlineKeyboardButton("ISO-8859-1", callback_data="encoding_iso-8859-1")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(
+        reply_markup = _ENCODING_MARKUP
+        
+        await _answer_and_edit(
+            query,
             "🔧 **Выбор кодировки**\n\n"
             "Выберите кодировку файла:",
             reply_markup=reply_markup
         )
         return ConversationState.ENCODING_DETECTION
     else:
+        expired = await _restart_if_expired(update, context, session)
+        if expired is not None:
+            return expired
+        
         encoding = query.data.replace("encoding_", "")
         session.file_info.encoding = encoding
         
-        await query.edit_message_text(
-            f"✅ Кодировка: {encoding.upper()}\n\n"
-            "⏳ Определяю разделитель..."
-        )
-        
-        return await detect_delimiter(update, context)
+        # Acknowledge now; the detection result edits the message once
+        await query.answer()
+        return await detect_delimiter(update, context, f"✅ Кодировка: {encoding.upper()}\n\n")
 
 
-async def detect_delimiter(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Detect column delimiter."""
+async def detect_delimiter(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                           notice: str = "") -> int:
+    """Detect column delimiter; notice is prepended to the reply."""
     session = get_session_data(context)
+    expired = await _restart_if_expired(update, context, session)
+    if expired is not None:
+        return expired
     
     try:
-        delimiter = FileParser.detect_delimiter(
+        delimiter = await asyncio.to_thread(
+            FileParser.detect_delimiter,
             session.file_info.file_path,
             session.file_info.encoding
         )
         session.file_info.delimiter = delimiter
         
-        delimiter_names = {
-            ' ': 'Пробел',
-            '\t': 'Табуляция',
-            ',': 'Запятая',
-            ';': 'Точка с запятой',
-            '|': 'Вертикальная черта'
-        }
-        
-        keyboard = [
+        delimiter_name = _DELIMITER_NAMES.get(delimiter, repr(delimiter))
+        reply_markup = InlineKeyboardMarkup([
             [
                 InlineKeyboardButton(
-                    f"✅ {delimiter_names.get(delimiter, repr(delimiter))}",
-                    callback_data=f"delimiter_{ord(delimiter)}"
+                    f"✅ {delimiter_name}",
+                    callback_data=f"delimiter_{_DELIMITER_TOKENS[delimiter]}"
                 ),
-                InlineKeyboardButton("🔧 Другой", callback_data="delimiter_manual")
+                _MANUAL_DELIMITER_BUTTON
             ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        ])
         
-        message = (
-            f"🔍 **Определение разделителя**\n\n"
-            f"Обнаружен разделитель: **{delimiter_names.get(delimiter, repr(delimiter))}**\n\n"
-            f"Всё верно?"
-        )
+        message = notice + _DELIMITER_DETECTED_TMPL.format(name=delimiter_name)
         
         if update.callback_query:
             await update.callback_query.edit_message_text(message, reply_markup=reply_markup)
@@ -324,63 +575,76 @@ async def detect_delimiter(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         
     except Exception as e:
         logger.error(f"Error detecting delimiter: {e}", exc_info=True)
+        warning = (
+            notice +
+            "⚠️ Не удалось определить разделитель.\n"
+            "Используется пробел по умолчанию."
+        )
         if update.callback_query:
-            await update.callback_query.edit_message_text(
-                "⚠️ Не удалось определить разделитель.\n"
-                "Используется пробел по умолчанию."
-            )
+            await update.callback_query.edit_message_text(warning)
         else:
-            await update.message.reply_text(
-                "⚠️ Не удалось определить разделитель.\n"
-                "Используется пробел по умолчанию."
-            )
+            await update.message.reply_text(warning)
         session.file_info.delimiter = ' '
         return await parse_and_validate(update, context)
 
 
+def _delimiter_from_callback(data: str) -> Optional[str]:
+    """Delimiter of a delimiter_<index> button, or None for an unknown token."""
+    token = data.rsplit("_", 1)[-1]
+    if not (token.isascii() and token.isdigit()):
+        return None
+    index = int(token)
+    return _DELIMITERS[index] if index < len(_DELIMITERS) else None
+
+
+async def _show_delimiter_choices(query) -> int:
+    """Show the manual delimiter keyboard."""
+    await _answer_and_edit(
+        query,
+        "🔧 **Выбор разделителя**\n\n"
+        "Выберите разделитель столбцов:",
+        reply_markup=_DELIMITER_MARKUP
+    )
+    return ConversationState.DELIMITER_DETECTION
+
+
 async def handle_delimiter_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle delimiter choice."""
     query = update.callback_query
-    await query.answer()
     
     session = get_session_data(context)
     
     if query.data == "delimiter_manual":
-        keyboard = [
-            [InlineKeyboardButton("Пробел", callback_data=f"delimiter_{ord(' ')}")],
-            [InlineKeyboardButton("Табуляция", callback_data=f"delimiter_{ord('\t')}")],
-            [InlineKeyboardButton("Запятая", callback_data=f"delimiter_{ord(',')}")],
-            [InlineKeyboardButton("Точка с запятой", callback_data=f"delimiter_{ord(';')}")],
-            [InlineKeyboardButton("Вертикальная черта", callback_data=f"delimiter_{ord('|')}")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(
-            "🔧 **Выбор разделителя**\n\n"
-            "Выберите разделитель столбцов:",
-            reply_markup=reply_markup
-        )
-        return ConversationState.DELIMITER_DETECTION
-    else:
-        delimiter_code = int(query.data.replace("delimiter_", ""))
-        delimiter = chr(delimiter_code)
-        session.file_info.delimiter = delimiter
-        
-        await query.edit_message_text(
-            f"✅ Разделитель выбран\n\n"
-            "⏳ Парсю файл..."
-        )
-        
-        return await parse_and_validate(update, context)
+        return await _show_delimiter_choices(query)
+    
+    expired = await _restart_if_expired(update, context, session)
+    if expired is not None:
+        return expired
+    
+    delimiter = _delimiter_from_callback(query.data)
+    if delimiter is None:
+        # Stale or malformed button (e.g. an old delimiter_<ord> keyboard)
+        return await _show_delimiter_choices(query)
+    
+    session.file_info.delimiter = delimiter
+    
+    # Acknowledge now; the parse summary edits the message once
+    await query.answer()
+    return await parse_and_validate(update, context, "✅ Разделитель выбран\n\n")
 
 
-async def parse_and_validate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Parse file and validate data."""
+async def parse_and_validate(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                             notice: str = "") -> int:
+    """Parse file and validate data; notice is prepended to the reply."""
     session = get_session_data(context)
+    expired = await _restart_if_expired(update, context, session)
+    if expired is not None:
+        return expired
     
     try:
-        # Parse file with default column mapping
-        parsed_data = FileParser.parse_file(
+        # Parse file with default column mapping, off the event loop
+        parsed_data = await asyncio.to_thread(
+            FileParser.parse_file,
             session.file_info.file_path,
             session.file_info.encoding,
             session.file_info.delimiter,
@@ -390,39 +654,33 @@ async def parse_and_validate(update: Update, context: ContextTypes.DEFAULT_TYPE)
         session.parsed_data = parsed_data
         
         # Build summary message
-        message = (
-            f"✅ **Файл успешно обработан**\n\n"
-            f"📊 **Статистика:**\n"
-            f"• Всего строк: {parsed_data.total_rows}\n"
-            f"• Валидных точек: {parsed_data.valid_rows}\n"
-            f"• Невалидных строк: {parsed_data.invalid_rows}\n"
-        )
+        parts = [notice, _PARSE_SUMMARY_TMPL.format(
+            total=parsed_data.total_rows,
+            valid=parsed_data.valid_rows,
+            invalid=parsed_data.invalid_rows
+        )]
         
         if parsed_data.anomalies:
-            message += f"\n⚠️ **Обнаружено аномалий:** {len(parsed_data.anomalies)}\n"
-            for anomaly in parsed_data.anomalies[:3]:
-                message += f"• {anomaly}\n"
+            parts.append(f"\n⚠️ **Обнаружено аномалий:** {len(parsed_data.anomalies)}\n")
+            parts.extend(f"• {anomaly}\n" for anomaly in islice(parsed_data.anomalies, 3))
         
         if parsed_data.warnings:
-            message += f"\n⚠️ **Предупреждения:** {len(parsed_data.warnings)}\n"
-            for warning in parsed_data.warnings[:3]:
-                message += f"• {warning}\n"
+            parts.append(f"\n⚠️ **Предупреждения:** {len(parsed_data.warnings)}\n")
+            parts.extend(f"• {warning}\n" for warning in islice(parsed_data.warnings, 3))
         
         # Sample points
-        sample_points = parsed_data.points[:3]
-        if sample_points:
-            message += "\n📍 **Образец данных:**\n"
-            for point in sample_points:
-                code = point.get('code', '—')
-                message += f"• X={point['x']:.2f}, Y={point['y']:.2f}, Z={point['z']:.2f}, Code={code}\n"
-        
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ Продолжить", callback_data="parse_continue"),
-                InlineKeyboardButton("🔧 Изменить маппинг", callback_data="parse_remap")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        if parsed_data.points:
+            parts.append("\n📍 **Образец данных:**\n")
+            parts.extend(
+                _SAMPLE_POINT_TMPL.format(
+                    x=point['x'], y=point['y'], z=point['z'], code=point.get('code', '—')
+                )
+                for point in islice(parsed_data.points, 3)
+            )
+        
+        message = ''.join(parts)
+        
+        reply_markup = _PARSE_RESULT_MARKUP
         
         if update.callback_query:
             await update.callback_query.edit_message_text(message, reply_markup=reply_markup)
@@ -433,16 +691,13 @@ async def parse_and_validate(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
     except FileParsingError as e:
         error_message = (
+            notice +
             f"❌ **Ошибка парсинга файла**\n\n"
             f"{str(e)}\n\n"
             "Попробуйте изменить параметры или загрузить другой файл."
         )
         
-        keyboard = [
-            [InlineKeyboardButton("🔧 Изменить параметры", callback_data="parse_retry")],
-            [InlineKeyboardButton("📤 Загрузить другой файл", callback_data="parse_reupload")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _PARSE_ERROR_MARKUP
         
         if update.callback_query:
             await update.callback_query.edit_message_text(error_message, reply_markup=reply_markup)
@@ -455,43 +710,34 @@ async def parse_and_validate(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def handle_parse_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle parse confirmation."""
     query = update.callback_query
-    await query.answer()
     
     if query.data == "parse_continue":
-        await query.edit_message_text(
-            "✅ Отлично! Данные готовы к обработке.\n\n"
-            "Теперь настроим параметры генерации."
-        )
-        return await request_scale(update, context)
+        return await request_scale(update, context, "✅ Отлично! Данные готовы к обработке.\n\n")
     elif query.data == "parse_remap":
-        await query.edit_message_text(
+        return await request_scale(
+            update, context,
             "🔧 Изменение маппинга столбцов пока не реализовано.\n"
-            "Используется стандартное: X Y Z [CODE] [COMMENT]"
+            "Используется стандартное: X Y Z [CODE] [COMMENT]\n\n"
         )
-        return await request_scale(update, context)
     elif query.data == "parse_retry":
+        await query.answer()
         return await detect_encoding(update, context)
     elif query.data == "parse_reupload":
         return await request_file_upload(update, context)
 
 
-async def request_scale(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Request drawing scale."""
-    keyboard = [
-        [InlineKeyboardButton("1:500", callback_data="scale_500")],
-        [InlineKeyboardButton("1:1000", callback_data="scale_1000")],
-        [InlineKeyboardButton("1:2000", callback_data="scale_2000")],
-        [InlineKeyboardButton("1:5000", callback_data="scale_5000")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+async def request_scale(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                        notice: str = "") -> int:
+    """Request drawing scale; notice is prepended to the prompt."""
+    reply_markup = _SCALE_MARKUP
     
-    message = (
+    message = notice + (
         "📐 **Масштаб чертежа**\n\n"
         "Выберите масштаб для генерации DXF:"
     )
     
     if update.callback_query:
-        await update.callback_query.edit_message_text(message, reply_markup=reply_markup)
+        await _answer_and_edit(update.callback_query, message, reply_markup=reply_markup)
     else:
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
@@ -505,41 +751,33 @@ async def request_scale(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
 async def handle_scale_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle scale choice."""
     query = update.callback_query
-    await query.answer()
     
     session = get_session_data(context)
     scale_str = query.data.replace("scale_", "")
     session.scale = float(scale_str)
     
-    await query.edit_message_text(
-        f"✅ Масштаб: 1:{scale_str}\n\n"
-        "Теперь настроим построение TIN."
-    )
-    
-    return await request_tin_options(update, context)
+    return await request_tin_options(update, context, f"✅ Масштаб: 1:{scale_str}\n\n")
 
 
-async def request_tin_options(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Request TIN options."""
-    keyboard = [
-        [
-            InlineKeyboardButton("✅ Включить TIN", callback_data="tin_yes"),
-            InlineKeyboardButton("⏭️ Пропустить", callback_data="tin_no")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+async def request_tin_options(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                              notice: str = "") -> int:
+    """Request TIN options; notice is prepended to the prompt."""
+    reply_markup = _TIN_MARKUP
     
-    message = (
+    message = notice + (
         "🔺 **Построение TIN**\n\n"
         "TIN (Triangulated Irregular Network) - триангуляционная сеть для моделирования поверхности.\n\n"
         "Построить TIN?"
     )
     
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text=message,
-        reply_markup=reply_markup
-    )
+    if update.callback_query:
+        await _answer_and_edit(update.callback_query, message, reply_markup=reply_markup)
+    else:
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text=message,
+            reply_markup=reply_markup
+        )
     
     return ConversationState.TIN_OPTIONS
 
@@ -547,47 +785,34 @@ async def request_tin_options(update: Update, context: ContextTypes.DEFAULT_TYPE
 async def handle_tin_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle TIN choice."""
     query = update.callback_query
-    await query.answer()
     
     session = get_session_data(context)
     session.tin_enabled = (query.data == "tin_yes")
     
-    if session.tin_enabled:
-        await query.edit_message_text(
-            "✅ TIN будет построен\n\n"
-            "Теперь настроим денсификацию."
-        )
-    else:
-        await query.edit_message_text(
-            "⏭️ TIN пропущен\n\n"
-            "Теперь настроим денсификацию."
-        )
-    
-    return await request_densification_options(update, context)
+    notice = "✅ TIN будет построен\n\n" if session.tin_enabled else "⏭️ TIN пропущен\n\n"
+    return await request_densification_options(update, context, notice)
 
 
-async def request_densification_options(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Request densification options."""
-    keyboard = [
-        [
-            InlineKeyboardButton("✅ Включить денсификацию", callback_data="densify_yes"),
-            InlineKeyboardButton("⏭️ Пропустить", callback_data="densify_no")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+async def request_densification_options(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                        notice: str = "") -> int:
+    """Request densification options; notice is prepended to the prompt."""
+    reply_markup = _DENSIFICATION_MARKUP
     
-    message = (
+    message = notice + (
         "🎯 **Денсификация рельефа**\n\n"
         "Денсификация автоматически добавляет точки в разреженных областях "
         "для улучшения детализации поверхности.\n\n"
         "Включить денсификацию?"
     )
     
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text=message,
-        reply_markup=reply_markup
-    )
+    if update.callback_query:
+        await _answer_and_edit(update.callback_query, message, reply_markup=reply_markup)
+    else:
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text=message,
+            reply_markup=reply_markup
+        )
     
     return ConversationState.DENSIFICATION_OPTIONS
 
@@ -595,53 +820,44 @@ async def request_densification_options(update: Update, context: ContextTypes.DE
 async def handle_densification_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle densification choice."""
     query = update.callback_query
-    await query.answer()
     
     session = get_session_data(context)
     session.densification_enabled = (query.data == "densify_yes")
     
     if session.densification_enabled:
-        await query.edit_message_text(
-            "✅ Денсификация будет выполнена\n\n"
-            "Переходим к подтверждению."
-        )
+        notice = "✅ Денсификация будет выполнена\n\n"
     else:
-        await query.edit_message_text(
-            "⏭️ Денсификация пропущена\n\n"
-            "Переходим к подтверждению."
-        )
-    
-    return await show_confirmation(update, context)
+        notice = "⏭️ Денсификация пропущена\n\n"
+    return await show_confirmation(update, context, notice)
 
 
-async def show_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Show final confirmation."""
+async def show_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE,
+                            notice: str = "") -> int:
+    """Show final confirmation; notice is prepended to the summary."""
     session = get_session_data(context)
-    
-    message = (
-        "📋 **Итоговые настройки**\n\n"
-        f"📄 Файл: {session.file_info.original_filename}\n"
-        f"📊 Точек: {session.parsed_data.valid_rows}\n"
-        f"📐 Масштаб: 1:{int(session.scale)}\n"
-        f"🔺 TIN: {'✅ Да' if session.tin_enabled else '⏭️ Нет'}\n"
-        f"🎯 Денсификация: {'✅ Да' if session.densification_enabled else '⏭️ Нет'}\n"
-        f"📄 Шаблон: {'✅ Да' if session.use_template else '⏭️ Нет'}\n\n"
-        "Всё верно? Начинаем обработку?"
+    expired = await _restart_if_expired(update, context, session, needs_parsed_data=True)
+    if expired is not None:
+        return expired
+    
+    message = notice + _CONFIRMATION_TMPL.format(
+        filename=session.file_info.original_filename,
+        points=session.parsed_data.valid_rows,
+        scale=int(session.scale),
+        tin=_YES_NO[bool(session.tin_enabled)],
+        densification=_YES_NO[bool(session.densification_enabled)],
+        template=_YES_NO[bool(session.use_template)]
     )
     
-    keyboard = [
-        [
-            InlineKeyboardButton("✅ Начать обработку", callback_data="confirm_yes"),
-            InlineKeyboardButton("❌ Отменить", callback_data="confirm_cancel")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = _CONFIRMATION_MARKUP
     
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text=message,
-        reply_markup=reply_markup
-    )
+    if update.callback_query:
+        await _answer_and_edit(update.callback_query, message, reply_markup=reply_markup)
+    else:
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text=message,
+            reply_markup=reply_markup
+        )
     
     return ConversationState.CONFIRMATION
 
@@ -649,16 +865,24 @@ async def show_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def handle_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle final confirmation."""
     query = update.callback_query
-    await query.answer()
     
     if query.data == "confirm_cancel":
-        await query.edit_message_text(
+        await _answer_and_edit(
+            query,
             "❌ Обработка отменена.\n\n"
             "Используйте /start для начала заново."
         )
+        _drop_session(context.user_data)
         return ConversationHandler.END
     
-    await query.edit_message_text(
+    expired = await _restart_if_expired(
+        update, context, get_session_data(context), needs_parsed_data=True
+    )
+    if expired is not None:
+        return expired
+    
+    await _answer_and_edit(
+        query,
         "🚀 **Начинаю обработку...**\n\n"
         "⏳ Пожалуйста, подождите. Это может занять некоторое время."
     )
@@ -686,11 +910,8 @@ async def process_data(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
             )
         )
         
-        # Cleanup
-        if session.file_info and session.file_info.file_path.exists():
-            session.file_info.file_path.unlink(missing_ok=True)
-        
-        session.reset()
+        # The conversation is over: drop the session and its uploaded file
+        _drop_session(context.user_data)
         
         return ConversationHandler.END
         
@@ -704,18 +925,14 @@ async def process_data(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
                 "Попробуйте еще раз или обратитесь в поддержку."
             )
         )
+        _drop_session(context.user_data)
         return ConversationHandler.END
 
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Cancel conversation."""
-    session = get_session_data(context)
-    
-    # Cleanup uploaded file
-    if session.file_info and session.file_info.file_path.exists():
-        session.file_info.file_path.unlink(missing_ok=True)
-    
-    session.reset()
+    # Drop the session, its uploaded file and its activity entry
+    _drop_session(context.user_data)
     
     await update.message.reply_text(
         "❌ Обработка отменена.\n\n"
@@ -725,37 +942,48 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     return ConversationHandler.END
 
 
+# Callback data prefixes routed to each conversation state
+_TEMPLATE_CALLBACK = re.compile(r'^template_')
+_ENCODING_CALLBACK = re.compile(r'^encoding_')
+_DELIMITER_CALLBACK = re.compile(r'^delimiter_')
+_PARSE_CALLBACK = re.compile(r'^parse_')
+_SCALE_CALLBACK = re.compile(r'^scale_')
+_TIN_CALLBACK = re.compile(r'^tin_')
+_DENSIFY_CALLBACK = re.compile(r'^densify_')
+_CONFIRM_CALLBACK = re.compile(r'^confirm_')
+
+
 def create_conversation_handler() -> ConversationHandler:
     """Create and return the conversation handler."""
     return ConversationHandler(
         entry_points=[CommandHandler('start', start)],
         states={
             ConversationState.DXF_TEMPLATE_CONFIRMATION: [
-                CallbackQueryHandler(handle_template_choice, pattern='^template_')
+                CallbackQueryHandler(handle_template_choice, pattern=_TEMPLATE_CALLBACK)
             ],
             ConversationState.FILE_UPLOAD: [
                 MessageHandler(filters.Document.ALL, handle_file_upload)
             ],
             ConversationState.ENCODING_DETECTION: [
-                CallbackQueryHandler(handle_encoding_choice, pattern='^encoding_')
+                CallbackQueryHandler(handle_encoding_choice, pattern=_ENCODING_CALLBACK)
             ],
             ConversationState.DELIMITER_DETECTION: [
-                CallbackQueryHandler(handle_delimiter_choice, pattern='^delimiter_')
+                CallbackQueryHandler(handle_delimiter_choice, pattern=_DELIMITER_CALLBACK)
             ],
             ConversationState.COLUMN_MAPPING: [
-                CallbackQueryHandler(handle_parse_confirmation, pattern='^parse_')
+                CallbackQueryHandler(handle_parse_confirmation, pattern=_PARSE_CALLBACK)
             ],
             ConversationState.SCALE_SELECTION: [
-                CallbackQueryHandler(handle_scale_choice, pattern='^scale_')
+                CallbackQueryHandler(handle_scale_choice, pattern=_SCALE_CALLBACK)
             ],
             ConversationState.TIN_OPTIONS: [
-                CallbackQueryHandler(handle_tin_choice, pattern='^tin_')
+                CallbackQueryHandler(handle_tin_choice, pattern=_TIN_CALLBACK)
             ],
             ConversationState.DENSIFICATION_OPTIONS: [
-                CallbackQueryHandler(handle_densification_choice, pattern='^densify_')
+                CallbackQueryHandler(handle_densification_choice, pattern=_DENSIFY_CALLBACK)
             ],
             ConversationState.CONFIRMATION: [
-                CallbackQueryHandler(handle_confirmation, pattern='^confirm_')
+                CallbackQueryHandler(handle_confirmation, pattern=_CONFIRM_CALLBACK)
             ],
         },
         fallbacks=[CommandHandler('cancel', cancel)],
@@ -1,19 +1,25 @@
 """State definitions for the bot conversation handler."""
 
-from enum import IntEnum
+from typing import Final
 
 
-class ConversationState(IntEnum):
-    """States for the bot conversation flow."""
-    START = 0
-    DXF_TEMPLATE_CONFIRMATION = 1
-    FILE_UPLOAD = 2
-    ENCODING_DETECTION = 3
-    DELIMITER_DETECTION = 4
-    COLUMN_MAPPING = 5
-    SCALE_SELECTION = 6
-    TIN_OPTIONS = 7
-    DENSIFICATION_OPTIONS = 8
-    EXTRAS_OPTIONS = 9
-    CONFIRMATION = 10
-    PROCESSING = 11
+class ConversationState:
+    """
+    States for the bot conversation flow.
+    
+    Plain int constants rather than an IntEnum: the conversation handler
+    hashes and compares the current state on every update, and bare ints
+    skip the enum member machinery.
+    """
+    START: Final[int] = 0
+    DXF_TEMPLATE_CONFIRMATION: Final[int] = 1
+    FILE_UPLOAD: Final[int] = 2
+    ENCODING_DETECTION: Final[int] = 3
+    DELIMITER_DETECTION: Final[int] = 4
+    COLUMN_MAPPING: Final[int] = 5
+    SCALE_SELECTION: Final[int] = 6
+    TIN_OPTIONS: Final[int] = 7
+    DENSIFICATION_OPTIONS: Final[int] = 8
+    EXTRAS_OPTIONS: Final[int] = 9
+    CONFIRMATION: Final[int] = 10
+    PROCESSING: Final[int] = 11
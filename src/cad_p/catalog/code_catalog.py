@@ -5,6 +5,9 @@ from src.models.rule_data import (
     CodeRule, RuleType, CommentHandling, BlockPlacement
 )
 
+# Upper bound on memoized get_rule() lookups per catalog
+_LOOKUP_CACHE_SIZE = 4096
+
 
 class CodeCatalog:
     """Catalog of survey codes with comprehensive rule definitions."""
@@ -13,6 +16,7 @@ class CodeCatalog:
         """Initialize the code catalog with all survey codes."""
         self._rules: Dict[str, CodeRule] = {}
         self._alias_map: Dict[str, str] = {}
+        self._lookup_cache: Dict[str, Optional[CodeRule]] = {}
         self._initialize_catalog()
     
     def _initialize_catalog(self):
@@ -837,6 +841,18 @@ class CodeCatalog:
         Returns:
             CodeRule if found, None otherwise
         """
+        try:
+            return self._lookup_cache[code]
+        except KeyError:
+            pass
+        
+        rule = self._lookup_rule(code)
+        if len(self._lookup_cache) < _LOOKUP_CACHE_SIZE:
+            self._lookup_cache[code] = rule
+        return rule
+    
+    def _lookup_rule(self, code: str) -> Optional[CodeRule]:
+        """Resolve a code or alias to its rule without memoization."""
         code_lower = code.lower()
         
         if code_lower in self._rules:
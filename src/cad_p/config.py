@@ -1,97 +1,150 @@
 """Configuration management for CAD-P bot."""
 
 import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# The configuration is read once and never changes; slots (Python 3.10+)
+# keep attribute reads on the shared instance cheap.
+_CONFIG_DATACLASS = {'frozen': True}
+if sys.version_info >= (3, 10):
+    _CONFIG_DATACLASS['slots'] = True
 
 
+def _as_bool(name: str, default: str) -> bool:
+    """Read a "true"/"false" environment flag."""
+    return os.getenv(name, default).lower() == "true"
+
+
+@lru_cache(maxsize=None)
+def _make_directories(directories: Tuple[Path, ...]) -> None:
+    """Create directories (once per distinct set of paths)."""
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+@dataclass(**_CONFIG_DATACLASS)
 class Config:
     """Application configuration loaded from environment variables."""
     
     # Base paths
-    BASE_DIR = Path(__file__).parent.parent.parent
-    SRC_DIR = BASE_DIR / "src"
+    BASE_DIR: Path
+    SRC_DIR: Path
     
     # Bot configuration
-    BOT_TOKEN: str = os.getenv("BOT_TOKEN", os.getenv("TELEGRAM_BOT_TOKEN", ""))
+    BOT_TOKEN: str
     
     # Logging configuration
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    LOG_FORMAT: str = os.getenv(
-        "LOG_FORMAT",
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    LOG_FILE: Optional[str] = os.getenv("LOG_FILE", "logs/bot.log")
+    LOG_LEVEL: str
+    LOG_FORMAT: str
+    LOG_FILE: Optional[str]
+    LOG_DIR: Optional[Path]
     
     # File storage paths
-    TEMP_DIR: Path = BASE_DIR / os.getenv("TEMP_DIR", "temp/uploads")
-    OUTPUT_DIR: Path = BASE_DIR / os.getenv("OUTPUT_DIR", "output")
-    TEMPLATES_DIR: Path = BASE_DIR / os.getenv("TEMPLATES_DIR", "templates")
-    DATA_DIR: Path = BASE_DIR / os.getenv("DATA_DIR", "data")
+    TEMP_DIR: Path
+    OUTPUT_DIR: Path
+    TEMPLATES_DIR: Path
+    DATA_DIR: Path
     
     # Processing configuration
-    MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
-    MAX_POINTS: int = int(os.getenv("MAX_POINTS", "1000000"))
-    DEFAULT_GRID_SPACING: float = float(os.getenv("DEFAULT_GRID_SPACING", "5.0"))
+    MAX_FILE_SIZE_MB: int
+    MAX_POINTS: int
+    DEFAULT_GRID_SPACING: float
     
     # Feature toggles
-    ENABLE_DENSIFICATION: bool = os.getenv("ENABLE_DENSIFICATION", "true").lower() == "true"
-    ENABLE_TIN: bool = os.getenv("ENABLE_TIN", "true").lower() == "true"
-    ENABLE_CODE_CATALOG: bool = os.getenv("ENABLE_CODE_CATALOG", "true").lower() == "true"
-    ENABLE_FILE_VALIDATION: bool = os.getenv("ENABLE_FILE_VALIDATION", "true").lower() == "true"
-    ENABLE_AUTO_ENCODING_DETECTION: bool = os.getenv("ENABLE_AUTO_ENCODING_DETECTION", "true").lower() == "true"
+    ENABLE_DENSIFICATION: bool
+    ENABLE_TIN: bool
+    ENABLE_CODE_CATALOG: bool
+    ENABLE_FILE_VALIDATION: bool
+    ENABLE_AUTO_ENCODING_DETECTION: bool
     
     # Performance settings
-    WORKER_THREADS: int = int(os.getenv("WORKER_THREADS", "4"))
-    PROCESSING_TIMEOUT_SECONDS: int = int(os.getenv("PROCESSING_TIMEOUT_SECONDS", "300"))
+    WORKER_THREADS: int
+    PROCESSING_TIMEOUT_SECONDS: int
+    
+    # Bot API HTTP client; HTTP_VERSION=2 needs the optional h2 package
+    HTTP_CONNECTION_POOL_SIZE: int
+    HTTP_POOL_TIMEOUT_SECONDS: float
+    HTTP_VERSION: str
     
     # Development settings
-    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
-    DEVELOPMENT_MODE: bool = os.getenv("DEVELOPMENT_MODE", "false").lower() == "true"
+    DEBUG: bool
+    DEVELOPMENT_MODE: bool
     
     @classmethod
-    def ensure_directories(cls):
-        """Create required directories if they don't exist."""
-        directories = [
-            cls.TEMP_DIR,
-            cls.OUTPUT_DIR,
-            cls.TEMPLATES_DIR,
-            cls.DATA_DIR,
-        ]
+    @lru_cache(maxsize=1)
+    def load(cls) -> "Config":
+        """Load the .env file and the environment once and return the configuration."""
+        load_dotenv()
         
-        # Create logs directory if LOG_FILE is set
-        if cls.LOG_FILE:
-            log_dir = Path(cls.LOG_FILE).parent
-            if not log_dir.is_absolute():
-                log_dir = cls.BASE_DIR / log_dir
-            directories.append(log_dir)
+        base_dir = Path(__file__).parent.parent.parent
+        log_file = os.getenv("LOG_FILE", "logs/bot.log")
         
-        for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+        return cls(
+            BASE_DIR=base_dir,
+            SRC_DIR=base_dir / "src",
+            BOT_TOKEN=os.getenv("BOT_TOKEN", os.getenv("TELEGRAM_BOT_TOKEN", "")),
+            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+            LOG_FORMAT=os.getenv(
+                "LOG_FORMAT",
+                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            ),
+            LOG_FILE=log_file,
+            LOG_DIR=base_dir / Path(log_file).parent if log_file else None,
+            TEMP_DIR=base_dir / os.getenv("TEMP_DIR", "temp/uploads"),
+            OUTPUT_DIR=base_dir / os.getenv("OUTPUT_DIR", "output"),
+            TEMPLATES_DIR=base_dir / os.getenv("TEMPLATES_DIR", "templates"),
+            DATA_DIR=base_dir / os.getenv("DATA_DIR", "data"),
+            MAX_FILE_SIZE_MB=int(os.getenv("MAX_FILE_SIZE_MB", "50")),
+            MAX_POINTS=int(os.getenv("MAX_POINTS", "1000000")),
+            DEFAULT_GRID_SPACING=float(os.getenv("DEFAULT_GRID_SPACING", "5.0")),
+            ENABLE_DENSIFICATION=_as_bool("ENABLE_DENSIFICATION", "true"),
+            ENABLE_TIN=_as_bool("ENABLE_TIN", "true"),
+            ENABLE_CODE_CATALOG=_as_bool("ENABLE_CODE_CATALOG", "true"),
+            ENABLE_FILE_VALIDATION=_as_bool("ENABLE_FILE_VALIDATION", "true"),
+            ENABLE_AUTO_ENCODING_DETECTION=_as_bool("ENABLE_AUTO_ENCODING_DETECTION", "true"),
+            WORKER_THREADS=int(os.getenv("WORKER_THREADS", "4")),
+            PROCESSING_TIMEOUT_SECONDS=int(os.getenv("PROCESSING_TIMEOUT_SECONDS", "300")),
+            HTTP_CONNECTION_POOL_SIZE=int(os.getenv("HTTP_CONNECTION_POOL_SIZE", "256")),
+            HTTP_POOL_TIMEOUT_SECONDS=float(os.getenv("HTTP_POOL_TIMEOUT_SECONDS", "1.0")),
+            HTTP_VERSION=os.getenv("HTTP_VERSION", "1.1"),
+            DEBUG=_as_bool("DEBUG", "false"),
+            DEVELOPMENT_MODE=_as_bool("DEVELOPMENT_MODE", "false"),
+        )
     
-    @classmethod
-    def validate(cls) -> list[str]:
+    def ensure_directories(self):
+        """Create required directories if they don't exist (once per process)."""
+        directories = (self.TEMP_DIR, self.OUTPUT_DIR, self.TEMPLATES_DIR, self.DATA_DIR, self.LOG_DIR)
+        _make_directories(tuple(directory for directory in directories if directory is not None))
+    
+    def validate(self) -> list[str]:
         """Validate configuration and return list of errors."""
         errors = []
         
-        if not cls.BOT_TOKEN:
+        if not self.BOT_TOKEN:
             errors.append("BOT_TOKEN or TELEGRAM_BOT_TOKEN environment variable is required")
         
-        if cls.MAX_FILE_SIZE_MB <= 0:
+        if self.MAX_FILE_SIZE_MB <= 0:
             errors.append("MAX_FILE_SIZE_MB must be greater than 0")
         
-        if cls.MAX_POINTS <= 0:
+        if self.MAX_POINTS <= 0:
             errors.append("MAX_POINTS must be greater than 0")
         
-        if cls.DEFAULT_GRID_SPACING <= 0:
+        if self.DEFAULT_GRID_SPACING <= 0:
             errors.append("DEFAULT_GRID_SPACING must be greater than 0")
         
+        if self.HTTP_CONNECTION_POOL_SIZE <= 0:
+            errors.append("HTTP_CONNECTION_POOL_SIZE must be greater than 0")
+        
+        if self.HTTP_VERSION not in ("1.1", "2", "2.0"):
+            errors.append("HTTP_VERSION must be 1.1 or 2")
+        
         return errors
 
 
 # Global config instance
-config = Config()
+config = Config.load()
@@ -1,5 +1,6 @@
 """Dependency injection container for CAD-P bot services."""
 
+from functools import cached_property
 from typing import Optional
 from .config import config
 
@@ -12,6 +13,15 @@ class ServiceContainer:
     making it easy to swap implementations and manage dependencies.
     """
     
+    # Services created on first access; register() can pre-empt any of them
+    _SERVICE_NAMES = (
+        "tin_service",
+        "densification_service",
+        "rule_engine",
+        "catalog_workflow",
+        "processing_service",
+    )
+    
     def __init__(self):
         self._services = {}
         self._config = config
@@ -19,14 +29,20 @@ class ServiceContainer:
     def register(self, name: str, service):
         """Register a service instance."""
         self._services[name] = service
+        if name in self._SERVICE_NAMES:
+            # Takes the place of the lazily created service
+            self.__dict__[name] = service
     
     def get(self, name: str):
-        """Get a registered service instance."""
-        return self._services.get(name)
+        """Get a registered (or already created) service instance."""
+        service = self._services.get(name)
+        if service is None and name in self._SERVICE_NAMES:
+            service = getattr(self, name)
+        return service
     
     def has(self, name: str) -> bool:
-        """Check if a service is registered."""
-        return name in self._services
+        """Check if a service is registered or can be created."""
+        return name in self._services or name in self._SERVICE_NAMES
     
     @property
     def config(self):
@@ -35,54 +51,66 @@ class ServiceContainer:
     
     def initialize_services(self):
         """
-        Initialize and register all application services.
+        Create every application service now.
         
-        This method is called during application startup to set up
-        all required services with their dependencies.
+        Services are otherwise created lazily on first access; startup calls
+        this to pay the import and construction cost up front.
         """
+        for name in self._SERVICE_NAMES:
+            getattr(self, name)
+    
+    @cached_property
+    def tin_service(self):
+        """TIN service (created on first access)."""
         # Import services lazily to avoid circular imports
-        from .services.processing_service import ProcessingService
+        from .models.settings import TINSettings
         from .services.tin_service import TINService
+        return TINService(TINSettings())
+    
+    @cached_property
+    def densification_service(self):
+        """Densification service (created on first access)."""
+        from .models.settings import DensificationSettings
         from .services.densification_service import DensificationService
+        return DensificationService(DensificationSettings())
+    
+    @cached_property
+    def rule_engine(self):
+        """Rule engine (created on first access)."""
         from .services.rule_engine import RuleEngine
-        from .services.catalog_workflow import CatalogWorkflow
-        
-        # Register services
-        self.register("tin_service", TINService())
-        self.register("densification_service", DensificationService())
-        self.register("rule_engine", RuleEngine())
-        self.register("catalog_workflow", CatalogWorkflow())
-        self.register("processing_service", ProcessingService())
+        return RuleEngine()
+    
+    @cached_property
+    def catalog_workflow(self):
+        """Catalog workflow service (created on first access)."""
+        from .services.catalog_workflow import CatalogWorkflowService
+        return CatalogWorkflowService()
+    
+    @cached_property
+    def processing_service(self):
+        """Processing service (created on first access)."""
+        from .services.processing_service import ProcessingService
+        return ProcessingService()
     
     def get_processing_service(self):
         """Get the processing service instance."""
-        if not self.has("processing_service"):
-            self.initialize_services()
-        return self.get("processing_service")
+        return self.processing_service
     
     def get_tin_service(self):
         """Get the TIN service instance."""
-        if not self.has("tin_service"):
-            self.initialize_services()
-        return self.get("tin_service")
+        return self.tin_service
     
     def get_densification_service(self):
         """Get the densification service instance."""
-        if not self.has("densification_service"):
-            self.initialize_services()
-        return self.get("densification_service")
+        return self.densification_service
     
     def get_rule_engine(self):
         """Get the rule engine instance."""
-        if not self.has("rule_engine"):
-            self.initialize_services()
-        return self.get("rule_engine")
+        return self.rule_engine
     
     def get_catalog_workflow(self):
         """Get the catalog workflow instance."""
-        if not self.has("catalog_workflow"):
-            self.initialize_services()
-        return self.get("catalog_workflow")
+        return self.catalog_workflow
 
 
 # Global service container instance
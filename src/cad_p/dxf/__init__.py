@@ -6,6 +6,7 @@ from src.dxf.geometry_helpers import GeometryHelpers
 from src.dxf.polyline_builder import Polyline3DBuilder, PointWithMetadata
 from src.dxf.exporter import DXFExporter
 from src.dxf.layer_manager import LayerManager, LayerConfig
+from src.dxf.writer import save_document, write_document
 
 __all__ = [
     'DXFGenerationService',
@@ -18,4 +19,6 @@ __all__ = [
     'DXFExporter',
     'LayerManager',
     'LayerConfig',
+    'save_document',
+    'write_document',
 ]
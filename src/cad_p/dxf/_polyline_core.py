@@ -0,0 +1,65 @@
+"""Compiled nearest-neighbour ordering and segmentation for polyline groups."""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional speedup, see the 'speedups' extra
+    njit = None
+
+
+def _order_and_segment(positions: np.ndarray, sq_break_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy nearest-neighbour order from the first point, split at long gaps.
+    
+    Same result as Polyline3DBuilder._proximity_order_dense followed by the
+    gap check in _segment_runs: squared distances are summed in column
+    order and ties go to the lowest index.
+    
+    Args:
+        positions: C-contiguous NxD float64 array (N >= 1)
+        sq_break_distance: Squared gap above which a new run starts
+            (``inf`` keeps a single run)
+    
+    Returns:
+        Tuple of (visiting order, positions in the order where a run starts)
+    """
+    n, dims = positions.shape
+    order = np.empty(n, dtype=np.int64)
+    breaks = np.empty(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=np.bool_)
+    n_breaks = 0
+    
+    current = 0
+    order[0] = current
+    visited[current] = True
+    
+    for step in range(1, n):
+        best = -1
+        best_sq = np.inf
+        for j in range(n):
+            if visited[j]:
+                continue
+            sq = 0.0
+            for d in range(dims):
+                diff = positions[j, d] - positions[current, d]
+                sq += diff * diff
+            if best < 0 or sq < best_sq:
+                best = j
+                best_sq = sq
+        
+        if best_sq > sq_break_distance:
+            breaks[n_breaks] = step
+            n_breaks += 1
+        
+        current = best
+        order[step] = current
+        visited[current] = True
+    
+    return order, breaks[:n_breaks]
+
+
+# Compiled kernel, or None when numba is not installed
+order_and_segment = njit(cache=True)(_order_and_segment) if njit is not None else None
@@ -7,6 +7,7 @@ from typing import Optional, List
 
 from src.models.point_data import PointCloud, TIN, PointType
 from src.dxf.layer_manager import LayerManager, LayerConfig
+from src.dxf.writer import save_document
 
 
 class DXFExporter:
@@ -195,4 +196,4 @@ class DXFExporter:
     
     def save(self, filepath: str):
         """Save DXF file."""
-        self.doc.saveas(filepath)
+        save_document(self.doc, filepath)
@@ -1,31 +1,106 @@
 """DXF generation service leveraging ezdxf with template support."""
 
+import copy
+import logging
+import os
 import ezdxf
+from collections import defaultdict
 from ezdxf.document import Drawing
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from types import MappingProxyType
+from typing import Optional, List, Dict, Tuple, Mapping, NamedTuple, Union, TextIO, BinaryIO
 import numpy as np
 
 from src.dxf.scale_settings import ScaleManager, DrawingScale
 from src.dxf.geometry_helpers import GeometryHelpers
 from src.dxf.polyline_builder import Polyline3DBuilder, PointWithMetadata
 from src.dxf.layer_manager import LayerManager
+from src.dxf.writer import save_document, write_document
+
+logger = logging.getLogger(__name__)
+
+# Unit outline of the SQUARE marker (closed, first corner repeated)
+_SQUARE_OFFSETS = np.array([[-1.0, -1.0], [1.0, -1.0], [1.0, 1.0], [-1.0, 1.0], [-1.0, -1.0]])
+
+
+@lru_cache(maxsize=4)
+def _read_template(path: str, mtime_ns: int, size: int) -> Drawing:
+    """Parse a template DXF (cached by file identity; callers get copies)."""
+    return ezdxf.readfile(path)
+
+
+class CodeStyle(NamedTuple):
+    """Resolved display style for a point code."""
+    color: int
+    text_color: int
+    marker: Optional[str] = None  # Special-code marker, e.g. 'CIRCLE'
+    marker_color: Optional[int] = None
+
+
+def _code_style(code: str, structural_layers: Mapping[str, Mapping[str, int]],
+                special_rules: Mapping[str, Mapping[str, object]]) -> CodeStyle:
+    """Resolve a CodeStyle from the structural-layer and special-code tables."""
+    layer_config = structural_layers.get(code.lower(), {})
+    rule = special_rules.get(code, {})
+    return CodeStyle(
+        color=layer_config.get('color', 7),
+        text_color=layer_config.get('text_color', 7),
+        marker=rule.get('marker'),
+        marker_color=rule.get('color')
+    )
+
+
+def _build_code_styles(structural_layers: Mapping[str, Mapping[str, int]],
+                       special_rules: Mapping[str, Mapping[str, object]]) -> Mapping[str, CodeStyle]:
+    """Pre-resolve the styles of every code listed in the tables."""
+    return MappingProxyType({
+        code: _code_style(code, structural_layers, special_rules)
+        for code in (*structural_layers, *special_rules)
+    })
 
 
 class DXFGenerationService:
     """Service for generating DXF drawings with template support."""
     
-    STRUCTURAL_LAYERS = {
-        'bord': {'color': 0, 'text_color': 0},  # Black
-        'rels': {'color': 0, 'text_color': 0},  # Black
-        'bpl': {'color': 7, 'text_color': 7},
-        'cpl': {'color': 3, 'text_color': 3},
-    }
+    STRUCTURAL_LAYERS: Mapping[str, Mapping[str, int]] = MappingProxyType({
+        'bord': MappingProxyType({'color': 0, 'text_color': 0}),  # Black
+        'rels': MappingProxyType({'color': 0, 'text_color': 0}),  # Black
+        'bpl': MappingProxyType({'color': 7, 'text_color': 7}),
+        'cpl': MappingProxyType({'color': 3, 'text_color': 3}),
+    })
+    
+    SPECIAL_CODE_RULES: Mapping[str, Mapping[str, object]] = MappingProxyType({
+        'Fonar': MappingProxyType({'color': 6, 'marker': 'CIRCLE'}),
+        'Machta': MappingProxyType({'color': 5, 'marker': 'SQUARE'}),
+    })
+    
+    # Styles of the table codes, resolved once when the class is created
+    _CODE_STYLES: Mapping[str, CodeStyle] = _build_code_styles(STRUCTURAL_LAYERS, SPECIAL_CODE_RULES)
+    
+    @classmethod
+    def resolve_code(cls, code: str) -> CodeStyle:
+        """
+        Resolve layer/text colors and special marker for a point code.
+        
+        Structural layers match case-insensitively, special codes exactly.
+        
+        Args:
+            code: Point code
+            
+        Returns:
+            CodeStyle for the code
+        """
+        style = cls._CODE_STYLES.get(code)
+        if style is None:
+            style = cls._resolve_other_code(code)
+        return style
     
-    SPECIAL_CODE_RULES = {
-        'Fonar': {'color': 6, 'marker': 'CIRCLE'},
-        'Machta': {'color': 5, 'marker': 'SQUARE'},
-    }
+    @classmethod
+    @lru_cache(maxsize=128)
+    def _resolve_other_code(cls, code: str) -> CodeStyle:
+        """Resolve codes not listed verbatim in the tables (e.g. 'BORD')."""
+        return _code_style(code, cls.STRUCTURAL_LAYERS, cls.SPECIAL_CODE_RULES)
     
     def __init__(self, 
                  template_path: Optional[str] = None,
@@ -39,25 +114,69 @@ class DXFGenerationService:
         """
         self.template_path = template_path
         self.scale_manager = ScaleManager(scale)
-        self.doc = self._load_or_create_document()
+        self.polyline_builder = Polyline3DBuilder()
+        self._attach_document(self._load_or_create_document())
+    
+    def _attach_document(self, doc: Drawing) -> None:
+        """Make doc the current drawing and rebind the helpers to it."""
+        self.doc = doc
+        self._msp = None
+        # Text styles are added on first text output, not for every drawing
+        self._styles_ready = False
+        # Lower-cased names of layers/blocks known to exist (DXF table names
+        # are case-insensitive); misses still consult the document, so
+        # entries added by the helpers are picked up too
+        self._known_layers = set()
+        self._known_blocks = set()
         self.layer_manager = LayerManager(self.doc)
         self.geometry_helpers = GeometryHelpers(self.doc)
-        self.polyline_builder = Polyline3DBuilder()
-        self._setup_text_styles()
+    
+    @property
+    def msp(self):
+        """Modelspace of the current drawing (resolved on first use)."""
+        if self._msp is None:
+            self._msp = self.doc.modelspace()
+        return self._msp
+    
+    def reset(self, scale: Optional[DrawingScale] = None) -> None:
+        """
+        Start a new, empty drawing, optionally at a different scale.
+        
+        The template file is not re-read from disk; the new drawing is a
+        copy of the cached parse.
+        
+        Args:
+            scale: New drawing scale (default: keep the current scale)
+        """
+        if scale is not None:
+            self.scale_manager = ScaleManager(scale)
+        
+        self._attach_document(self._load_or_create_document())
     
     def _load_or_create_document(self) -> Drawing:
-        """Load template or create new document."""
+        """
+        Load template or create new document.
+        
+        Templates are parsed once per file version and shared between
+        services; each service works on its own deep copy.
+        """
         if self.template_path and Path(self.template_path).exists():
             try:
-                return ezdxf.readfile(self.template_path)
+                st = os.stat(self.template_path)
+                template = _read_template(os.fspath(self.template_path), st.st_mtime_ns, st.st_size)
+                return copy.deepcopy(template)
             except Exception as e:
-                print(f"Warning: Could not load template {self.template_path}: {e}")
+                logger.warning(f"Could not load template {self.template_path}: {e}")
                 return ezdxf.new('R2018')
         else:
             return ezdxf.new('R2018')
     
-    def _setup_text_styles(self):
-        """Set up text styles for the document."""
+    def _ensure_text_styles(self) -> None:
+        """Set up text styles for the document (once per drawing)."""
+        if self._styles_ready:
+            return
+        self._styles_ready = True
+        
         if 'STANDARD' not in self.doc.styles:
             self.doc.styles.new('STANDARD', dxfattribs={
                 'font': 'Arial.ttf',
@@ -80,6 +199,10 @@ class DXFGenerationService:
             color: Layer color (default: 7 - white/black)
             lineweight: Optional lineweight override
         """
+        key = layer_name.lower()
+        if key in self._known_layers:
+            return
+        
         if layer_name not in self.doc.layers:
             layer = self.doc.layers.new(name=layer_name)
             layer.color = color
@@ -89,6 +212,8 @@ class DXFGenerationService:
                 lineweight = self.scale_manager.get_lineweight()
             
             layer.dxf.lineweight = lineweight
+        
+        self._known_layers.add(key)
     
     def ensure_block_exists(self, block_name: str) -> bool:
         """
@@ -100,7 +225,14 @@ class DXFGenerationService:
         Returns:
             True if block exists, False otherwise
         """
-        return block_name in self.doc.blocks
+        key = block_name.lower()
+        if key in self._known_blocks:
+            return True
+        
+        if block_name in self.doc.blocks:
+            self._known_blocks.add(key)
+            return True
+        return False
     
     def insert_point_with_block(self, x: float, y: float, z: float,
                                 block_name: str, layer: str,
@@ -141,9 +273,8 @@ class DXFGenerationService:
             layer: Layer name
             show_z_label: Whether to show Z elevation label
         """
-        layer_config = self.STRUCTURAL_LAYERS.get(code.lower(), {'color': 7, 'text_color': 7})
-        color = layer_config.get('color', 7)
-        text_color = layer_config.get('text_color', 7)
+        style = self.resolve_code(code)
+        color, text_color = style.color, style.text_color
         
         self.ensure_layer_exists(layer, color=color)
         
@@ -155,6 +286,7 @@ class DXFGenerationService:
         )
         
         if show_z_label:
+            self._ensure_text_styles()
             text_height = self.scale_manager.get_text_height()
             self.geometry_helpers.add_z_label(
                 x, y, z,
@@ -163,6 +295,63 @@ class DXFGenerationService:
                 color=text_color if text_color == 0 else None  # Use explicit black or layer color
             )
     
+    def add_points_batch(self, points: np.ndarray, codes,
+                         layer_prefix: str = 'layer',
+                         show_z_label: bool = True) -> None:
+        """
+        Add many points with optional Z labels in one pass.
+        
+        Produces the same entities as calling :meth:`add_point_with_label`
+        for each point with layer ``f"{layer_prefix}_{code}"``, but resolves
+        layer styling and scale-dependent sizes once per code.
+        
+        Args:
+            points: Nx3 array of X, Y, Z coordinates
+            codes: Sequence of N point codes
+            layer_prefix: Prefix for the per-code layer names
+            show_z_label: Whether to show Z elevation labels
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        codes = np.asarray(codes, dtype=object)
+        if len(points) == 0:
+            return
+        
+        msp = self.msp
+        marker_size = self.scale_manager.get_annotation_size() * 0.5
+        text_height = self.scale_manager.get_text_height()
+        if show_z_label:
+            self._ensure_text_styles()
+        
+        unique_codes, inverse = np.unique(codes.astype(str), return_inverse=True)
+        
+        for group, code in enumerate(unique_codes.tolist()):
+            layer = f"{layer_prefix}_{code}"
+            style = self.resolve_code(code)
+            color, text_color = style.color, style.text_color
+            
+            self.ensure_layer_exists(layer, color=color)
+            
+            circle_attribs = {'layer': layer, 'color': color}
+            text_attribs = {
+                'layer': layer,
+                'height': text_height,
+                'rotation': 0.0,
+                'style': 'STANDARD',
+                'halign': 1,
+                'valign': 0
+            }
+            if text_color == 0:
+                text_attribs['color'] = text_color
+            
+            for x, y, z in points[inverse == group].tolist():
+                msp.add_circle(center=(x, y), radius=marker_size, dxfattribs=circle_attribs)
+                
+                if show_z_label:
+                    msp.add_text(
+                        f"{z:.3f}",
+                        dxfattribs={**text_attribs, 'insert': (x, y - 1.0)}
+                    )
+    
     def add_text_annotation(self, text: str, x: float, y: float,
                            layer: str, color: Optional[int] = None) -> None:
         """
@@ -176,6 +365,7 @@ class DXFGenerationService:
             color: Optional color override
         """
         self.ensure_layer_exists(layer)
+        self._ensure_text_styles()
         text_height = self.scale_manager.get_text_height()
         
         self.geometry_helpers.add_text_entity(
@@ -201,37 +391,24 @@ class DXFGenerationService:
         Returns:
             List of created polyline entities
         """
-        points = []
+        all_polylines = []
+        
+        # Points are created straight into their code group in one pass
+        code_groups = defaultdict(list)
         for data in points_data:
             point = PointWithMetadata(
-                x=data['x'],
-                y=data['y'],
-                z=data['z'],
-                code=data.get('code', 'default'),
-                comment=data.get('comment')
-            )
-            points.append(point)
-        
-        code_layers = {}
-        for code in self.STRUCTURAL_LAYERS.keys():
-            layer_name = f"{default_layer}_{code}" if default_layer != '0' else code
-            code_layers[code] = layer_name
-            self.ensure_layer_exists(
-                layer_name,
-                color=self.STRUCTURAL_LAYERS[code]['color']
+                data['x'], data['y'], data['z'], data.get('code', 'default'), data.get('comment')
             )
+            code_groups[point.code_lower].append(point)
         
-        all_polylines = []
-        
-        code_groups = {}
-        for point in points:
-            code_key = point.code.lower()
-            if code_key not in code_groups:
-                code_groups[code_key] = []
-            code_groups[code_key].append(point)
-        
+        # Structural layers are only created for codes that have points
         for code, group_points in code_groups.items():
-            layer = code_layers.get(code, default_layer)
+            layer_config = self.STRUCTURAL_LAYERS.get(code)
+            if layer_config is not None:
+                layer = f"{default_layer}_{code}" if default_layer != '0' else code
+                self.ensure_layer_exists(layer, color=layer_config['color'])
+            else:
+                layer = default_layer
             
             polylines = self.polyline_builder.build_polylines_for_points(
                 group_points,
@@ -251,37 +428,41 @@ class DXFGenerationService:
             points_data: List of point data dictionaries
             layer: Layer name
         """
+        marked = []
         for data in points_data:
-            code = data.get('code', '')
-            if code in self.SPECIAL_CODE_RULES:
-                rule = self.SPECIAL_CODE_RULES[code]
-                
-                self.ensure_layer_exists(layer, color=rule['color'])
-                
-                x, y, z = data['x'], data['y'], data['z']
-                
-                if rule['marker'] == 'CIRCLE':
-                    self.geometry_helpers.place_point(
-                        x, y, z,
-                        layer=layer,
-                        color=rule['color'],
-                        marker_size=self.scale_manager.get_annotation_size()
-                    )
-                elif rule['marker'] == 'SQUARE':
-                    size = self.scale_manager.get_annotation_size()
-                    msp = self.doc.modelspace()
-                    square_points = [
-                        (x - size, y - size),
-                        (x + size, y - size),
-                        (x + size, y + size),
-                        (x - size, y + size),
-                        (x - size, y - size)
-                    ]
-                    msp.add_lwpolyline(
-                        square_points,
-                        close=True,
-                        dxfattribs={'layer': layer, 'color': rule['color']}
-                    )
+            style = self.resolve_code(data.get('code', ''))
+            if style.marker is not None:
+                marked.append((data, style))
+        if not marked:
+            return
+        
+        msp = self.msp
+        size = self.scale_manager.get_annotation_size()
+        
+        # All square outlines in one vectorized step, consumed in point order
+        square_centres = [(data['x'], data['y']) for data, style in marked
+                          if style.marker == 'SQUARE']
+        square_outlines = iter(
+            (np.asarray(square_centres, dtype=np.float64).reshape(-1, 1, 2)
+             + _SQUARE_OFFSETS * size).tolist()
+        )
+        
+        for data, style in marked:
+            self.ensure_layer_exists(layer, color=style.marker_color)
+            
+            if style.marker == 'CIRCLE':
+                self.geometry_helpers.place_point(
+                    data['x'], data['y'], data['z'],
+                    layer=layer,
+                    color=style.marker_color,
+                    marker_size=size
+                )
+            elif style.marker == 'SQUARE':
+                msp.add_lwpolyline(
+                    next(square_outlines),
+                    close=True,
+                    dxfattribs={'layer': layer, 'color': style.marker_color}
+                )
     
     def get_available_blocks(self) -> List[str]:
         """
@@ -292,13 +473,23 @@ class DXFGenerationService:
         """
         return [block.name for block in self.doc.blocks if not block.name.startswith('*')]
     
-    def save(self, filepath: str) -> None:
+    def save(self, filepath: Union[str, Path, TextIO, BinaryIO], fmt: str = 'asc') -> None:
         """
         Save the DXF document.
         
         Args:
-            filepath: Path to save the DXF file
+            filepath: Path to save the DXF file, or an open stream
+                (e.g. ``io.BytesIO``) to write it to without touching disk
+            fmt: 'asc' for ASCII DXF (default) or 'bin' for binary DXF
+                (streams must then be binary)
+            
+        Raises:
+            ValueError: If binary DXF is requested for a text stream
         """
+        if hasattr(filepath, 'write'):
+            write_document(self.doc, filepath, fmt=fmt)
+            return
+        
         output_path = Path(filepath)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        self.doc.saveas(str(output_path))
+        save_document(self.doc, output_path, fmt=fmt)
@@ -1,13 +1,36 @@
 """3D polyline builder with grouping logic."""
 
+import re
+import sys
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-from scipy.spatial.distance import cdist
+from scipy.spatial import cKDTree
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from src.dxf._polyline_core import order_and_segment
 
-@dataclass
+# Groups up to this size are ordered with a dense scan; larger ones use a k-d tree
+_KDTREE_MIN_POINTS = 256
+
+# Neighbours fetched by the first k-d tree query of each step
+_KDTREE_NEIGHBOURS = 16
+
+# Groups up to this size use the compiled kernel when numba is installed;
+# past it the O(N^2) scan loses to the k-d tree
+_COMPILED_MAX_POINTS = 4096
+
+# First digit of a point comment (selects the group within a code)
+_DIGIT_RE = re.compile(r'\d')
+
+# Points are built once per input row and never modified; slots (Python
+# 3.10+) keep the many small instances compact.
+_POINT_DATACLASS = {'frozen': True}
+if sys.version_info >= (3, 10):
+    _POINT_DATACLASS['slots'] = True
+
+
+@dataclass(**_POINT_DATACLASS)
 class PointWithMetadata:
     """Point with code and comment metadata."""
     x: float
@@ -15,6 +38,15 @@ class PointWithMetadata:
     z: float
     code: str
     comment: Optional[str] = None
+    # Lower-cased, interned code (shared by all points with the same code)
+    code_lower: str = field(init=False, repr=False, compare=False)
+    _first_digit: Optional[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Derive the lower-cased code and the comment's first digit once, at construction."""
+        object.__setattr__(self, 'code_lower', sys.intern(self.code.lower()))
+        match = _DIGIT_RE.search(str(self.comment)) if self.comment else None
+        object.__setattr__(self, '_first_digit', match.group() if match else None)
     
     @property
     def position(self) -> np.ndarray:
@@ -24,11 +56,7 @@ class PointWithMetadata:
     @property
     def comment_first_digit(self) -> Optional[str]:
         """Get first digit from comment if available."""
-        if self.comment:
-            for char in str(self.comment):
-                if char.isdigit():
-                    return char
-        return None
+        return self._first_digit
 
 
 class Polyline3DBuilder:
@@ -51,7 +79,7 @@ class Polyline3DBuilder:
         1. Code (e.g., 'bord', 'rels')
         2. First digit of comment (when applicable)
         3. Break distance >70m creates new segment
-        4. Special k-code logic: connect identical codes
+        4. Special k-code logic: connect identical codes into one unbroken segment
         
         Args:
             points: List of points with metadata
@@ -66,7 +94,11 @@ class Polyline3DBuilder:
         
         polylines = {}
         for group_key, group_points in grouped.items():
-            segments = self._create_segments(group_points)
+            if group_key.lower().startswith('k'):
+                # k-codes connect every point of the code, whatever the gap
+                segments = [self._order_points_by_proximity(group_points)]
+            else:
+                segments = self._create_segments(group_points)
             if segments:
                 polylines[group_key] = segments
         
@@ -75,16 +107,19 @@ class Polyline3DBuilder:
     def _group_by_code_and_comment(self, points: List[PointWithMetadata]) -> Dict[str, List[PointWithMetadata]]:
         """Group points by code and first digit of comment."""
         groups = defaultdict(list)
+        # Few distinct (code, digit) pairs occur, so each key is built once
+        group_keys = {}
         
         for point in points:
-            if point.code.lower().startswith('k'):
-                group_key = f"{point.code}"
-            else:
-                digit = point.comment_first_digit
-                if digit:
-                    group_key = f"{point.code}_{digit}"
+            ident = (point.code, point.comment_first_digit)
+            group_key = group_keys.get(ident)
+            if group_key is None:
+                code, digit = ident
+                if point.code_lower.startswith('k') or not digit:
+                    group_key = code
                 else:
-                    group_key = point.code
+                    group_key = sys.intern(f"{code}_{digit}")
+                group_keys[ident] = group_key
             
             groups[group_key].append(point)
         
@@ -100,28 +135,37 @@ class Polyline3DBuilder:
         if len(points) < 2:
             return [[points[0]]] if points else []
         
-        ordered_points = self._order_points_by_proximity(points)
-        
-        segments = []
-        current_segment = [ordered_points[0]]
+        positions = np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64)
+        return [[points[i] for i in run] for run in self._segment_runs(positions)]
+    
+    def _segment_runs(self, positions: np.ndarray, break_segments: bool = True) -> List[np.ndarray]:
+        """
+        Order positions by proximity and split the order at long gaps.
         
-        for i in range(1, len(ordered_points)):
-            prev_point = ordered_points[i - 1]
-            curr_point = ordered_points[i]
+        Args:
+            positions: Nx3 array of point coordinates (N >= 2)
+            break_segments: Split where a gap exceeds break_distance
+                (False for k-codes, which stay one run)
             
-            distance = self._calculate_distance(prev_point, curr_point)
+        Returns:
+            Index arrays of the runs with at least two points, in order
+        """
+        if order_and_segment is not None and len(positions) <= _COMPILED_MAX_POINTS:
+            sq_break = self.break_distance ** 2 if break_segments else np.inf
+            order, breaks = order_and_segment(np.ascontiguousarray(positions, dtype=np.float64), sq_break)
+            if not break_segments:
+                return [order]
+        else:
+            order = self._proximity_order(positions)
+            if not break_segments:
+                return [order]
             
-            if distance > self.break_distance:
-                if len(current_segment) >= 2:
-                    segments.append(current_segment)
-                current_segment = [curr_point]
-            else:
-                current_segment.append(curr_point)
+            # Compare squared gaps so no square roots are taken
+            steps = np.diff(positions[order], axis=0)
+            sq_gaps = np.einsum('ij,ij->i', steps, steps)
+            breaks = np.flatnonzero(sq_gaps > self.break_distance ** 2) + 1
         
-        if len(current_segment) >= 2:
-            segments.append(current_segment)
-        
-        return segments
+        return [run for run in np.split(order, breaks) if len(run) >= 2]
     
     def _order_points_by_proximity(self, points: List[PointWithMetadata]) -> List[PointWithMetadata]:
         """
@@ -130,28 +174,81 @@ class Polyline3DBuilder:
         if len(points) <= 1:
             return points
         
-        positions = np.array([p.position for p in points])
-        
-        ordered = [points[0]]
-        remaining_indices = set(range(1, len(points)))
+        positions = np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64)
+        return [points[i] for i in self._proximity_order(positions)]
+    
+    @staticmethod
+    def _proximity_order(positions: np.ndarray) -> np.ndarray:
+        """
+        Nearest-neighbour visiting order starting from the first point.
         
-        while remaining_indices:
-            current_pos = ordered[-1].position
-            
-            remaining_positions = positions[list(remaining_indices)]
-            distances = np.linalg.norm(remaining_positions - current_pos, axis=1)
+        Args:
+            positions: Nx3 array of point coordinates
             
-            min_idx_in_remaining = np.argmin(distances)
-            actual_idx = list(remaining_indices)[min_idx_in_remaining]
+        Returns:
+            Array of point indices in visiting order
+        """
+        n = len(positions)
+        if order_and_segment is not None and n <= _COMPILED_MAX_POINTS:
+            return order_and_segment(np.ascontiguousarray(positions, dtype=np.float64), np.inf)[0]
+        if n <= _KDTREE_MIN_POINTS:
+            return Polyline3DBuilder._proximity_order_dense(positions)
+        
+        tree = cKDTree(positions)
+        order = np.empty(n, dtype=np.intp)
+        visited = np.zeros(n, dtype=bool)
+        
+        current = 0
+        order[0] = current
+        visited[current] = True
+        
+        for step in range(1, n):
+            # Widen the query until it reaches an unvisited point and goes
+            # past its distance, so every tied candidate is seen
+            k = _KDTREE_NEIGHBOURS
+            while True:
+                k = min(k, n)
+                dist, idx = tree.query(positions[current], k=k)
+                fresh = ~visited[idx]
+                if k == n or (fresh.any() and dist[-1] > dist[fresh][0]):
+                    break
+                k *= 2
             
-            ordered.append(points[actual_idx])
-            remaining_indices.remove(actual_idx)
+            # Same squared distances and lowest-index tie-break as the dense scan
+            candidates = idx[fresh]
+            delta = positions[candidates] - positions[current]
+            sq_dist = np.einsum('ij,ij->i', delta, delta)
+            current = int(candidates[sq_dist == sq_dist.min()].min())
+            order[step] = current
+            visited[current] = True
         
-        return ordered
+        return order
     
-    def _calculate_distance(self, p1: PointWithMetadata, p2: PointWithMetadata) -> float:
-        """Calculate Euclidean distance between two points."""
-        return np.linalg.norm(p1.position - p2.position)
+    @staticmethod
+    def _proximity_order_dense(positions: np.ndarray) -> np.ndarray:
+        """Nearest-neighbour order by scanning all points at every step."""
+        n = len(positions)
+        order = np.empty(n, dtype=np.intp)
+        visited = np.zeros(n, dtype=bool)
+        
+        # Scratch buffers reused by every step instead of reallocated
+        delta = np.empty_like(positions, dtype=np.float64)
+        sq_dist = np.empty(n, dtype=np.float64)
+        
+        current = 0
+        order[0] = current
+        visited[current] = True
+        
+        for k in range(1, n):
+            np.subtract(positions, positions[current], out=delta)
+            np.einsum('ij,ij->i', delta, delta, out=sq_dist)
+            sq_dist[visited] = np.inf
+            
+            current = int(np.argmin(sq_dist))
+            order[k] = current
+            visited[current] = True
+        
+        return order
     
     def apply_k_code_logic(self, points: List[PointWithMetadata]) -> Dict[str, List[List[PointWithMetadata]]]:
         """
@@ -163,7 +260,7 @@ class Polyline3DBuilder:
         Returns:
             Dictionary mapping k-code to polyline segments
         """
-        k_points = [p for p in points if p.code.lower().startswith('k')]
+        k_points = [p for p in points if p.code_lower.startswith('k')]
         
         if not k_points:
             return {}
@@ -194,32 +291,20 @@ class Polyline3DBuilder:
         Returns:
             List of created polyline entities
         """
-        msp = doc.modelspace()
-        polylines_created = []
-        
-        grouped_polylines = self.group_points(points)
-        
-        for group_key, segments in grouped_polylines.items():
-            for segment in segments:
-                if len(segment) >= 2:
-                    vertices = [(p.x, p.y, p.z) for p in segment]
-                    
-                    polyline = msp.add_polyline3d(
-                        vertices,
-                        dxfattribs={'layer': layer}
-                    )
-                    polylines_created.append(polyline)
-        
-        k_polylines = self.apply_k_code_logic(points)
-        for code, segments in k_polylines.items():
-            for segment in segments:
-                if len(segment) >= 2:
-                    vertices = [(p.x, p.y, p.z) for p in segment]
-                    
-                    polyline = msp.add_polyline3d(
-                        vertices,
-                        dxfattribs={'layer': layer}
-                    )
-                    polylines_created.append(polyline)
-        
-        return polylines_created
+        # ezdxf copies dxfattribs, so one dict serves every polyline
+        add_polyline3d = doc.modelspace().add_polyline3d
+        dxfattribs = {'layer': layer}
+        
+        # Same grouping and segments as group_points, but each group's
+        # coordinates are gathered once and vertices are sliced from them
+        polylines = []
+        for group_key, group_points in self._group_by_code_and_comment(points).items():
+            if len(group_points) < 2:
+                continue
+            
+            positions = np.array([(p.x, p.y, p.z) for p in group_points], dtype=np.float64)
+            unbroken = group_key.lower().startswith('k')
+            for run in self._segment_runs(positions, break_segments=not unbroken):
+                polylines.append(add_polyline3d(positions[run].tolist(), dxfattribs=dxfattribs))
+        
+        return polylines
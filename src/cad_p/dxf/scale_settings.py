@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Dict
 
 
@@ -13,19 +14,30 @@ class DrawingScale(Enum):
     SCALE_1_5000 = "1:5000"
 
 
-@dataclass
+# Size multiplier relative to the 1:1000 base
+SCALE_FACTORS: Dict[DrawingScale, float] = {
+    DrawingScale.SCALE_1_500: 0.5,
+    DrawingScale.SCALE_1_1000: 1.0,
+    DrawingScale.SCALE_1_2000: 2.0,
+    DrawingScale.SCALE_1_5000: 5.0,
+}
+
+
+@dataclass(frozen=True)
 class ScaleParameters:
-    """Parameters affected by scale."""
+    """Parameters affected by scale (immutable, shared per scale)."""
     text_height: float
     annotation_size: float
     lineweight: int
     
     @classmethod
+    @lru_cache(maxsize=None)
     def from_scale(cls, scale: DrawingScale) -> 'ScaleParameters':
         """
         Create scale parameters based on drawing scale.
         
-        Base: 1.8mm text height at 1:1000, scaled proportionally.
+        Base: 1.8mm text height at 1:1000, scaled proportionally. Each
+        scale is computed once and the same instance is returned afterwards.
         
         Args:
             scale: Drawing scale
@@ -37,14 +49,7 @@ class ScaleParameters:
         base_annotation_size = 1.0
         base_lineweight = 25
         
-        scale_factors = {
-            DrawingScale.SCALE_1_500: 0.5,
-            DrawingScale.SCALE_1_1000: 1.0,
-            DrawingScale.SCALE_1_2000: 2.0,
-            DrawingScale.SCALE_1_5000: 5.0,
-        }
-        
-        factor = scale_factors.get(scale, 1.0)
+        factor = SCALE_FACTORS.get(scale, 1.0)
         
         return cls(
             text_height=base_text_height * factor,
@@ -65,6 +70,7 @@ class ScaleManager:
         """
         self.scale = scale
         self.parameters = ScaleParameters.from_scale(scale)
+        self._factor = SCALE_FACTORS.get(scale, 1.0)
     
     def get_text_height(self, custom_factor: float = 1.0) -> float:
         """
@@ -96,10 +102,4 @@ class ScaleManager:
         Returns:
             Scaled dimension
         """
-        scale_factors = {
-            DrawingScale.SCALE_1_500: 0.5,
-            DrawingScale.SCALE_1_1000: 1.0,
-            DrawingScale.SCALE_1_2000: 2.0,
-            DrawingScale.SCALE_1_5000: 5.0,
-        }
-        return base_dimension * scale_factors.get(self.scale, 1.0)
+        return base_dimension * self._factor
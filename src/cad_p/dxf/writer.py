@@ -0,0 +1,74 @@
+"""Buffered DXF file output."""
+
+import io
+from pathlib import Path
+from typing import BinaryIO, TextIO, Union
+
+from ezdxf.document import Drawing
+
+# ezdxf emits DXF as many short tag/value writes; a large buffer turns them
+# into a handful of write() calls.
+DXF_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def save_document(doc: Drawing, filepath: Union[str, Path],
+                  buffer_size: int = DXF_WRITE_BUFFER_SIZE,
+                  fmt: str = 'asc') -> None:
+    """
+    Write a DXF document through a large write buffer.
+    
+    Equivalent to ``doc.saveas(filepath, fmt)``: ASCII DXF keeps the
+    document encoding and ezdxf's escaping of unencodable characters;
+    binary DXF is smaller and faster to encode when no text output is
+    needed.
+    
+    Args:
+        doc: ezdxf Drawing document
+        filepath: Path to save the DXF file
+        buffer_size: Write buffer size in bytes
+        fmt: 'asc' for ASCII DXF (default) or 'bin' for binary DXF
+    """
+    doc.filename = str(filepath)
+    if fmt.startswith('bin'):
+        with open(filepath, 'wb', buffering=buffer_size) as f:
+            doc.write(f, fmt='bin')
+        return
+    
+    with open(filepath, 'wt', encoding=doc.output_encoding,
+              errors='dxfreplace', buffering=buffer_size) as f:
+        doc.write(f)
+
+
+def write_document(doc: Drawing, stream: Union[TextIO, BinaryIO], fmt: str = 'asc') -> None:
+    """
+    Write a DXF document to an open stream.
+    
+    For ASCII DXF, text streams receive the DXF text as is; binary streams
+    (e.g. ``io.BytesIO``) receive it encoded exactly as ``save_document``
+    would write it to disk. Binary DXF needs a binary stream.
+    
+    Args:
+        doc: ezdxf Drawing document
+        stream: Writable text or binary stream
+        fmt: 'asc' for ASCII DXF (default) or 'bin' for binary DXF
+        
+    Raises:
+        ValueError: If binary DXF is requested for a text stream
+    """
+    if fmt.startswith('bin'):
+        if isinstance(stream, io.TextIOBase):
+            raise ValueError("Binary DXF needs a binary stream, got a text stream")
+        doc.write(stream, fmt='bin')
+        return
+    
+    if isinstance(stream, io.TextIOBase):
+        doc.write(stream)
+        return
+    
+    wrapper = io.TextIOWrapper(stream, encoding=doc.output_encoding, errors='dxfreplace')
+    try:
+        doc.write(wrapper)
+        wrapper.flush()
+    finally:
+        # Leave the caller's stream open
+        wrapper.detach()
@@ -1,12 +1,24 @@
 """Logging configuration for CAD-P bot."""
 
+import atexit
 import logging
+import queue
+import re
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
 from .config import config
 
+# Background listener that owns the console/file handlers
+_listener: Optional[QueueListener] = None
+
+# %-style record fields filled in only while the matching logging flag is set
+_THREAD_FIELDS = re.compile(r'%\((?:thread|threadName)\)')
+_PROCESS_FIELDS = re.compile(r'%\(process\)')
+_PROCESS_NAME_FIELDS = re.compile(r'%\(processName\)')
+
 
 def setup_logging(
     level: Optional[str] = None,
@@ -16,6 +28,11 @@ def setup_logging(
     """
     Configure application logging.
     
+    Records are put on a queue by the root logger and formatted/written by
+    a background listener thread, so logging calls never wait on disk I/O.
+    Thread and process details (process-wide logging flags) are only
+    collected when log_format prints them.
+    
     Args:
         level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Path to log file (optional)
@@ -39,14 +56,20 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(numeric_level)
     
-    # Remove existing handlers
+    # Remove existing handlers (and the listener of a previous call)
+    stop_logging()
     root_logger.handlers.clear()
     
+    # Skip collecting thread/process details the format does not print
+    logging.logThreads = bool(_THREAD_FIELDS.search(log_format))
+    logging.logProcesses = bool(_PROCESS_FIELDS.search(log_format))
+    logging.logMultiprocessing = bool(_PROCESS_NAME_FIELDS.search(log_format))
+    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(numeric_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler (if log_file is specified)
     if log_file:
@@ -60,7 +83,15 @@ def setup_logging(
         file_handler = logging.FileHandler(log_path, encoding='utf-8')
         file_handler.setLevel(numeric_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Producers only enqueue; the listener thread does the actual output
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    
+    global _listener
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
     
     # Reduce noise from some libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -70,6 +101,18 @@ def setup_logging(
     return root_logger
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the background logging listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Drain anything still queued when the interpreter exits
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for a specific module.
@@ -1,9 +1,20 @@
 """Bot-specific data models for state management."""
 
+import sys
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
+import numpy as np
+
+# Default number of bytes inspected by encoding detection (64 KiB)
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# One session object lives per user; slots (Python 3.10+) drop the
+# per-instance __dict__ and make attribute writes cheaper.
+_SESSION_DATACLASS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class FileUploadInfo:
@@ -13,6 +24,7 @@ class FileUploadInfo:
     file_size: int
     encoding: Optional[str] = None
     delimiter: Optional[str] = None
+    sample_size: int = ENCODING_SAMPLE_SIZE  # Bytes inspected by encoding detection
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -21,7 +33,8 @@ class FileUploadInfo:
             'original_filename': self.original_filename,
             'file_size': self.file_size,
             'encoding': self.encoding,
-            'delimiter': self.delimiter
+            'delimiter': self.delimiter,
+            'sample_size': self.sample_size
         }
 
 
@@ -47,15 +60,83 @@ class ColumnMapping:
         }
 
 
+class PointRecords(Sequence):
+    """
+    Read-only list-of-dicts view over columnar point arrays.
+    
+    Point dicts (keys: x, y, z and optionally name, code, comment) are
+    only built for the rows that are actually accessed.
+    """
+    
+    def __init__(self,
+                 xyz: np.ndarray,
+                 names: Optional[np.ndarray] = None,
+                 codes: Optional[np.ndarray] = None,
+                 comments: Optional[np.ndarray] = None):
+        """
+        Initialize view.
+        
+        Args:
+            xyz: Nx3 float array of coordinates
+            names: Optional array of point names (None for missing)
+            codes: Optional array of point codes (None for missing)
+            comments: Optional array of comments (None for missing)
+        """
+        self.xyz = xyz
+        self.names = names
+        self.codes = codes
+        self.comments = comments
+    
+    def __len__(self) -> int:
+        return len(self.xyz)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("point index out of range")
+        return self._record(index)
+    
+    def _record(self, i: int) -> Dict[str, Any]:
+        """Materialize a single point dict."""
+        x, y, z = self.xyz[i].tolist()
+        point: Dict[str, Any] = {'x': x, 'y': y, 'z': z}
+        
+        for key, column in (('name', self.names), ('code', self.codes), ('comment', self.comments)):
+            if column is not None and column[i] is not None:
+                point[key] = column[i]
+        
+        return point
+
+
 @dataclass
 class ParsedData:
-    """Parsed data from uploaded file."""
-    points: List[Dict[str, Any]]
+    """
+    Parsed data from uploaded file.
+    
+    Points are stored column-wise: an Nx3 coordinate array plus optional
+    name, code and comment arrays. ``points`` is a list-of-dicts view over
+    those columns for callers that work with individual records.
+    """
     total_rows: int
     valid_rows: int
     invalid_rows: int
     anomalies: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
+    xyz: Optional[np.ndarray] = None  # Nx3 float64 coordinates
+    names: Optional[np.ndarray] = None
+    codes: Optional[np.ndarray] = None
+    comments: Optional[np.ndarray] = None
+    points: Optional[Sequence] = None
+    
+    def __post_init__(self):
+        if self.points is None and self.xyz is not None:
+            self.points = PointRecords(
+                self.xyz, names=self.names, codes=self.codes, comments=self.comments
+            )
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -68,7 +149,7 @@ class ParsedData:
         }
 
 
-@dataclass
+@dataclass(**_SESSION_DATACLASS)
 class BotSessionData:
     """Session data stored in context.user_data."""
     file_info: Optional[FileUploadInfo] = None
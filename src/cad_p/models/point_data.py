@@ -54,12 +54,49 @@ class PointCloud:
     points: np.ndarray
     point_metadata: List[Dict[str, Any]] = field(default_factory=list)
     attributes: Dict[str, Any] = field(default_factory=dict)
+    codes: Optional[np.ndarray] = None  # int32 ids into code_dict, one per point
+    code_dict: Dict[str, int] = field(default_factory=dict)
     
     @property
     def count(self) -> int:
         """Number of points in the cloud."""
         return len(self.points)
     
+    def encoded_codes(self) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Get lower-cased point codes as integer ids.
+        
+        Built from point_metadata on first use when ``codes`` is not set;
+        points without a code are encoded as 'other'.
+        
+        Returns:
+            Tuple of (int32 code id per point, mapping code -> id)
+        """
+        if self.codes is None and self.point_metadata:
+            code_dict: Dict[str, int] = {}
+            self.codes = np.fromiter(
+                (code_dict.setdefault(meta.get('code', 'other').lower(), len(code_dict))
+                 for meta in self.point_metadata),
+                dtype=np.int32,
+                count=len(self.point_metadata)
+            )
+            self.code_dict = code_dict
+        
+        if self.codes is None:
+            return np.empty(0, dtype=np.int32), {}
+        return self.codes, self.code_dict
+    
+    def code_mask(self, codes) -> np.ndarray:
+        """
+        Boolean mask of points whose code is one of ``codes``.
+        
+        Args:
+            codes: Iterable of lower-case code names
+        """
+        code_ids, code_dict = self.encoded_codes()
+        wanted = [code_dict[code] for code in codes if code in code_dict]
+        return np.isin(code_ids, wanted)
+    
     @property
     def bounds(self) -> Tuple[float, float, float, float, float, float]:
         """Bounding box: (min_x, max_x, min_y, max_y, min_z, max_z)."""
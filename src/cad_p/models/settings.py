@@ -1,9 +1,16 @@
 """Configuration and settings models."""
 
+import sys
 from dataclasses import dataclass, field
 from typing import Optional, List
 from enum import Enum
 
+# Settings are immutable value objects; slots (Python 3.10+) make their
+# attribute reads cheaper and instances smaller.
+_SETTINGS_DATACLASS = {'frozen': True}
+if sys.version_info >= (3, 10):
+    _SETTINGS_DATACLASS['slots'] = True
+
 
 class InterpolationMethod(Enum):
     """Interpolation method for densification."""
@@ -20,7 +27,7 @@ class TINCodeSelection(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+@dataclass(**_SETTINGS_DATACLASS)
 class DensificationSettings:
     """Settings for relief densification."""
     enabled: bool = False
@@ -59,7 +66,7 @@ class DensificationSettings:
         )
 
 
-@dataclass
+@dataclass(**_SETTINGS_DATACLASS)
 class TINSettings:
     """Settings for TIN surface construction."""
     enabled: bool = True
@@ -96,7 +103,7 @@ class TINSettings:
         )
 
 
-@dataclass
+@dataclass(**_SETTINGS_DATACLASS)
 class DXFGenerationSettings:
     """Settings for DXF generation."""
     enabled: bool = True
@@ -136,7 +143,7 @@ class DXFGenerationSettings:
         )
 
 
-@dataclass
+@dataclass(**_SETTINGS_DATACLASS)
 class ProjectSettings:
     """Project-level settings."""
     scale: float = 1.0
@@ -111,7 +111,9 @@ class PointCloudProcessor:
         return PointCloud(
             points=cloud.points[unique_indices],
             point_metadata=new_metadata,
-            attributes=cloud.attributes
+            attributes=cloud.attributes,
+            codes=cloud.codes[unique_indices] if cloud.codes is not None else None,
+            code_dict=cloud.code_dict
         )
     
     def filter_outliers(self, cloud: PointCloud, sigma: float = 3.0) -> PointCloud:
@@ -129,7 +131,9 @@ class PointCloudProcessor:
         return PointCloud(
             points=cloud.points[mask],
             point_metadata=new_metadata,
-            attributes=cloud.attributes
+            attributes=cloud.attributes,
+            codes=cloud.codes[mask] if cloud.codes is not None else None,
+            code_dict=cloud.code_dict
         )
     
     def calculate_spacing_statistics(self, cloud: PointCloud) -> dict:
@@ -1,7 +1,7 @@
 """TIN (Triangulated Irregular Network) builder."""
 
 import numpy as np
-from scipy.spatial import Delaunay
+from scipy.spatial import Delaunay, cKDTree
 from typing import Optional, List
 
 from src.models.point_data import TIN, Polyline
@@ -52,45 +52,28 @@ class TINBuilder:
         if self.max_edge_length is None or len(triangles) == 0:
             return triangles
         
-        valid_triangles = []
-        for triangle in triangles:
-            pts = points[triangle]
-            edge_lengths = [
-                np.linalg.norm(pts[1, :2] - pts[0, :2]),
-                np.linalg.norm(pts[2, :2] - pts[1, :2]),
-                np.linalg.norm(pts[0, :2] - pts[2, :2])
-            ]
-            
-            if max(edge_lengths) <= self.max_edge_length:
-                valid_triangles.append(triangle)
+        edge_lengths = triangle_edge_lengths(points, triangles)
+        valid = edge_lengths.max(axis=1) <= self.max_edge_length
         
-        return np.array(valid_triangles) if valid_triangles else np.array([])
+        return triangles[valid] if valid.any() else np.array([])
     
     def _calculate_quality(self, points: np.ndarray, triangles: np.ndarray) -> float:
         """Calculate average triangle quality coefficient."""
         if len(triangles) == 0:
             return 0.0
         
-        qualities = []
+        pts = points[triangles, :2]
+        area = 0.5 * np.abs(
+            pts[:, 0, 0] * (pts[:, 1, 1] - pts[:, 2, 1]) +
+            pts[:, 1, 0] * (pts[:, 2, 1] - pts[:, 0, 1]) +
+            pts[:, 2, 0] * (pts[:, 0, 1] - pts[:, 1, 1])
+        )
         
-        for triangle in triangles:
-            pts = points[triangle, :2]
-            
-            area = 0.5 * abs(
-                pts[0, 0] * (pts[1, 1] - pts[2, 1]) +
-                pts[1, 0] * (pts[2, 1] - pts[0, 1]) +
-                pts[2, 0] * (pts[0, 1] - pts[1, 1])
-            )
-            
-            edges = [
-                np.linalg.norm(pts[1] - pts[0]),
-                np.linalg.norm(pts[2] - pts[1]),
-                np.linalg.norm(pts[0] - pts[2])
-            ]
-            
-            perimeter_sq = sum(e**2 for e in edges)
-            quality = 4 * np.sqrt(3) * area / perimeter_sq if perimeter_sq > 0 else 0
-            qualities.append(quality)
+        perimeter_sq = (triangle_edge_lengths(points, triangles) ** 2).sum(axis=1)
+        
+        qualities = np.zeros(len(triangles))
+        nonzero = perimeter_sq > 0
+        qualities[nonzero] = 4 * np.sqrt(3) * area[nonzero] / perimeter_sq[nonzero]
         
         return float(np.mean(qualities))
     
@@ -112,52 +95,29 @@ class TINBuilder:
         if len(triangles) == 0 or not breaklines:
             return triangles
         
-        breakline_segments = []
+        segments = []
         for polyline in breaklines:
-            for i in range(len(polyline.vertices) - 1):
-                p1 = polyline.vertices[i]
-                p2 = polyline.vertices[i + 1]
-                breakline_segments.append((p1, p2))
-            if polyline.is_closed and len(polyline.vertices) > 2:
-                p1 = polyline.vertices[-1]
-                p2 = polyline.vertices[0]
-                breakline_segments.append((p1, p2))
-        
-        valid_triangles = []
-        for triangle in triangles:
-            if not self._triangle_crosses_breaklines(points[triangle], breakline_segments):
-                valid_triangles.append(triangle)
-        
-        return np.array(valid_triangles) if valid_triangles else np.array([])
-    
-    def _triangle_crosses_breaklines(self, triangle_points: np.ndarray, 
-                                    breakline_segments: List[tuple]) -> bool:
-        """
-        Check if a triangle crosses any breakline segments.
+            vertices = np.asarray(polyline.vertices)[:, :2]
+            segments.append(np.stack([vertices[:-1], vertices[1:]], axis=1))
+            if polyline.is_closed and len(vertices) > 2:
+                segments.append(np.stack([vertices[-1:], vertices[:1]], axis=1))
         
-        Args:
-            triangle_points: 3x3 array of triangle vertex coordinates
-            breakline_segments: List of (p1, p2) tuples representing breakline segments
-            
-        Returns:
-            True if triangle crosses any breakline
-        """
-        triangle_edges = [
-            (triangle_points[0, :2], triangle_points[1, :2]),
-            (triangle_points[1, :2], triangle_points[2, :2]),
-            (triangle_points[2, :2], triangle_points[0, :2])
-        ]
-        
-        for t_edge in triangle_edges:
-            for b_seg in breakline_segments:
-                if self._segments_intersect(t_edge[0], t_edge[1], b_seg[0][:2], b_seg[1][:2]):
-                    if not self._points_coincident(t_edge[0], b_seg[0][:2]) and \
-                       not self._points_coincident(t_edge[0], b_seg[1][:2]) and \
-                       not self._points_coincident(t_edge[1], b_seg[0][:2]) and \
-                       not self._points_coincident(t_edge[1], b_seg[1][:2]):
-                        return True
-        
-        return False
+        segments = np.concatenate(segments) if segments else np.empty((0, 2, 2))
+        if len(segments) == 0:
+            return triangles
+        
+        # Triangle edges (p0->p1, p1->p2, p2->p0) as a flat (3M, 2, 2) array
+        tri_pts = points[triangles, :2]
+        edges = np.stack([tri_pts, tri_pts[:, [1, 2, 0]]], axis=2).reshape(-1, 2, 2)
+        
+        crosses = np.zeros(len(edges), dtype=bool)
+        for edge_idx, seg_idx in _breakline_candidates(edges, segments):
+            hit = _edges_cross_segments(edges[edge_idx], segments[seg_idx])
+            crosses[edge_idx[hit]] = True
+        
+        valid = ~crosses.reshape(-1, 3).any(axis=1)
+        
+        return triangles[valid] if valid.any() else np.array([])
     
     def _segments_intersect(self, p1: np.ndarray, p2: np.ndarray, 
                           p3: np.ndarray, p4: np.ndarray) -> bool:
@@ -171,11 +131,116 @@ class TINBuilder:
         Returns:
             True if segments intersect
         """
-        def ccw(A, B, C):
-            return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
-        
-        return ccw(p1, p3, p4) != ccw(p2, p3, p4) and ccw(p1, p2, p3) != ccw(p1, p2, p4)
+        p1, p2, p3, p4 = (np.asarray(p, dtype=float)[:2] for p in (p1, p2, p3, p4))
+        return bool((_ccw(p1, p3, p4) != _ccw(p2, p3, p4)) and (_ccw(p1, p2, p3) != _ccw(p1, p2, p4)))
     
     def _points_coincident(self, p1: np.ndarray, p2: np.ndarray, tol: float = 1e-6) -> bool:
         """Check if two points are coincident within tolerance."""
         return np.linalg.norm(p1 - p2) < tol
+
+
+# Upper bound on candidate (edge, segment) pairs gathered per batch
+_BREAKLINE_MAX_PAIRS = 1 << 20
+
+# Upper bound on the pieces breaklines are cut into for the spatial index
+_BREAKLINE_MAX_PIECES = 1 << 20
+
+
+def triangle_edge_lengths(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Planar edge lengths (p0-p1, p1-p2, p2-p0) of each triangle as an Mx3 array."""
+    pts = points[triangles, :2]
+    return np.linalg.norm(pts[:, [1, 2, 0]] - pts, axis=2)
+
+
+def _breakline_candidates(edges: np.ndarray, segments: np.ndarray):
+    """
+    Yield batches of (edge index, segment index) pairs that may cross.
+    
+    Segments are cut into pieces about as long as a typical triangle edge
+    and indexed by piece midpoint. An edge crossing a segment at X lies
+    within its half-length of X, and so does some piece of that segment,
+    so querying around each edge midpoint with (edge half-length + piece
+    half-length) finds every crossing pair. Long segments (e.g. a closed
+    boundary) therefore only widen the search by one piece, not by their
+    whole length. Each batch holds at most about _BREAKLINE_MAX_PAIRS
+    candidate pairs, and each pair appears once.
+    
+    Args:
+        edges: Ex2x2 array of triangle edge endpoints
+        segments: Sx2x2 array of breakline segment endpoints
+    """
+    edge_half = 0.5 * np.linalg.norm(edges[:, 1] - edges[:, 0], axis=1)
+    seg_len = np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1)
+    
+    piece_len = max(2.0 * float(np.median(edge_half)), float(seg_len.sum()) / _BREAKLINE_MAX_PIECES)
+    if not piece_len > 0:
+        piece_len = 1.0
+    n_pieces = np.maximum(np.ceil(seg_len / piece_len).astype(np.intp), 1)
+    
+    # Midpoints of the equal pieces of every segment, tagged with their segment
+    owner = np.repeat(np.arange(len(segments)), n_pieces)
+    first_piece = np.cumsum(n_pieces) - n_pieces
+    t = (np.arange(len(owner)) - first_piece[owner] + 0.5) / n_pieces[owner]
+    piece_mid = segments[owner, 0] + t[:, None] * (segments[owner, 1] - segments[owner, 0])
+    piece_reach = float((0.5 * seg_len / n_pieces).max())
+    
+    tree = cKDTree(piece_mid)
+    edge_mid = edges.mean(axis=1)
+    edge_radius = edge_half + piece_reach + 1e-9
+    
+    counts = tree.query_ball_point(edge_mid, r=edge_radius, return_length=True)
+    candidate_edges = np.flatnonzero(counts)
+    if len(candidate_edges) == 0:
+        return
+    cum_counts = np.cumsum(counts[candidate_edges])
+    
+    n_segments = len(segments)
+    start = 0
+    while start < len(candidate_edges):
+        done = cum_counts[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cum_counts, done + _BREAKLINE_MAX_PAIRS, side='right')), start + 1)
+        batch = candidate_edges[start:stop]
+        start = stop
+        
+        pieces = tree.query_ball_point(edge_mid[batch], r=edge_radius[batch])
+        edge_idx = np.repeat(batch, counts[batch])
+        seg_idx = owner[np.concatenate(pieces).astype(np.intp)]
+        
+        # Several pieces of one segment can match the same edge
+        pairs = np.unique(edge_idx * n_segments + seg_idx)
+        yield pairs // n_segments, pairs % n_segments
+
+
+def _ccw(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Elementwise counter-clockwise test for broadcastable (..., 2) point arrays."""
+    return (c[..., 1] - a[..., 1]) * (b[..., 0] - a[..., 0]) > \
+        (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0])
+
+
+def _edges_cross_segments(edges: np.ndarray, segments: np.ndarray, tol: float = 1e-6) -> np.ndarray:
+    """
+    Test edges against segments pairwise (edges[i] against segments[i]).
+    
+    Uses the orientation (ccw) test; pairs that share an endpoint (within
+    tol) do not count as crossing.
+    
+    Args:
+        edges: Px2x2 array of edge endpoints
+        segments: Px2x2 array of breakline segment endpoints
+        
+    Returns:
+        Boolean array of length P, True where the edge crosses the segment
+    """
+    p1, p2 = edges[:, 0], edges[:, 1]
+    p3, p4 = segments[:, 0], segments[:, 1]
+    
+    intersect = (_ccw(p1, p3, p4) != _ccw(p2, p3, p4)) & (_ccw(p1, p2, p3) != _ccw(p1, p2, p4))
+    
+    shared = (
+        (np.linalg.norm(p1 - p3, axis=-1) < tol) |
+        (np.linalg.norm(p1 - p4, axis=-1) < tol) |
+        (np.linalg.norm(p2 - p3, axis=-1) < tol) |
+        (np.linalg.norm(p2 - p4, axis=-1) < tol)
+    )
+    
+    return intersect & ~shared
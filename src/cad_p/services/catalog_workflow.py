@@ -1,8 +1,11 @@
 """Catalog workflow service integrating rule engine with processing pipeline."""
 
+import csv
 from typing import Dict, Any, List
 from pathlib import Path
 
+import pandas as pd
+
 from src.processors.point_cloud import PointCloudProcessor
 from src.services.rule_engine import RuleEngine
 from src.models.point_data import SurveyPoint, PointCloud
@@ -196,11 +199,10 @@ class CatalogWorkflowService:
         }
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            lines = self._read_data_lines(filepath)
             
             preview_data = []
-            for line in lines[:10]:
+            for line in lines.iloc[:10]:
                 parts = line.split()
                 if len(parts) >= 3:
                     preview_item = {
@@ -220,6 +222,37 @@ class CatalogWorkflowService:
             results['error'] = str(e)
         
         return results
+    
+    @staticmethod
+    def _read_data_lines(filepath: str) -> pd.Series:
+        """
+        Read non-empty, non-comment lines with the pandas C reader.
+        
+        Args:
+            filepath: Path to input file
+            
+        Returns:
+            Series of stripped data lines
+        """
+        try:
+            # One raw line per row; '\x1f' never occurs in coordinate files
+            lines = pd.read_csv(
+                filepath,
+                sep='\x1f',
+                encoding='utf-8',
+                header=None,
+                names=['line'],
+                dtype=str,
+                # Lines such as 'NA' or 'null' are data, not missing values
+                na_filter=False,
+                quoting=csv.QUOTE_NONE,
+                engine='c'
+            )['line']
+        except pd.errors.EmptyDataError:
+            return pd.Series([], dtype=str)
+        
+        lines = lines[~lines.str.startswith('#')].str.strip()
+        return lines[lines != '']
 
 
 class DXFPayloadBuilder:
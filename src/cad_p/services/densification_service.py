@@ -6,6 +6,7 @@ from scipy.spatial import ConvexHull
 from typing import Tuple, Dict, Any, List
 
 from src.models.point_data import PointCloud, TIN, PointType
+from src.processors.tin_builder import triangle_edge_lengths
 from src.models.settings import DensificationSettings, InterpolationMethod
 
 
@@ -96,30 +97,21 @@ class DensificationService:
         if tin.triangle_count == 0:
             return []
         
-        sparse_regions = []
+        # Planar edge lengths of every triangle in one pass (Mx3)
+        edge_lengths = triangle_edge_lengths(cloud.points, tin.triangles)
+        sparse = edge_lengths.max(axis=1) > self.settings.min_spacing_threshold
         
-        for triangle in tin.triangles:
-            tri_points = cloud.points[triangle]
-            
-            edge_lengths = [
-                np.linalg.norm(tri_points[1, :2] - tri_points[0, :2]),
-                np.linalg.norm(tri_points[2, :2] - tri_points[1, :2]),
-                np.linalg.norm(tri_points[0, :2] - tri_points[2, :2])
-            ]
-            
-            max_edge = max(edge_lengths)
-            
-            if max_edge > self.settings.min_spacing_threshold:
-                min_x = tri_points[:, 0].min()
-                max_x = tri_points[:, 0].max()
-                min_y = tri_points[:, 1].min()
-                max_y = tri_points[:, 1].max()
-                
-                sparse_regions.append(np.array([
-                    [min_x, min_y],
-                    [max_x, max_y],
-                    tri_points[:, :2]
-                ], dtype=object))
+        sparse_xy = cloud.points[tin.triangles[sparse], :2]
+        mins = sparse_xy.min(axis=1)
+        maxs = sparse_xy.max(axis=1)
+        
+        sparse_regions = []
+        for low, high, corners in zip(mins, maxs, sparse_xy):
+            sparse_regions.append(np.array([
+                [low[0], low[1]],
+                [high[0], high[1]],
+                corners
+            ], dtype=object))
         
         return sparse_regions
     
@@ -1,23 +1,235 @@
 """Main processing service orchestrating all operations."""
 
-from typing import Dict, Any, Optional
+import copy
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 from src.processors.point_cloud import PointCloudProcessor
 from src.processors.tin_builder import TINBuilder
 from src.services.densification_service import DensificationService
 from src.services.tin_service import TINService
 from src.dxf.exporter import DXFExporter
 from src.models.settings import ProjectSettings, DensificationSettings
-from src.models.point_data import PointCloud, TIN
+from src.models.point_data import PointCloud, PointType, TIN
+
+
+def _file_key(data_file: str) -> Tuple[str, int, int]:
+    """Build a cache key that changes whenever the file is rewritten."""
+    st = os.stat(data_file)
+    return os.fspath(data_file), st.st_mtime_ns, st.st_size
+
+
+def _sidecar_paths(data_file: str) -> Tuple[str, str]:
+    """Paths of the binary coordinate cache and its metadata next to the input."""
+    base = os.fspath(data_file)
+    return f"{base}.xyz.npy", f"{base}.xyz.json"
+
+
+def _sidecar_meta(data_file: str) -> Dict[str, Any]:
+    """Metadata a sidecar must match to be reused for the current input file."""
+    st = os.stat(data_file)
+    return {
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        # PointCloudProcessor reads UTF-8, whitespace separated X Y Z columns
+        'encoding': 'utf-8',
+        'delimiter': None,
+        'column_mapping': [0, 1, 2]
+    }
+
+
+def _load_sidecar(data_file: str) -> Optional[np.ndarray]:
+    """Memory-map cached coordinates, or return None if missing or stale."""
+    npy_path, meta_path = _sidecar_paths(data_file)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta != _sidecar_meta(data_file):
+            return None
+        return np.load(npy_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+
+def _replace_file(path: str, write) -> None:
+    """
+    Write a file through a temporary sibling and rename it into place.
+    
+    Readers that still have the old file open (e.g. memory-mapped) keep
+    seeing the old contents instead of a truncated file.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory or None)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _save_sidecar(data_file: str, points: np.ndarray) -> None:
+    """Write the parsed coordinates next to the input file."""
+    npy_path, meta_path = _sidecar_paths(data_file)
+    meta = json.dumps(_sidecar_meta(data_file)).encode('utf-8')
+    try:
+        _replace_file(npy_path, lambda f: np.save(f, points))
+        # Metadata is replaced last so a partial write is never considered valid
+        _replace_file(meta_path, lambda f: f.write(meta))
+    except OSError:
+        # Read-only input location: the cache is an optimisation only
+        pass
+
+
+def _read_cloud(processor: PointCloudProcessor, data_file: str, disk_cache: bool = False) -> PointCloud:
+    """Load the raw point cloud, going through the .npy sidecar if enabled."""
+    if not disk_cache:
+        return processor.load_from_file(data_file)
+    
+    points = _load_sidecar(data_file)
+    if points is None:
+        points = processor.load_from_file(data_file).points
+        _save_sidecar(data_file, points)
+    
+    metadata = [{'type': PointType.ORIGINAL.value} for _ in range(len(points))]
+    return PointCloud(points=points, point_metadata=metadata)
+
+
+def _prepare_cloud(processor: PointCloudProcessor, data_file: str, disk_cache: bool = False) -> PointCloud:
+    """Load a point cloud and apply the standard cleanup steps."""
+    cloud = _read_cloud(processor, data_file, disk_cache)
+    cloud = processor.remove_duplicates(cloud)
+    cloud = processor.filter_outliers(cloud)
+    return cloud
+
+
+def _collect_file_statistics(processor: PointCloudProcessor,
+                             data_file: str,
+                             disk_cache: bool = False) -> Dict[str, Any]:
+    """Compute bounds and spacing statistics for a raw input file."""
+    cloud = _read_cloud(processor, data_file, disk_cache)
+    
+    bounds = cloud.bounds
+    spacing_stats = processor.calculate_spacing_statistics(cloud)
+    
+    return {
+        'success': True,
+        'point_count': cloud.count,
+        'bounds': {
+            'min_x': bounds[0],
+            'max_x': bounds[1],
+            'min_y': bounds[2],
+            'max_y': bounds[3],
+            'min_z': bounds[4],
+            'max_z': bounds[5]
+        },
+        'spacing': spacing_stats
+    }
+
+
+@lru_cache(maxsize=8)
+def _load_points_cached(path: str, mtime_ns: int, size: int, disk_cache: bool = False) -> PointCloud:
+    """Cached variant of :func:`_prepare_cloud` keyed by file identity."""
+    cloud = _prepare_cloud(PointCloudProcessor(), path, disk_cache)
+    # Shared between callers, so guard against in-place modification
+    cloud.points.setflags(write=False)
+    return cloud
+
+
+@lru_cache(maxsize=8)
+def _build_base_tin_cached(path: str, mtime_ns: int, size: int, disk_cache: bool = False) -> TIN:
+    """Cached base TIN for the cleaned point cloud of a file."""
+    cloud = _load_points_cached(path, mtime_ns, size, disk_cache)
+    return TINBuilder().build(cloud.points)
+
+
+@lru_cache(maxsize=8)
+def _file_statistics_cached(path: str, mtime_ns: int, size: int, disk_cache: bool = False) -> Dict[str, Any]:
+    """Cached variant of :func:`_collect_file_statistics`."""
+    return _collect_file_statistics(PointCloudProcessor(), path, disk_cache)
+
+
+@dataclass
+class PreparedProject:
+    """Input-dependent part of a project, shared across densification runs."""
+    data_file: str
+    cloud: PointCloud
+    original_tin: TIN
+    spacing_stats: Dict[str, Any]
+    
+    @property
+    def bounds(self) -> Tuple[float, float, float, float, float, float]:
+        """Bounding box of the cleaned point cloud."""
+        return self.cloud.bounds
 
 
 class ProcessingService:
     """Main service for processing geospatial data."""
     
-    def __init__(self):
-        """Initialize processing service."""
+    def __init__(self, use_cache: bool = True, disk_cache: bool = False):
+        """
+        Initialize processing service.
+        
+        Args:
+            use_cache: Reuse parsed points, base TIN and file statistics for
+                       unchanged input files (keyed by path, mtime and size)
+            disk_cache: Also keep parsed coordinates in a ``<input>.xyz.npy``
+                        sidecar so later runs skip text parsing
+        """
         self.point_processor = PointCloudProcessor()
+        self.use_cache = use_cache
+        self.disk_cache = disk_cache and use_cache
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all cached point clouds, TINs and file statistics."""
+        _load_points_cached.cache_clear()
+        _build_base_tin_cached.cache_clear()
+        _file_statistics_cached.cache_clear()
+    
+    def _load_points(self, data_file: str) -> PointCloud:
+        """Load and clean the point cloud for an input file."""
+        if self.use_cache:
+            return _load_points_cached(*_file_key(data_file), self.disk_cache)
+        return _prepare_cloud(self.point_processor, data_file)
+    
+    def _build_base_tin(self, data_file: str, cloud: PointCloud) -> TIN:
+        """Build the unconstrained TIN for the cleaned point cloud."""
+        if self.use_cache:
+            return _build_base_tin_cached(*_file_key(data_file), self.disk_cache)
+        return TINBuilder().build(cloud.points)
+    
+    def prepare(self, data_file: str) -> PreparedProject:
+        """
+        Load the input file and build its base TIN.
+        
+        The result can be passed to :meth:`densify_and_write` any number of
+        times, e.g. to compare densification settings on the same data.
+        
+        Args:
+            data_file: Path to input coordinate file
+            
+        Returns:
+            PreparedProject with cleaned points, base TIN and spacing statistics
+        """
+        cloud = self._load_points(data_file)
+        return PreparedProject(
+            data_file=data_file,
+            cloud=cloud,
+            original_tin=self._build_base_tin(data_file, cloud),
+            spacing_stats=self.point_processor.calculate_spacing_statistics(cloud)
+        )
     
     def process_project(self, 
                        data_file: str,
@@ -34,25 +246,47 @@ class ProcessingService:
         Returns:
             Dictionary with processing statistics and results
         """
+        try:
+            prepared = self.prepare(data_file)
+        except Exception as e:
+            return {
+                'success': False,
+                'data_file': data_file,
+                'output_file': output_file,
+                'error': str(e)
+            }
+        
+        return self.densify_and_write(prepared, output_file, settings)
+    
+    def densify_and_write(self,
+                          prepared: PreparedProject,
+                          output_file: str,
+                          settings: ProjectSettings) -> Dict[str, Any]:
+        """
+        Run TIN/densification options on a prepared project and export DXF.
+        
+        Args:
+            prepared: Result of :meth:`prepare`
+            output_file: Path to output DXF file
+            settings: Project settings including densification options
+            
+        Returns:
+            Dictionary with processing statistics and results
+        """
+        cloud = prepared.cloud
+        original_tin = prepared.original_tin
+        
         results = {
             'success': False,
-            'data_file': data_file,
-            'output_file': output_file
+            'data_file': prepared.data_file,
+            'output_file': output_file,
+            'points_loaded': cloud.count,
+            'spacing_stats': prepared.spacing_stats,
+            'original_triangles': original_tin.triangle_count,
+            'tin_quality': original_tin.quality
         }
         
         try:
-            cloud = self.point_processor.load_from_file(data_file)
-            cloud = self.point_processor.remove_duplicates(cloud)
-            cloud = self.point_processor.filter_outliers(cloud)
-            results['points_loaded'] = cloud.count
-            
-            spacing_stats = self.point_processor.calculate_spacing_statistics(cloud)
-            results['spacing_stats'] = spacing_stats
-            
-            tin_builder = TINBuilder()
-            original_tin = tin_builder.build(cloud.points)
-            results['original_triangles'] = original_tin.triangle_count
-            results['tin_quality'] = original_tin.quality
             
             real_tin = None
             tin_stats = {}
@@ -74,7 +308,7 @@ class ProcessingService:
                 results['densification'] = densification_stats
                 
                 if densification_stats['generated_points'] > 0:
-                    densified_tin = tin_builder.build(densified_cloud.points)
+                    densified_tin = TINBuilder().build(densified_cloud.points)
                     results['densified_triangles'] = densified_tin.triangle_count
             
             exporter = DXFExporter(settings.template_path)
@@ -128,24 +362,9 @@ class ProcessingService:
             Dictionary with file statistics
         """
         try:
-            cloud = self.point_processor.load_from_file(data_file)
-            
-            bounds = cloud.bounds
-            spacing_stats = self.point_processor.calculate_spacing_statistics(cloud)
-            
-            return {
-                'success': True,
-                'point_count': cloud.count,
-                'bounds': {
-                    'min_x': bounds[0],
-                    'max_x': bounds[1],
-                    'min_y': bounds[2],
-                    'max_y': bounds[3],
-                    'min_z': bounds[4],
-                    'max_z': bounds[5]
-                },
-                'spacing': spacing_stats
-            }
+            if self.use_cache:
+                return copy.deepcopy(_file_statistics_cached(*_file_key(data_file), self.disk_cache))
+            return _collect_file_statistics(self.point_processor, data_file)
         except Exception as e:
             return {
                 'success': False,
@@ -1,5 +1,6 @@
 """Rule engine service for processing survey points with codes and comments."""
 
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 import re
 
@@ -11,6 +12,26 @@ from src.models.rule_data import (
 )
 
 
+_CODE_NUMBER_RE = re.compile(r'^([a-zа-я\-+]+?)(\d+)$')
+_NUMBER_RE = re.compile(r'^(\d+)$')
+
+
+@lru_cache(maxsize=4096)
+def _extract_code(text: str) -> tuple[str, Optional[int]]:
+    """Split a survey code string into (code, number); see RuleEngine.extract_code_from_string."""
+    text = text.strip().lower()
+    
+    match = _CODE_NUMBER_RE.match(text)
+    if match:
+        return match.group(1), int(match.group(2))
+    
+    match = _NUMBER_RE.match(text)
+    if match:
+        return match.group(1), None
+    
+    return text, None
+
+
 class RuleEngine:
     """Engine for processing survey points according to catalog rules."""
     
@@ -229,17 +250,7 @@ class RuleEngine:
         Returns:
             Tuple of (code, number)
         """
-        text = text.strip().lower()
-        
-        match = re.match(r'^([a-zа-я\-+]+?)(\d+)$', text)
-        if match:
-            return match.group(1), int(match.group(2))
-        
-        match = re.match(r'^(\d+)$', text)
-        if match:
-            return match.group(1), None
-        
-        return text, None
+        return _extract_code(text)
     
     def validate_instruction(self, instruction: PlacementInstruction) -> List[str]:
         """
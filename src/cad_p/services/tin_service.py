@@ -31,35 +31,25 @@ class TINService:
         Returns:
             Tuple of (TIN object, statistics dictionary)
         """
-        stats = {
-            'skipped': False,
-            'triangle_count': 0,
-            'breakline_count': 0,
-            'quality': 0.0,
-            'points_used': 0,
-            'points_filtered': 0
-        }
-        
+        # Degenerate inputs return before any stats or filtering work
         if not self.settings.enabled:
-            stats['skipped'] = True
-            empty_tin = TIN(points=np.array([]), triangles=np.array([]), quality=0.0)
-            return empty_tin, stats
+            return self._skipped_result(np.array([]))
         
         if cloud.count < 3:
-            stats['skipped'] = True
-            stats['error'] = 'Insufficient points (need at least 3)'
-            empty_tin = TIN(points=cloud.points, triangles=np.array([]), quality=0.0)
-            return empty_tin, stats
+            return self._skipped_result(cloud.points, 'Insufficient points (need at least 3)')
         
         filtered_points = self._filter_points_by_code(cloud)
-        stats['points_used'] = len(filtered_points)
-        stats['points_filtered'] = cloud.count - len(filtered_points)
         
         if len(filtered_points) < 3:
-            stats['skipped'] = True
-            stats['error'] = 'Insufficient points after filtering'
-            empty_tin = TIN(points=filtered_points, triangles=np.array([]), quality=0.0)
-            return empty_tin, stats
+            return self._skipped_result(
+                filtered_points, 'Insufficient points after filtering',
+                points_used=len(filtered_points),
+                points_filtered=cloud.count - len(filtered_points)
+            )
+        
+        stats = self._empty_stats()
+        stats['points_used'] = len(filtered_points)
+        stats['points_filtered'] = cloud.count - len(filtered_points)
         
         breaklines = []
         if self.settings.use_breaklines:
@@ -73,6 +63,39 @@ class TINService:
         
         return tin, stats
     
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        """Statistics dictionary with all counters at zero."""
+        return {
+            'skipped': False,
+            'triangle_count': 0,
+            'breakline_count': 0,
+            'quality': 0.0,
+            'points_used': 0,
+            'points_filtered': 0
+        }
+    
+    @classmethod
+    def _skipped_result(cls, points: np.ndarray, error: Optional[str] = None,
+                        **counts: int) -> tuple[TIN, Dict[str, Any]]:
+        """
+        Build the (empty TIN, stats) pair returned when triangulation is skipped.
+        
+        Args:
+            points: Points to keep on the empty TIN
+            error: Optional reason recorded under 'error'
+            **counts: Extra counters to record (e.g. points_used)
+            
+        Returns:
+            Tuple of (empty TIN object, statistics dictionary)
+        """
+        stats = cls._empty_stats()
+        stats['skipped'] = True
+        stats.update(counts)
+        if error is not None:
+            stats['error'] = error
+        return TIN(points=points, triangles=np.array([]), quality=0.0), stats
+    
     def _filter_points_by_code(self, cloud: PointCloud) -> np.ndarray:
         """
         Filter points based on code selection settings.
@@ -86,21 +109,15 @@ class TINService:
         if self.settings.code_selection == TINCodeSelection.ALL:
             return cloud.points
         
-        if not cloud.point_metadata:
+        if not cloud.point_metadata and cloud.codes is None:
             return cloud.points
         
-        selected_codes = self._get_selected_codes()
+        mask = cloud.code_mask(self._get_selected_codes())
         
-        indices = []
-        for i, meta in enumerate(cloud.point_metadata):
-            code = meta.get('code', 'other').lower()
-            if code in selected_codes:
-                indices.append(i)
-        
-        if not indices:
+        if not mask.any():
             return cloud.points
         
-        return cloud.points[indices]
+        return cloud.points[mask]
     
     def _get_selected_codes(self) -> List[str]:
         """Get list of codes to use based on settings."""
@@ -125,23 +142,20 @@ class TINService:
         Returns:
             List of Polyline objects representing breaklines
         """
-        if not cloud.point_metadata:
+        if not cloud.point_metadata and cloud.codes is None:
             return []
         
         breakline_codes = set(code.lower() for code in self.settings.breakline_codes)
-        
-        code_points = {}
-        for i, meta in enumerate(cloud.point_metadata):
-            code = meta.get('code', 'other').lower()
-            if code in breakline_codes:
-                if code not in code_points:
-                    code_points[code] = []
-                code_points[code].append(cloud.points[i])
+        code_ids, code_dict = cloud.encoded_codes()
         
         polylines = []
-        for code, points in code_points.items():
-            if len(points) >= 2:
-                vertices = np.array(points)
+        # code_dict preserves first-appearance order of the codes
+        for code, code_id in code_dict.items():
+            if code not in breakline_codes:
+                continue
+            
+            vertices = cloud.points[code_ids == code_id]
+            if len(vertices) >= 2:
                 polylines.append(Polyline(
                     vertices=vertices,
                     code=code,
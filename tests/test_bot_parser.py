@@ -3,6 +3,7 @@
 import pytest
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 from src.bot.file_parser import FileParser, FileParsingError
 from src.models.bot_data import ColumnMapping
 
@@ -151,6 +152,48 @@ class TestEncodingDetection:
         assert encoding is not None
         assert len(encoding) > 0
 
+    def test_detect_utf8_bom(self, temp_dir):
+        """Test that a UTF-8 byte order mark short-circuits detection."""
+        file_path = temp_dir / "bom.txt"
+        file_path.write_bytes(b'\xef\xbb\xbf' + "100.0 200.0 150.5 точка\n".encode('utf-8'))
+
+        assert FileParser.detect_encoding(file_path) == 'utf-8-sig'
+
+    def test_detect_utf16_bom(self, temp_dir):
+        """Test detection of UTF-16 files by byte order mark."""
+        file_path = temp_dir / "utf16.txt"
+        file_path.write_bytes("100.0 200.0 150.5\n".encode('utf-16'))
+
+        assert FileParser.detect_encoding(file_path) == 'utf-16'
+
+    def test_detect_with_small_sample(self, temp_dir):
+        """Test that detection only needs the leading sample of the file."""
+        file_path = temp_dir / "large.txt"
+        file_path.write_text("100.0 200.0 150.5 1 Point\n" * 10000, encoding='utf-8')
+
+        encoding = FileParser.detect_encoding(file_path, sample_size=1024)
+        assert encoding == 'utf-8'
+
+    def test_utf8_detected_without_chardet(self, temp_dir):
+        """Test that valid UTF-8 is recognised even when the sample cuts a character."""
+        file_path = temp_dir / "utf8.txt"
+        file_path.write_text("100.0 200.0 150.5 точка\n" * 100, encoding='utf-8')
+        # Stop the sample one byte into a two-byte Cyrillic letter
+        sample_size = file_path.read_bytes().index("т".encode('utf-8')) + 1
+
+        with patch('src.bot.file_parser.chardet.UniversalDetector') as detector:
+            encoding = FileParser.detect_encoding(file_path, sample_size=sample_size)
+
+        assert encoding == 'utf-8'
+        assert not detector.called
+
+    def test_detect_from_bytes_matches_file(self, windows_1251_file):
+        """Test that in-memory detection agrees with detection from disk."""
+        content = bytearray(windows_1251_file.read_bytes())
+
+        assert (FileParser.detect_encoding_from_bytes(content) ==
+                FileParser.detect_encoding(windows_1251_file))
+
 
 class TestDelimiterDetection:
     """Test delimiter detection."""
@@ -170,6 +213,53 @@ class TestDelimiterDetection:
         delimiter = FileParser.detect_delimiter(tab_separated_file, 'utf-8')
         assert delimiter == '\t'
 
+    def test_detect_semicolon_delimiter_with_spaces_in_comments(self, temp_dir):
+        """Test that a consistent delimiter beats spaces inside comments."""
+        file_path = temp_dir / "test_data.txt"
+        content = """# X;Y;Z;CODE;COMMENT
+100.0;200.0;150.5;1;First point
+105.0;205.0;151.2;2;Second point with a longer comment
+110.0;210.0;152.0;3;Third
+"""
+        file_path.write_text(content, encoding='utf-8')
+
+        assert FileParser.detect_delimiter(file_path, 'utf-8') == ';'
+
+    def test_detect_space_delimiter_with_commas_in_comments(self, temp_dir):
+        """Test that a comma inside the comment column does not beat the space separator."""
+        file_path = temp_dir / "test_data.txt"
+        file_path.write_text("1 100.0 200.0 150.1 bord a,b\n" * 4, encoding='utf-8')
+
+        assert FileParser.detect_delimiter(file_path, 'utf-8') == ' '
+
+    def test_detect_delimiter_utf16(self, temp_dir):
+        """Test delimiter detection for a non ASCII-compatible encoding."""
+        file_path = temp_dir / "test_data.txt"
+        file_path.write_bytes("100.0,200.0,150.5\n105.0,205.0,151.2\n".encode('utf-16'))
+
+        assert FileParser.detect_delimiter(file_path, 'utf-16') == ','
+    
+    def test_detection_refreshed_when_file_changes(self, temp_dir):
+        """Test that cached detection results follow file modifications."""
+        file_path = temp_dir / "changing.txt"
+        file_path.write_text("1,2,3\n4,5,6\n", encoding='utf-8')
+        assert FileParser.detect_delimiter(file_path) == ','
+        assert FileParser.detect_delimiter(file_path) == ','
+        
+        file_path.write_text("1;2;3\n4;5;6\n7;8;9\n", encoding='utf-8')
+        assert FileParser.detect_delimiter(file_path) == ';'
+    
+    def test_xyz_fast_path(self, temp_dir):
+        """Test that plain ASCII .xyz files skip detection."""
+        xyz_path = temp_dir / "plain.xyz"
+        xyz_path.write_bytes(b"100.0 200.0 150.5\n105.0 205.0 151.2\n")
+        assert FileParser.fast_path_xyz(xyz_path) == ('utf-8', ' ')
+        assert FileParser.detect_delimiter(xyz_path) == ' '
+        
+        assert FileParser.fast_path_xyz(temp_dir / "plain.txt", b"1 2 3\n") is None
+        assert FileParser.fast_path_xyz(xyz_path, b"1,2,3\n") is None
+        assert FileParser.fast_path_xyz(xyz_path, "1 2 3 точка\n".encode('utf-8')) is None
+
 
 class TestFileParsing:
     """Test file parsing."""
@@ -270,6 +360,18 @@ class TestFileParsing:
         assert parsed.invalid_rows == 3
         assert len(parsed.warnings) > 0
     
+    def test_missing_coordinate_is_invalid(self, temp_dir):
+        """Test that a row with an empty coordinate field is reported, not kept as NaN."""
+        file_path = temp_dir / "test.txt"
+        file_path.write_text("100.0,200.0,150.5\n105.0,205.0,\n")
+        
+        column_mapping = ColumnMapping(x_col=0, y_col=1, z_col=2)
+        parsed = FileParser.parse_file(file_path, 'utf-8', ',', column_mapping)
+        
+        assert parsed.valid_rows == 1
+        assert parsed.invalid_rows == 1
+        assert parsed.warnings == ["Row 2: Could not parse coordinates - missing coordinate value"]
+    
     def test_z_rounding(self, temp_dir):
         """Test Z coordinate rounding to 2 decimals."""
         file_path = temp_dir / "test.txt"
@@ -369,6 +471,46 @@ still not valid
             FileParser.parse_file(file_path, 'utf-8', ' ', column_mapping)
 
 
+class TestFastParsing:
+    """Test columnar fast-path parsing."""
+    
+    def test_fast_parse_matches_parse_file(self, sample_txt_file):
+        """Test that the fast path produces the same points as parse_file."""
+        column_mapping = ColumnMapping(x_col=0, y_col=1, z_col=2, code_col=3, comment_col=4)
+        
+        fast = FileParser.parse_file_fast(sample_txt_file, 'utf-8', ' ', column_mapping)
+        
+        assert fast.xyz.shape == (5, 3)
+        assert fast.codes[0] == '1'
+        assert fast.comments[2] == 'Third point with long comment'
+        assert list(fast.points[:2]) == [
+            {'x': 100.0, 'y': 200.0, 'z': 150.5, 'code': '1', 'comment': 'First point'},
+            {'x': 105.0, 'y': 205.0, 'z': 151.2, 'code': '2', 'comment': 'Second point'},
+        ]
+    
+    def test_fast_parse_falls_back_on_invalid_rows(self, malformed_file):
+        """Test that files with bad rows go through parse_file."""
+        column_mapping = ColumnMapping(x_col=0, y_col=1, z_col=2)
+        
+        parsed = FileParser.parse_file_fast(malformed_file, 'utf-8', ' ', column_mapping)
+        
+        assert parsed.invalid_rows > 0
+        assert parsed.xyz.shape == (parsed.valid_rows, 3)
+    
+    def test_arrow_reader_matches_loadtxt(self, temp_dir):
+        """Test that the optional pyarrow reader gives the same coordinates."""
+        pytest.importorskip("pyarrow")
+        file_path = temp_dir / "clean.csv"
+        file_path.write_text("1.1,2.2,3.333\n-4.5,5e3,6.0\n7,8,9.005\n", encoding='utf-8')
+        column_mapping = ColumnMapping(x_col=0, y_col=1, z_col=2)
+        
+        parsed = FileParser.parse_file_fast(file_path, 'utf-8', ',', column_mapping)
+        
+        with patch('src.bot.file_parser.pacsv', None):
+            expected = FileParser.parse_file_fast(file_path, 'utf-8', ',', column_mapping)
+        assert parsed.xyz.tolist() == expected.xyz.tolist()
+
+
 class TestColumnMapping:
     """Test different column mappings."""
     
@@ -415,6 +557,38 @@ class TestColumnMapping:
         for point in parsed.points:
             assert 'code' not in point
             assert 'comment' not in point
+    
+    def test_columnar_result(self, temp_dir):
+        """Test that parsed points are stored as arrays with a record view."""
+        file_path = temp_dir / "test.txt"
+        file_path.write_text("P1 100.0 200.0 150.5 A\nP2 105.0 205.0 151.2 B\n")
+        
+        column_mapping = ColumnMapping(
+            name_col=0, x_col=1, y_col=2, z_col=3, code_col=4, comment_col=None
+        )
+        
+        parsed = FileParser.parse_file(file_path, 'utf-8', ' ', column_mapping)
+        
+        assert parsed.xyz.tolist() == [[100.0, 200.0, 150.5], [105.0, 205.0, 151.2]]
+        assert list(parsed.names) == ['P1', 'P2']
+        assert parsed.points[1] == {
+            'x': 105.0, 'y': 205.0, 'z': 151.2, 'name': 'P2', 'code': 'B'
+        }
+    
+    def test_unmapped_columns_not_read(self, temp_dir):
+        """Test that columns outside the mapping do not affect parsing."""
+        file_path = temp_dir / "test.txt"
+        content = """100.0 200.0 150.5 A1 note
+105.0 205.0 151.2 A2 longer trailing note
+"""
+        file_path.write_text(content)
+        
+        column_mapping = ColumnMapping(x_col=0, y_col=1, z_col=2, code_col=3, comment_col=None)
+        
+        parsed = FileParser.parse_file(file_path, 'utf-8', ' ', column_mapping)
+        
+        assert parsed.valid_rows == 2
+        assert list(parsed.codes) == ['A1', 'A2']
 
 
 class TestEdgeCases:
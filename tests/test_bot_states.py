@@ -1,7 +1,9 @@
 """Tests for bot conversation state machine."""
 
+import asyncio
 import pytest
 import tempfile
+from collections import OrderedDict
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 from telegram import Update, User, Message, Document, Chat, CallbackQuery
@@ -19,7 +21,10 @@ from src.bot.handlers import (
     handle_tin_choice,
     handle_densification_choice,
     handle_confirmation,
-    cancel
+    cancel,
+    get_session_data,
+    _BACKGROUND_TASKS,
+    _acquire_download_slot
 )
 from src.models.bot_data import BotSessionData
 
@@ -140,7 +145,7 @@ class TestFileUpload:
         
         # Mock file download
         mock_file = MagicMock()
-        mock_file.download_to_drive = AsyncMock()
+        mock_file.download_as_bytearray = AsyncMock(return_value=bytearray(b"100 200 150\n"))
         mock_context.bot.get_file.return_value = mock_file
         
         with patch('src.bot.handlers.FileParser.validate_file', return_value=(True, "")):
@@ -182,6 +187,43 @@ class TestFileUpload:
         
         assert result == ConversationState.FILE_UPLOAD
         assert mock_update.message.reply_text.called
+    
+    @pytest.mark.asyncio
+    async def test_empty_download_not_written(self, mock_update, mock_context):
+        """Test that an empty download is rejected before touching disk."""
+        mock_update.message.document = MagicMock(spec=Document)
+        mock_update.message.document.file_name = "empty_data.txt"
+        mock_update.message.document.file_size = 0
+        mock_update.message.document.file_id = "file123"
+        
+        mock_file = MagicMock()
+        mock_file.download_as_bytearray = AsyncMock(return_value=bytearray())
+        mock_context.bot.get_file.return_value = mock_file
+        
+        with patch('src.bot.handlers._write_upload') as mock_write:
+            result = await handle_file_upload(mock_update, mock_context)
+        
+        assert result == ConversationState.FILE_UPLOAD
+        assert not mock_write.called
+        assert "empty" in mock_update.message.reply_text.call_args[0][0].lower()
+    
+    @pytest.mark.asyncio
+    async def test_queued_download_notifies_user(self, mock_update):
+        """Test that a download waiting for a free slot tells the user."""
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+        
+        with patch('src.bot.handlers._download_semaphore', semaphore), \
+                patch('src.bot.handlers._DOWNLOAD_QUEUE_NOTICE_SECONDS', 0.01):
+            waiter = asyncio.create_task(_acquire_download_slot(mock_update))
+            await asyncio.sleep(0.05)
+            assert not waiter.done()
+            
+            semaphore.release()
+            assert await waiter is semaphore
+        
+        call_args = mock_update.message.reply_text.call_args
+        assert "очереди" in call_args[0][0]
 
 
 class TestEncodingDetection:
@@ -230,10 +272,10 @@ class TestDelimiterDetection:
         session.file_info = MagicMock()
         session.file_info.file_path = sample_file
         session.file_info.encoding = 'utf-8'
-        session.file_info.delimiter = ' '
+        session.file_info.delimiter = ','
         mock_context.user_data['session'] = session
         
-        mock_callback_query_update.callback_query.data = f"delimiter_{ord(' ')}"
+        mock_callback_query_update.callback_query.data = "delimiter_0"
         
         with patch('src.bot.handlers.FileParser.parse_file') as mock_parse:
             mock_parse.return_value = MagicMock(
@@ -267,6 +309,26 @@ class TestDelimiterDetection:
         assert result == ConversationState.DELIMITER_DETECTION
         assert mock_callback_query_update.callback_query.edit_message_text.called
 
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("data", ["delimiter_32", "delimiter_5", "delimiter_x", "delimiter_-1"])
+    async def test_invalid_delimiter_token_shows_choices(self, mock_callback_query_update,
+                                                         mock_context, data):
+        """Test that stale or malformed delimiter buttons show the keyboard again."""
+        session = BotSessionData()
+        session.file_info = MagicMock()
+        session.file_info.delimiter = ' '
+        mock_context.user_data['session'] = session
+        
+        mock_callback_query_update.callback_query.data = data
+        
+        result = await handle_delimiter_choice(mock_callback_query_update, mock_context)
+        
+        assert result == ConversationState.DELIMITER_DETECTION
+        assert mock_callback_query_update.callback_query.answer.called
+        assert 'reply_markup' in mock_callback_query_update.callback_query.edit_message_text.call_args[1]
+        assert session.file_info.delimiter == ' '
+
 
 class TestParseConfirmation:
     """Test parse confirmation state."""
@@ -466,6 +528,8 @@ class TestCancellation:
         mock_context.user_data['session'] = session
         
         await cancel(mock_update, mock_context)
+        # Deletion runs in the background; wait for it to finish
+        await asyncio.gather(*_BACKGROUND_TASKS)
         
         # File should be deleted
         assert not test_file.exists()
@@ -488,6 +552,77 @@ class TestSessionDataReset:
         assert session.scale == 1.0
         assert session.tin_enabled is True
         assert session.densification_enabled is False
+    
+    def test_least_recently_used_session_evicted(self):
+        """Test that the oldest session is dropped once the limit is reached."""
+        first, second = MagicMock(user_data={}), MagicMock(user_data={})
+        
+        with patch('src.bot.handlers._MAX_ACTIVE_SESSIONS', 1), \
+                patch('src.bot.handlers._SESSION_ACTIVITY', OrderedDict()):
+            get_session_data(first)
+            get_session_data(second)
+        
+        assert 'session' not in first.user_data
+        assert isinstance(second.user_data['session'], BotSessionData)
+
+    
+    @pytest.mark.asyncio
+    async def test_idle_session_expired_returns_to_upload(self, mock_callback_query_update, mock_context):
+        """Test that a pending button after idle expiry restarts the upload."""
+        session = BotSessionData()
+        session.file_info = MagicMock()
+        session.file_info.file_path = Path("missing_upload.txt")
+        mock_context.user_data['session'] = session
+        other = MagicMock(user_data={})
+        
+        with patch('src.bot.handlers._SESSION_ACTIVITY', OrderedDict()), \
+                patch('src.bot.handlers.time.monotonic') as monotonic:
+            monotonic.return_value = 0.0
+            get_session_data(mock_context)
+            
+            # Another user is active a day later, which evicts the idle session
+            monotonic.return_value = 24 * 60 * 60 + 1.0
+            get_session_data(other)
+            assert 'session' not in mock_context.user_data
+            
+            mock_callback_query_update.callback_query.data = "delimiter_0"
+            result = await handle_delimiter_choice(mock_callback_query_update, mock_context)
+        
+        assert result == ConversationState.FILE_UPLOAD
+        message = mock_callback_query_update.callback_query.edit_message_text.call_args[0][0]
+        assert "Сессия истекла" in message
+    
+    @pytest.mark.asyncio
+    async def test_evicted_session_at_confirmation_returns_to_upload(
+            self, mock_callback_query_update, mock_context):
+        """Test that confirming with an LRU-evicted session restarts the upload."""
+        with patch('src.bot.handlers._MAX_ACTIVE_SESSIONS', 1), \
+                patch('src.bot.handlers._SESSION_ACTIVITY', OrderedDict()):
+            session = get_session_data(mock_context)
+            session.file_info = MagicMock()
+            session.parsed_data = MagicMock()
+            
+            # A second user pushes the first session out of the LRU
+            get_session_data(MagicMock(user_data={}))
+            
+            mock_callback_query_update.callback_query.data = "confirm_yes"
+            result = await handle_confirmation(mock_callback_query_update, mock_context)
+        
+        assert result == ConversationState.FILE_UPLOAD
+        mock_context.bot.send_message.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_cancel_forgets_session_activity(self, mock_update, mock_context):
+        """Test that ending the conversation drops the session's activity entry."""
+        activity = OrderedDict()
+        with patch('src.bot.handlers._SESSION_ACTIVITY', activity):
+            get_session_data(mock_context)
+            assert activity
+            
+            await cancel(mock_update, mock_context)
+        
+        assert not activity
+        assert 'session' not in mock_context.user_data
 
 
 class TestErrorHandling:
@@ -135,6 +135,20 @@ class TestCatalogWorkflowService:
         assert len(result['preview']) > 0
         assert result['total_lines'] == 6
     
+    def test_validate_file_format_keeps_na_like_lines(self, service, tmp_path):
+        """Test that lines reading 'NA' or 'null' are counted like any other line."""
+        file_path = tmp_path / "na_lines.txt"
+        file_path.write_text(
+            "# header\n100.0 200.0 150.0 1\nNA\n\nnull\n110.0 210.0 151.0 2\n",
+            encoding='utf-8'
+        )
+        
+        result = service.validate_file_format(str(file_path))
+        
+        assert result['valid'] is True
+        assert result['total_lines'] == 4
+        assert len(result['preview']) == 2
+    
     def test_process_cloud_with_catalog(self, service):
         """Test processing point cloud directly."""
         points = [
@@ -3,8 +3,9 @@
 import pytest
 import tempfile
 import os
-from io import BytesIO
+from io import BytesIO, StringIO
 import ezdxf
+from unittest.mock import patch
 
 from src.dxf.generation_service import DXFGenerationService
 from src.dxf.scale_settings import DrawingScale, ScaleManager, ScaleParameters
@@ -192,6 +193,53 @@ class TestPolylineBuilder:
         segments = grouped['bord']
         assert len(segments) == 2  # Should be split into 2 segments
     
+    def test_kdtree_order_matches_dense_scan(self):
+        """Test that large groups are ordered exactly like the dense scan."""
+        import numpy as np
+        
+        grid = np.stack(np.meshgrid(np.arange(30.0), np.arange(20.0)), axis=-1).reshape(-1, 2)
+        positions = np.column_stack([grid, np.zeros(len(grid))])
+        np.random.default_rng(0).shuffle(positions)
+        
+        assert np.array_equal(
+            Polyline3DBuilder._proximity_order(positions),
+            Polyline3DBuilder._proximity_order_dense(positions)
+        )
+    
+    def test_order_and_segment_kernel_matches_numpy_path(self):
+        """Test that the kernel orders and splits groups like the NumPy path."""
+        import numpy as np
+        from src.dxf._polyline_core import _order_and_segment, order_and_segment
+        
+        builder = Polyline3DBuilder(break_distance=3.0)
+        rng = np.random.default_rng(0)
+        kernels = [_order_and_segment]
+        if order_and_segment is not None:
+            kernels.append(order_and_segment)
+        
+        for positions in (rng.integers(0, 8, (120, 3)).astype(float),
+                          rng.random((150, 3)) * 40):
+            dense = Polyline3DBuilder._proximity_order_dense(positions)
+            steps = np.diff(positions[dense], axis=0)
+            expected_breaks = np.flatnonzero((steps ** 2).sum(axis=1) > 9.0) + 1
+            
+            for kernel in kernels:
+                order, breaks = kernel(positions, builder.break_distance ** 2)
+                assert np.array_equal(order, dense)
+                assert np.array_equal(breaks, expected_breaks)
+    
+    def test_compiled_kernel_matches_dense_scan(self):
+        """Test the numba-compiled kernel against the dense scan."""
+        import numpy as np
+        pytest.importorskip("numba")
+        from src.dxf._polyline_core import order_and_segment
+        
+        positions = np.random.default_rng(1).random((300, 3)) * 100
+        order, breaks = order_and_segment(positions, np.inf)
+        
+        assert np.array_equal(order, Polyline3DBuilder._proximity_order_dense(positions))
+        assert len(breaks) == 0
+    
     def test_k_code_special_logic(self):
         """Test k-code special logic connects identical codes."""
         builder = Polyline3DBuilder()
@@ -208,6 +256,22 @@ class TestPolylineBuilder:
         assert len(k_polylines['k1']) == 1
         assert len(k_polylines['k1'][0]) == 3
     
+    def test_k_code_drawn_once_without_breaks(self):
+        """Test that k-code points become a single polyline despite large gaps."""
+        doc = ezdxf.new('R2018')
+        builder = Polyline3DBuilder(break_distance=70.0)
+        
+        points = [
+            PointWithMetadata(0, 0, 0, 'k1'),
+            PointWithMetadata(10, 0, 0, 'k1'),
+            PointWithMetadata(200, 0, 0, 'k1'),
+        ]
+        
+        polylines = builder.build_polylines_for_points(points, 'test_layer', doc)
+        
+        assert len(polylines) == 1
+        assert len(list(polylines[0].vertices)) == 3
+    
     def test_build_polylines_in_document(self):
         """Test building polylines in DXF document."""
         doc = ezdxf.new('R2018')
@@ -260,6 +324,17 @@ class TestDXFGenerationService:
         assert layer.color == 3
         assert layer.dxf.lineweight == 50
     
+    def test_known_layers_follow_reset(self):
+        """Test that the layer cache is per drawing."""
+        service = DXFGenerationService()
+        service.ensure_layer_exists('test_layer')
+        service.ensure_layer_exists('TEST_LAYER')
+        
+        service.reset()
+        service.ensure_layer_exists('test_layer')
+        
+        assert 'test_layer' in service.doc.layers
+    
     def test_add_point_with_label(self):
         """Test adding point with Z label."""
         service = DXFGenerationService()
@@ -278,6 +353,77 @@ class TestDXFGenerationService:
         assert len(texts) > 0
         assert '150.500' in texts[0].dxf.text or '150.5' in texts[0].dxf.text
     
+    def test_add_points_batch(self):
+        """Test that batch insertion matches per-point insertion."""
+        points = [(100.0, 200.0, 150.5, 'bord'), (110.0, 200.0, 151.25, 'test'),
+                  (120.0, 200.0, 152.0, 'bord')]
+        
+        single = DXFGenerationService()
+        for x, y, z, code in points:
+            single.add_point_with_label(x, y, z, code, f'layer_{code}')
+        
+        batch = DXFGenerationService()
+        batch.add_points_batch([p[:3] for p in points], [p[3] for p in points])
+        
+        def entities(service):
+            return sorted(
+                (e.dxftype(), e.dxf.layer, e.dxf.get('color'),
+                 e.dxf.text if e.dxftype() == 'TEXT' else '')
+                for e in service.doc.modelspace()
+            )
+        
+        assert entities(batch) == entities(single)
+        assert 'layer_bord' in batch.doc.layers
+    
+    def test_reset_starts_new_drawing(self):
+        """Test that reset switches scale and clears the drawing."""
+        service = DXFGenerationService(scale=DrawingScale.SCALE_1_1000)
+        service.add_point_with_label(100, 200, 150, 'test', 'test_layer')
+        old_doc = service.doc
+        
+        service.reset(scale=DrawingScale.SCALE_1_500)
+        
+        assert service.doc is not old_doc
+        assert service.scale_manager.scale == DrawingScale.SCALE_1_500
+        assert len(service.doc.modelspace()) == 0
+        assert service.layer_manager.doc is service.doc
+        assert service.geometry_helpers.doc is service.doc
+        assert service.msp is service.doc.modelspace()
+    
+    def test_text_styles_created_on_first_text(self):
+        """Test that text styles are only added once text is written."""
+        service = DXFGenerationService()
+        
+        service.build_3d_polylines([
+            {'x': 0.0, 'y': 0.0, 'z': 100.0, 'code': 'bord', 'comment': None},
+            {'x': 10.0, 'y': 0.0, 'z': 100.5, 'code': 'bord', 'comment': None},
+        ])
+        assert 'COORDINATES' not in service.doc.styles
+        
+        service.add_text_annotation('note', 0.0, 0.0, 'notes')
+        assert 'COORDINATES' in service.doc.styles
+        
+        service.reset()
+        assert 'COORDINATES' not in service.doc.styles
+        service.add_point_with_label(1.0, 2.0, 3.0, 'bord', 'points')
+        assert 'COORDINATES' in service.doc.styles
+    
+    def test_template_parsed_once_and_copied(self, tmp_path):
+        """Test that services share one template parse but not its entities."""
+        template = tmp_path / "template.dxf"
+        ezdxf.new('R2018').saveas(template)
+        
+        first = DXFGenerationService(template_path=str(template))
+        first.add_point_with_label(100, 200, 150, 'test', 'test_layer')
+        second = DXFGenerationService(template_path=str(template))
+        
+        assert second.doc is not first.doc
+        assert len(second.doc.modelspace()) == 0
+        
+        with patch('src.dxf.generation_service.ezdxf.readfile') as readfile:
+            DXFGenerationService(template_path=str(template))
+        readfile.assert_not_called()
+    
     def test_structural_layer_colors(self):
         """Test structural layer color assignments."""
         service = DXFGenerationService()
@@ -300,6 +446,31 @@ class TestDXFGenerationService:
         
         assert len(entities) > 0
     
+    def test_square_marker_outline(self):
+        """Test that SQUARE markers are drawn around each point in input order."""
+        service = DXFGenerationService()
+        size = service.scale_manager.get_annotation_size()
+        
+        points_data = [
+            {'x': 100.0, 'y': 200.0, 'z': 150.0, 'code': 'Machta'},
+            {'x': 0.0, 'y': 0.0, 'z': 0.0, 'code': 'Fonar'},
+            {'x': -5.0, 'y': 7.5, 'z': 1.0, 'code': 'Machta'},
+        ]
+        
+        service.apply_special_code_rules(points_data, 'special_layer')
+        
+        entities = list(service.doc.modelspace())
+        assert [e.dxftype() for e in entities] == ['LWPOLYLINE', 'CIRCLE', 'LWPOLYLINE']
+        
+        for entity, data in zip((entities[0], entities[2]), (points_data[0], points_data[2])):
+            x, y = data['x'], data['y']
+            assert entity.closed
+            assert [tuple(p) for p in entity.get_points('xy')] == [
+                (x - size, y - size), (x + size, y - size),
+                (x + size, y + size), (x - size, y + size),
+                (x - size, y - size),
+            ]
+    
     def test_build_3d_polylines_from_data(self):
         """Test building 3D polylines from point data."""
         service = DXFGenerationService()
@@ -314,6 +485,21 @@ class TestDXFGenerationService:
         
         assert len(polylines) > 0
     
+    def test_structural_layers_only_for_used_codes(self):
+        """Test that only structural layers of codes present in the data are created."""
+        service = DXFGenerationService()
+        
+        points_data = [
+            {'x': 0.0, 'y': 0.0, 'z': 100.0, 'code': 'bord', 'comment': None},
+            {'x': 10.0, 'y': 0.0, 'z': 100.5, 'code': 'bord', 'comment': None},
+        ]
+        
+        service.build_3d_polylines(points_data, 'polylines')
+        
+        assert 'polylines_bord' in service.doc.layers
+        for code in ('rels', 'bpl', 'cpl'):
+            assert f'polylines_{code}' not in service.doc.layers
+    
     def test_save_to_file(self):
         """Test saving DXF to file."""
         service = DXFGenerationService()
@@ -328,6 +514,42 @@ class TestDXFGenerationService:
             
             doc = ezdxf.readfile(output_file)
             assert doc is not None
+    
+    def test_save_binary_dxf(self, tmp_path):
+        """Test saving as binary DXF."""
+        service = DXFGenerationService()
+        service.add_point_with_label(100, 200, 150, 'test', 'layer1')
+        
+        output_file = tmp_path / 'binary.dxf'
+        service.save(output_file, fmt='bin')
+        
+        assert output_file.read_bytes().startswith(b'AutoCAD Binary DXF')
+        assert len(ezdxf.readfile(output_file).modelspace()) == len(service.doc.modelspace())
+    
+    def test_save_binary_dxf_to_stream(self):
+        """Test that fmt='bin' is honoured for streams."""
+        service = DXFGenerationService()
+        service.add_point_with_label(100, 200, 150, 'test', 'layer1')
+        
+        buffer = BytesIO()
+        service.save(buffer, fmt='bin')
+        assert buffer.getvalue().startswith(b'AutoCAD Binary DXF')
+        
+        with pytest.raises(ValueError):
+            service.save(StringIO(), fmt='bin')
+    
+    def test_save_to_stream(self):
+        """Test saving DXF to an in-memory binary stream."""
+        service = DXFGenerationService()
+        
+        service.add_point_with_label(100, 200, 150, 'test', 'layer1')
+        
+        buffer = BytesIO()
+        service.save(buffer)
+        
+        assert not buffer.closed
+        doc = ezdxf.read(StringIO(buffer.getvalue().decode(service.doc.output_encoding)))
+        assert len(doc.modelspace()) == len(service.doc.modelspace())
 
 
 class TestIntegrationWithSettings:
@@ -155,6 +155,112 @@ class TestIntegration:
         assert 'bounds' in stats
         assert 'spacing' in stats
         assert 'mean_spacing' in stats['spacing']
+
+    def test_file_statistics_cache_invalidation(self, sample_data_file):
+        """Test that cached statistics are refreshed when the file changes."""
+        service = ProcessingService()
+        first = service.get_file_statistics(sample_data_file)
+
+        with open(sample_data_file, 'a') as f:
+            f.write("1000 1000 200\n")
+
+        second = service.get_file_statistics(sample_data_file)
+
+        assert second['point_count'] == first['point_count'] + 1
+        assert second['bounds']['max_x'] == 1000
+
+    def test_cached_and_uncached_results_match(self, sample_data_file):
+        """Test that the point cache does not change processing results."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            settings = ProjectSettings(
+                densification=DensificationSettings(enabled=True, grid_spacing=5.0)
+            )
+
+            cached = ProcessingService().process_project(
+                sample_data_file, os.path.join(tmpdir, "cached.dxf"), settings
+            )
+            uncached = ProcessingService(use_cache=False).process_project(
+                sample_data_file, os.path.join(tmpdir, "uncached.dxf"), settings
+            )
+
+            assert cached['success'] and uncached['success']
+            assert cached['points_loaded'] == uncached['points_loaded']
+            assert cached['original_triangles'] == uncached['original_triangles']
+            assert (cached['densification']['generated_points'] ==
+                    uncached['densification']['generated_points'])
+
+    def test_prepare_and_densify_reuses_base_tin(self, sample_data_file):
+        """Test that a prepared project gives the same results as process_project."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            service = ProcessingService(use_cache=False)
+            prepared = service.prepare(sample_data_file)
+            
+            for spacing in (3.0, 5.0):
+                settings = ProjectSettings(
+                    densification=DensificationSettings(enabled=True, grid_spacing=spacing)
+                )
+                reused = service.densify_and_write(
+                    prepared, os.path.join(tmpdir, f"reused_{spacing}.dxf"), settings
+                )
+                direct = service.process_project(
+                    sample_data_file, os.path.join(tmpdir, f"direct_{spacing}.dxf"), settings
+                )
+                
+                assert reused['success'] and direct['success']
+                assert reused['original_triangles'] == direct['original_triangles']
+                assert (reused['densification']['generated_points'] ==
+                        direct['densification']['generated_points'])
+            
+            assert prepared.bounds == prepared.cloud.bounds
+    
+    def test_disk_cache_sidecar(self, sample_data_file):
+        """Test that the .npy sidecar is written, reused and invalidated."""
+        npy_path = sample_data_file + ".xyz.npy"
+        meta_path = sample_data_file + ".xyz.json"
+        try:
+            first = ProcessingService(disk_cache=True).get_file_statistics(sample_data_file)
+            assert os.path.exists(npy_path) and os.path.exists(meta_path)
+            
+            ProcessingService.clear_cache()
+            second = ProcessingService(disk_cache=True).get_file_statistics(sample_data_file)
+            assert second == first
+            
+            with open(sample_data_file, 'a') as f:
+                f.write("1000 1000 200\n")
+            
+            third = ProcessingService(disk_cache=True).get_file_statistics(sample_data_file)
+            assert third['point_count'] == first['point_count'] + 1
+            assert len(np.load(npy_path)) == third['point_count']
+        finally:
+            for path in (npy_path, meta_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+    
+    def test_disk_cache_rewrite_keeps_open_mapping(self, sample_data_file):
+        """Test that rewriting the sidecar does not disturb an existing memory map."""
+        from src.services.processing_service import _load_sidecar
+        
+        npy_path = sample_data_file + ".xyz.npy"
+        meta_path = sample_data_file + ".xyz.json"
+        try:
+            ProcessingService(disk_cache=True).get_file_statistics(sample_data_file)
+            mapped = _load_sidecar(sample_data_file)
+            before = np.array(mapped)
+            
+            with open(sample_data_file, 'a') as f:
+                f.write("1000 1000 200\n")
+            ProcessingService(disk_cache=True).get_file_statistics(sample_data_file)
+            
+            np.testing.assert_array_equal(mapped, before)
+            assert len(np.load(npy_path)) == len(before) + 1
+            leftovers = [name for name in os.listdir(os.path.dirname(npy_path))
+                         if name.startswith(".") and name.endswith(".tmp")
+                         and os.path.basename(sample_data_file) in name]
+            assert leftovers == []
+        finally:
+            for path in (npy_path, meta_path):
+                if os.path.exists(path):
+                    os.unlink(path)
     
     def test_error_handling_invalid_file(self):
         """Test error handling for invalid input file."""
@@ -217,6 +217,76 @@ class TestTINWithBreaklines:
         
         assert not builder._segments_intersect(p1, p2, p5, p6)
     
+    def test_breakline_enforcement_matches_pairwise_check(self):
+        """Test that indexed breakline enforcement matches a full pairwise check."""
+        rng = np.random.default_rng(0)
+        points = np.column_stack([rng.uniform(0, 100, (300, 2)), np.zeros(300)])
+        vertices = np.array([[0, 10, 0], [40, 60, 0], [100, 45, 0]], dtype=float)
+        breakline = Polyline(vertices=vertices, code='bpl', is_closed=False)
+        
+        builder = TINBuilder()
+        triangles = builder.build(points).triangles
+        kept = builder._enforce_breaklines(points, triangles, [breakline])
+        
+        def crosses(tri):
+            edges = [(points[tri[i], :2], points[tri[(i + 1) % 3], :2]) for i in range(3)]
+            return any(
+                builder._segments_intersect(a, b, vertices[j, :2], vertices[j + 1, :2])
+                for a, b in edges for j in range(len(vertices) - 1)
+            )
+        
+        expected = np.array([tri for tri in triangles if not crosses(tri)])
+        assert 0 < len(kept) < len(triangles)
+        np.testing.assert_array_equal(kept, expected)
+    
+    def test_breakline_enforcement_with_long_closed_boundary(self, monkeypatch):
+        """Test that a long closed boundary keeps candidate batches bounded and exact."""
+        import src.processors.tin_builder as tin_builder
+        
+        rng = np.random.default_rng(1)
+        points = np.column_stack([rng.uniform(0, 100, (400, 2)), np.zeros(400)])
+        boundary = Polyline(
+            vertices=np.array([[5, 5, 0], [95, 5, 0], [95, 95, 0], [5, 95, 0]], dtype=float),
+            code='bord',
+            is_closed=True
+        )
+        t = np.linspace(0, 1, 60)
+        wiggle = Polyline(
+            vertices=np.column_stack([t * 100, 50 + 20 * np.sin(t * 12), np.zeros(60)]),
+            code='bpl'
+        )
+        
+        builder = TINBuilder()
+        triangles = builder.build(points).triangles
+        
+        segments = []
+        for line in (boundary, wiggle):
+            v = line.vertices[:, :2]
+            segments += list(zip(v[:-1], v[1:]))
+        segments.append((boundary.vertices[-1, :2], boundary.vertices[0, :2]))
+        
+        def crosses(tri):
+            edges = [(points[tri[i], :2], points[tri[(i + 1) % 3], :2]) for i in range(3)]
+            return any(builder._segments_intersect(a, b, c, d) for a, b in edges for c, d in segments)
+        
+        expected = np.array([tri for tri in triangles if not crosses(tri)])
+        
+        batch_sizes = []
+        original = tin_builder._edges_cross_segments
+        
+        def counting(edges, segs):
+            batch_sizes.append(len(edges))
+            return original(edges, segs)
+        
+        monkeypatch.setattr(tin_builder, '_BREAKLINE_MAX_PAIRS', 256)
+        monkeypatch.setattr(tin_builder, '_edges_cross_segments', counting)
+        kept = builder._enforce_breaklines(points, triangles, [boundary, wiggle])
+        
+        assert 0 < len(kept) < len(triangles)
+        np.testing.assert_array_equal(kept, expected)
+        assert len(batch_sizes) > 1
+        assert max(batch_sizes) <= 256 + 64
+    
     def test_points_coincident(self):
         """Test coincident point detection."""
         builder = TINBuilder()
@@ -365,6 +435,30 @@ class TestTINService:
         
         assert len(filtered) == 6
     
+    def test_code_filtering_with_encoded_codes(self):
+        """Test filtering a cloud that carries integer codes instead of metadata."""
+        points = np.array([[0, 0, 1], [10, 0, 2], [0, 10, 3], [10, 10, 4], [5, 5, 5]], dtype=float)
+        cloud = PointCloud(
+            points=points,
+            codes=np.array([0, 1, 0, 1, 0], dtype=np.int32),
+            code_dict={'terrain': 0, 'bpl': 1}
+        )
+        settings = TINSettings(
+            enabled=True,
+            code_selection=TINCodeSelection.TERRAIN_ONLY,
+            use_breaklines=True,
+            breakline_codes=['BPL']
+        )
+        service = TINService(settings)
+        
+        filtered = service._filter_points_by_code(cloud)
+        breaklines = service._extract_breaklines(cloud)
+        
+        np.testing.assert_array_equal(filtered, points[[0, 2, 4]])
+        assert len(breaklines) == 1
+        assert breaklines[0].code == 'bpl'
+        np.testing.assert_array_equal(breaklines[0].vertices, points[[1, 3]])
+    
     def test_breakline_extraction(self, sample_cloud_with_codes):
         """Test breakline extraction from point cloud."""
         settings = TINSettings(